@@ -1,31 +1,114 @@
+import os
+import time
+from typing import Any, Mapping, Optional
+
 from flask_openapi3 import OpenAPI, Info, Tag
 from flask import redirect
 from flask_cors import CORS
 
+from commands.arquivo_command import config_arquivo_commands
+from commands.consolidacao_command import config_consolidacao_commands
+from commands.exclusao_command import config_exclusao_commands
+from commands.migracao_command import config_migracao_commands
+from commands.mudanca_command import config_mudanca_commands
+from database.config import ConfiguracaoBanco
+from database.connection import config_sessao, init_banco
+from database.instrumentacao import config_contagem_sql
+from resources.monitoramento.monitoramento_resource import config_monitoramento_routes
+from resources.transacao.escrita_resource import config_escrita_routes
+from resources.transacao.mudanca_resource import config_mudanca_routes
 from resources.transacao.observacao_resource import config_observacao_routes
+from resources.transacao.recorrencia_resource import config_recorrencia_routes
 from resources.transacao.transacao_resource import config_transacao_routes
-from utils.logger import logger
+from services.transacao.cache_service import config_cache
+from services.transacao.escrita_assincrona_service import config_escrita_assincrona
+from services.transacao.exclusao_service import config_exclusao_logica, config_expurgo
+from utils.compressao import config_compressao
+from utils.json_provider import JSONProviderRapido
+from utils.logger import configurar_logging, logger
+from utils.metricas import config_metricas
+from utils.requisicao import config_requisicao
 
 info = Info(title="API do aplicativo Econome Transações", version="1.0.0")
-app = OpenAPI(__name__, info=info)
-CORS(app)
 
 # Define tags
 home_tag = Tag(name="Documentação", description="Seleção de documentação: Swagger, Redoc, RapiDoc, "
                                                 "RapiPDF, Scalar ou Elements")
 
-@app.get("/", tags=[home_tag], responses={"200": {"description": "Redireciona para /openapi"}})
-def home():
-    """Página inicial da API EconoMe Transações. Redireciona para /openapi, tela que permite a escolha do tipo da documentação."""
-    try:
-        return redirect('/openapi')
-    except Exception as e:
-        logger.error(f"Erro ao redirecionar para /openapi: {str(e)}")
-        return {"message": "Erro inesperado"}, 400
 
-# Registrar rotas das transações
-config_transacao_routes(app)
-config_observacao_routes(app)
+def config_home_routes(app):
+    @app.get("/", tags=[home_tag], responses={"200": {"description": "Redireciona para /openapi"}})
+    def home():
+        """Página inicial da API EconoMe Transações. Redireciona para /openapi, tela que permite a escolha do tipo da documentação."""
+        try:
+            return redirect('/openapi')
+        except Exception as e:
+            logger.error("Erro ao redirecionar para /openapi: %s", e)
+            return {"message": "Erro inesperado"}, 400
+
+
+def create_app(config: Optional[Mapping[str, Any]] = None) -> OpenAPI:
+    """Cria e inicializa a aplicação.
+
+    config usa os mesmos nomes das variáveis de ambiente (ex.: {"DATABASE_URL": "sqlite://"}) e tem
+    precedência sobre elas. Logging, engine e migrações são inicializados aqui, em etapas explícitas,
+    e nunca na importação dos módulos; a duração de cada etapa é registrada no log.
+    """
+    tempos = {}
+    inicio = time.perf_counter()
+
+    app = OpenAPI(__name__, info=info)
+    app.config.update(config or {})
+    app.json = JSONProviderRapido(app)
+
+    if app.config.get("CONFIGURAR_LOGGING", True):
+        configurar_logging()
+    tempos["logging"] = time.perf_counter() - inicio
+
+    etapa = time.perf_counter()
+    # Com MIGRAR_NA_INICIALIZACAO=0 as migrações ficam a cargo de "flask --app app migracoes aplicar"
+    migrar = str(app.config.get("MIGRAR_NA_INICIALIZACAO", os.getenv("MIGRAR_NA_INICIALIZACAO", "1"))) != "0"
+    engine = init_banco(ConfiguracaoBanco.from_env(os.environ | dict(app.config)), preparar=migrar)
+    # Filtro das transações excluídas logicamente, só quando EXCLUSAO_LOGICA=1 ou ainda houver excluídas
+    config_exclusao_logica(app, engine)
+    tempos["banco"] = time.perf_counter() - etapa
+
+    etapa = time.perf_counter()
+    # Cache de leitura das transações (CACHE_BACKEND): app.config tem precedência sobre o ambiente
+    config_cache(app)
+    CORS(app)
+    # Primeiro a registrar: o request id existe para os demais hooks e a linha de log sai por último
+    config_requisicao(app)
+    config_metricas(app)
+    config_sessao(app)
+    config_contagem_sql(app)
+    config_compressao(app)
+    # Registrar rotas das transações
+    config_home_routes(app)
+    config_transacao_routes(app)
+    config_observacao_routes(app)
+    config_recorrencia_routes(app)
+    config_escrita_routes(app)
+    config_mudanca_routes(app)
+    config_monitoramento_routes(app)
+    config_consolidacao_commands(app)
+    config_migracao_commands(app)
+    config_exclusao_commands(app)
+    config_mudanca_commands(app)
+    config_arquivo_commands(app)
+    tempos["rotas"] = time.perf_counter() - etapa
+
+    # Expurgo das transações excluídas logicamente (EXCLUSAO_LOGICA=1), em segundo plano
+    config_expurgo(app, engine)
+    # Fila de escritas com group commit (ESCRITA_ASSINCRONA=1); reaplica diários de execuções anteriores
+    config_escrita_assincrona(app)
+
+    tempos["total"] = time.perf_counter() - inicio
+    app.extensions["tempos_inicializacao"] = tempos
+    logger.info("Aplicação inicializada em %s", ", ".join(f"{nome}={t * 1000:.1f}ms" for nome, t in tempos.items()),
+                extra={"tempos_ms": {nome: round(t * 1000, 1) for nome, t in tempos.items()}})
+    return app
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
+    create_app().run(host="0.0.0.0", port=5001, debug=True)
@@ -0,0 +1,347 @@
+"""Benchmark reprodutível das rotas da API sobre um banco SQLite temporário.
+
+O banco é populado com N transações (e observações a cada K transações) via INSERT em lote; em
+seguida cada rota é exercitada pelo test client do Flask em duas fases:
+
+1. sequencial: M requisições por rota, com latências p50/p95/p99 e vazão;
+2. carga: clientes em threads sorteando rotas de um mix ponderado durante um tempo fixo.
+
+Uma terceira passada curta, com tracemalloc, mede o pico de memória alocada por requisição de cada
+rota (separada para não distorcer as latências). O resultado pode ser gravado em JSON (--saida) e
+comparado com uma execução anterior (--comparar), sinalizando regressões de p95 e vazão.
+
+Uso:
+    python -m benchmarks.api_benchmark --transacoes 20000 --saida resultado.json
+    python -m benchmarks.api_benchmark --transacoes 20000 --comparar resultado.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from sqlalchemy import insert
+
+from app import create_app
+from database.connection import Session
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.transacao_model import TransacaoModel
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class Cenario:
+    """Uma rota exercitada: monta a requisição a partir de um gerador aleatório e do estado do banco."""
+    nome: str
+    metodo: str
+    montar: Callable[[random.Random, "Massa"], dict]
+    # Peso no mix da fase de carga (0 deixa a rota fora da carga)
+    peso: int = 1
+
+
+class Massa:
+    """Volumes gerados no banco e contadores compartilhados para rotas que consomem linhas (exclusão)."""
+
+    def __init__(self, transacoes: int, excluiveis: int):
+        self.transacoes = transacoes
+        self.excluiveis = excluiveis
+        self._proxima_exclusao = itertools.count()
+        self._proximo_pedido = itertools.count(transacoes)
+        self._lock = threading.Lock()
+
+    def id_aleatorio(self, rng: random.Random) -> int:
+        return rng.randint(1, self.transacoes)
+
+    def proxima_exclusao(self) -> int:
+        with self._lock:
+            return next(self._proxima_exclusao)
+
+    def novo_pedido(self) -> int:
+        with self._lock:
+            return next(self._proximo_pedido)
+
+
+def popular(transacoes: int, observacoes_a_cada: int, excluiveis: int) -> None:
+    """Insere as transações (pedido_id = índice), as observações e as linhas reservadas à rota de exclusão."""
+    session = Session()
+    inicio = date(2024, 1, 1)
+    tipos = [TipoTransacao.RECEITA, TipoTransacao.DESPESA]
+    agora = datetime.now()
+    for base in range(0, transacoes, 10000):
+        session.execute(insert(TransacaoModel), [
+            {"descricao": f"Conta {i}", "tipo_transacao": tipos[i % 2], "valor": round(10 + i * 0.37, 2),
+             "data_inclusao": agora, "pago": i % 3 == 0, "data_vencimento": inicio + timedelta(days=i % 730),
+             "data_pagamento": inicio + timedelta(days=i % 700) if i % 3 == 0 else None,
+             "pedido_id": i, "participant_id": i % 50}
+            for i in range(base, min(base + 10000, transacoes))])
+    session.execute(insert(ObservacaoModel), [
+        {"fk_id_produto": i, "texto": f"Observação {i}", "data_inclusao": agora}
+        for i in range(1, transacoes + 1, observacoes_a_cada)])
+    session.execute(insert(TransacaoModel), [
+        {"descricao": f"Excluir {i}", "tipo_transacao": TipoTransacao.DESPESA, "valor": 1.0,
+         "data_inclusao": agora, "pago": False} for i in range(excluiveis)])
+    session.commit()
+    session.close()
+
+
+def cenarios() -> List[Cenario]:
+    def corpo_transacao(rng, massa):
+        return {"descricao": f"Nova {rng.random():.8f}", "tipo_transacao": rng.choice(["Receita", "Despesa"]),
+                "valor": round(rng.uniform(1, 1000), 2), "data_vencimento": "2025-06-10"}
+
+    def atualizacao_por_id(rng, massa):
+        # Preserva descrição e pedido ("Conta {pedido}") para as consultas por descrição e pedido continuarem achando
+        transacao_id = massa.id_aleatorio(rng)
+        return {"path": f"/transacao/{transacao_id}", "json": corpo_transacao(rng, massa) | {
+            "descricao": f"Conta {transacao_id - 1}", "pedido_id": transacao_id - 1, "pago": True}}
+
+    return [
+        Cenario("POST /transacao", "POST", lambda rng, m: {"path": "/transacao", "json": corpo_transacao(rng, m)}),
+        Cenario("POST /transacoes/lote", "POST", lambda rng, m: {
+            "path": "/transacoes/lote", "json": [corpo_transacao(rng, m) for _ in range(50)]}, peso=0),
+        Cenario("GET /transacoes", "GET", lambda rng, m: {"path": "/transacoes?limite=50"}, peso=4),
+        Cenario("GET /transacoes (cursor)", "GET", lambda rng, m: {
+            "path": f"/transacoes?limite=50&cursor={m.id_aleatorio(rng)}"}, peso=2),
+        Cenario("GET /transacoes/busca", "GET", lambda rng, m: {
+            "path": f"/transacoes/busca?termo=Conta%20{rng.randrange(100)}"}, peso=2),
+        Cenario("GET /transacoes/resumo", "GET", lambda rng, m: {"path": "/transacoes/resumo"}),
+        # A carga da massa gera uma mudança por transação: cursores até m.transacoes caem dentro do feed
+        Cenario("GET /transacoes/mudancas", "GET", lambda rng, m: {
+            "path": f"/transacoes/mudancas?desde={m.id_aleatorio(rng)}&limite=100"}),
+        Cenario("GET /transacao/<id>", "GET", lambda rng, m: {"path": f"/transacao/{m.id_aleatorio(rng)}"}, peso=6),
+        Cenario("GET /transacao/?descricao", "GET", lambda rng, m: {
+            "path": f"/transacao/?descricao=Conta%20{m.id_aleatorio(rng) - 1}"}),
+        Cenario("GET /transacoes/pedido/<id>", "GET", lambda rng, m: {
+            "path": f"/transacoes/pedido/{m.id_aleatorio(rng) - 1}"}, peso=6),
+        Cenario("PUT /transacao/<id>", "PUT", atualizacao_por_id),
+        Cenario("PUT /transacoes/pedido/<id>", "PUT", lambda rng, m: {
+            "path": f"/transacoes/pedido/{m.id_aleatorio(rng) - 1}", "json": {"valor": round(rng.uniform(1, 999), 2)}}),
+        Cenario("PUT /transacoes/pedido/<id>?upsert", "PUT", lambda rng, m: {
+            "path": f"/transacoes/pedido/{m.novo_pedido()}?upsert=true", "json": corpo_transacao(rng, m)}),
+        Cenario("PUT /transacoes/pedidos", "PUT", lambda rng, m: {"path": "/transacoes/pedidos", "json": {"eventos": [
+            {"pedido_id": pedido, "descricao": f"Conta {pedido}", "tipo_transacao": "Receita",
+             "valor": round(rng.uniform(1, 999), 2)} for pedido in rng.sample(range(m.transacoes), 20)]}}, peso=0),
+        Cenario("POST /transacoes/recorrencias", "POST", lambda rng, m: {"path": "/transacoes/recorrencias", "json": {
+            "descricao": f"Parcelado {rng.random():.8f}", "valor": round(rng.uniform(100, 5000), 2), "parcelado": True,
+            "quantidade": 12, "data_vencimento": "2025-06-10"}}, peso=0),
+        Cenario("POST /transacao/observacao", "POST", lambda rng, m: {
+            "path": "/transacao/observacao", "data": {"transacao_id": m.id_aleatorio(rng), "texto": "Benchmark"}}),
+        Cenario("POST /transacao/<id>/observacoes", "POST", lambda rng, m: {
+            "path": f"/transacao/{m.id_aleatorio(rng)}/observacoes",
+            "json": {"textos": [f"Benchmark {n}" for n in range(20)]}}),
+        Cenario("GET /transacao/<id>/observacoes", "GET", lambda rng, m: {
+            "path": f"/transacao/{m.id_aleatorio(rng)}/observacoes?limite=20"}, peso=2),
+        Cenario("DELETE /transacao", "DELETE", lambda rng, m: {
+            "path": f"/transacao?descricao=Excluir%20{m.proxima_exclusao()}"}),
+        # "Excluir {k}" foi inserida logo após as transações: id = transacoes + 1 + k
+        Cenario("DELETE /transacao/<id>", "DELETE", lambda rng, m: {
+            "path": f"/transacao/{m.transacoes + 1 + m.proxima_exclusao()}"}),
+    ]
+
+
+def _executar(cliente, cenario: Cenario, rng: random.Random, massa: Massa):
+    requisicao = cenario.montar(rng, massa)
+    caminho = requisicao.pop("path")
+    inicio = time.perf_counter()
+    resposta = cliente.open(caminho, method=cenario.metodo, **requisicao)
+    resposta.get_data()
+    return time.perf_counter() - inicio, resposta.status_code
+
+
+def _resumir(latencias: List[float], status: Dict[int, int], decorrido: float) -> dict:
+    ordenadas = sorted(latencias)
+    quantis = statistics.quantiles(ordenadas, n=100) if len(ordenadas) > 1 else [ordenadas[0] if ordenadas else 0.0] * 99
+    return {"requisicoes": len(ordenadas),
+            "requisicoes_por_segundo": round(len(ordenadas) / decorrido, 1) if decorrido else 0.0,
+            "latencia_ms": {"p50": round(quantis[49] * 1000, 3), "p95": round(quantis[94] * 1000, 3),
+                            "p99": round(quantis[98] * 1000, 3),
+                            "max": round(ordenadas[-1] * 1000, 3) if ordenadas else 0.0},
+            "status": {str(codigo): quantidade for codigo, quantidade in sorted(status.items())}}
+
+
+def fase_sequencial(app, lista: List[Cenario], massa: Massa, requisicoes: int, semente: int) -> dict:
+    cliente = app.test_client()
+    rng = random.Random(semente)
+    resultados = {}
+    for cenario in lista:
+        for _ in range(min(10, requisicoes)):
+            _executar(cliente, cenario, rng, massa)
+        latencias, status = [], {}
+        inicio = time.perf_counter()
+        for _ in range(requisicoes):
+            latencia, codigo = _executar(cliente, cenario, rng, massa)
+            latencias.append(latencia)
+            status[codigo] = status.get(codigo, 0) + 1
+        resultados[cenario.nome] = _resumir(latencias, status, time.perf_counter() - inicio)
+    return resultados
+
+
+def fase_memoria(app, lista: List[Cenario], massa: Massa, requisicoes: int, semente: int) -> dict:
+    """Pico de memória Python alocada (tracemalloc) durante uma requisição de cada rota, em KiB."""
+    cliente = app.test_client()
+    rng = random.Random(semente)
+    picos = {}
+    tracemalloc.start()
+    try:
+        for cenario in lista:
+            maior = 0
+            for _ in range(requisicoes):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                _executar(cliente, cenario, rng, massa)
+                maior = max(maior, tracemalloc.get_traced_memory()[1] - base)
+            picos[cenario.nome] = round(maior / 1024, 1)
+    finally:
+        tracemalloc.stop()
+    return picos
+
+
+def fase_carga(app, lista: List[Cenario], massa: Massa, duracao: float, concorrencia: int, semente: int) -> dict:
+    mix = [cenario for cenario in lista if cenario.peso > 0]
+    pesos = [cenario.peso for cenario in mix]
+    por_rota = {cenario.nome: ([], {}) for cenario in mix}
+    lock = threading.Lock()
+    fim = time.monotonic() + duracao
+
+    def cliente_carga(indice: int):
+        cliente = app.test_client()
+        rng = random.Random(semente + indice)
+        locais = {cenario.nome: ([], {}) for cenario in mix}
+        while time.monotonic() < fim:
+            cenario = rng.choices(mix, pesos)[0]
+            latencia, codigo = _executar(cliente, cenario, rng, massa)
+            latencias, status = locais[cenario.nome]
+            latencias.append(latencia)
+            status[codigo] = status.get(codigo, 0) + 1
+        with lock:
+            for nome, (latencias, status) in locais.items():
+                por_rota[nome][0].extend(latencias)
+                for codigo, quantidade in status.items():
+                    por_rota[nome][1][codigo] = por_rota[nome][1].get(codigo, 0) + quantidade
+
+    threads = [threading.Thread(target=cliente_carga, args=(i,)) for i in range(concorrencia)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+
+    todas, status_total = [], {}
+    for latencias, status in por_rota.values():
+        todas.extend(latencias)
+        for codigo, quantidade in status.items():
+            status_total[codigo] = status_total.get(codigo, 0) + quantidade
+    return {"concorrencia": concorrencia, "duracao_s": round(decorrido, 2),
+            "total": _resumir(todas, status_total, decorrido),
+            "rotas": {nome: _resumir(latencias, status, decorrido)
+                      for nome, (latencias, status) in por_rota.items() if latencias}}
+
+
+def _metadados(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(), "cpus": os.cpu_count(), "parametros": vars(args)}
+
+
+def comparar(atual: dict, anterior: dict, tolerancia: float) -> List[str]:
+    """Compara p95 por rota (fase sequencial) e a vazão total da carga; devolve as regressões."""
+    regressoes = []
+    print(f"\nComparação com {anterior['metadados'].get('commit')} (tolerância {tolerancia:.0%}):")
+    for nome, resultado in atual["rotas"].items():
+        base = anterior.get("rotas", {}).get(nome)
+        if base is None or not base["latencia_ms"]["p95"]:
+            continue
+        variacao = resultado["latencia_ms"]["p95"] / base["latencia_ms"]["p95"] - 1
+        marca = "REGRESSÃO" if variacao > tolerancia else ""
+        print(f"  {nome:<40} p95 {base['latencia_ms']['p95']:>9.3f} -> {resultado['latencia_ms']['p95']:>9.3f} ms "
+              f"({variacao:+.1%}) {marca}")
+        if marca:
+            regressoes.append(f"{nome}: p95 {variacao:+.1%}")
+    if "carga" in atual and "carga" in anterior:
+        antes = anterior["carga"]["total"]["requisicoes_por_segundo"]
+        depois = atual["carga"]["total"]["requisicoes_por_segundo"]
+        variacao = depois / antes - 1 if antes else 0.0
+        marca = "REGRESSÃO" if variacao < -tolerancia else ""
+        print(f"  {'carga (req/s)':<40} {antes:>13.1f} -> {depois:>9.1f}    ({variacao:+.1%}) {marca}")
+        if marca:
+            regressoes.append(f"carga: vazão {variacao:+.1%}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transacoes", type=int, default=20000, help="transações no banco de teste")
+    parser.add_argument("--observacoes-a-cada", type=int, default=3, help="uma observação a cada K transações")
+    parser.add_argument("--requisicoes", type=int, default=300, help="requisições por rota na fase sequencial")
+    parser.add_argument("--requisicoes-memoria", type=int, default=20, help="requisições por rota na medição de memória")
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos da fase de carga (0 desliga)")
+    parser.add_argument("--concorrencia", type=int, default=8, help="threads da fase de carga")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="grava o resultado em JSON neste arquivo")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita antes de sinalizar")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="econome_api_bench_")
+    app = create_app({"DATABASE_URL": f"sqlite:///{os.path.join(diretorio, 'bench.sqlite3')}",
+                      "CONFIGURAR_LOGGING": False, "LOG_REQUISICOES": "0"})
+    # Folga para as duas rotas de exclusão na fase sequencial, na de memória e na de carga
+    excluiveis = (args.requisicoes * 2 + args.requisicoes_memoria) * 2 + 20000
+    inicio = time.perf_counter()
+    popular(args.transacoes, args.observacoes_a_cada, excluiveis)
+    print(f"Banco populado com {args.transacoes} transações em {time.perf_counter() - inicio:.1f}s ({diretorio})")
+
+    massa = Massa(args.transacoes, excluiveis)
+    lista = cenarios()
+    resultado = {"metadados": _metadados(args)}
+    resultado["rotas"] = fase_sequencial(app, lista, massa, args.requisicoes, args.semente)
+    for nome, r in resultado["rotas"].items():
+        print(f"{nome:<40}{r['requisicoes_por_segundo']:>9.1f} req/s  p50={r['latencia_ms']['p50']:.3f}ms "
+              f"p95={r['latencia_ms']['p95']:.3f}ms p99={r['latencia_ms']['p99']:.3f}ms status={r['status']}")
+
+    resultado["memoria_pico_kib"] = fase_memoria(app, lista, massa, args.requisicoes_memoria, args.semente)
+    if args.duracao > 0:
+        resultado["carga"] = fase_carga(app, lista, massa, args.duracao, args.concorrencia, args.semente)
+        total = resultado["carga"]["total"]
+        print(f"{'carga (mix)':<40}{total['requisicoes_por_segundo']:>9.1f} req/s  p50={total['latencia_ms']['p50']:.3f}ms "
+              f"p95={total['latencia_ms']['p95']:.3f}ms p99={total['latencia_ms']['p99']:.3f}ms status={total['status']}")
+    # ru_maxrss é em KiB no Linux e em bytes no macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    resultado["memoria_rss_maxima_mib"] = round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    print(f"RSS máxima do processo: {resultado['memoria_rss_maxima_mib']} MiB")
+
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            print("Regressões: " + "; ".join(regressoes))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Teste de carga comparando o servidor de desenvolvimento do Flask com o gunicorn (gunicorn.conf.py).
+
+Cada servidor sobe em um subprocesso sobre um banco SQLite temporário, populado via POST /transacoes/lote,
+e recebe requisições concorrentes (conexões keep-alive) em rotas de leitura durante um tempo fixo.
+São reportadas requisições/s e latências p50/p95/p99.
+
+Uso:
+    python -m benchmarks.carga_servidor --duracao 10 --concorrencia 16 --workers 4
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _aguardar(porta: int, processo: subprocess.Popen, limite: float = 60.0) -> None:
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError("Servidor encerrou durante a inicialização")
+        try:
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=1)
+            conexao.request("GET", "/monitoramento/pool")
+            conexao.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Servidor não respondeu a tempo")
+
+
+def _popular(porta: int, linhas: int) -> None:
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=60)
+    for base in range(0, linhas, 1000):
+        itens = [{"descricao": f"Conta {i}", "tipo_transacao": "Despesa" if i % 2 else "Receita",
+                  "valor": 10 + i % 500, "data_vencimento": f"2025-{i % 12 + 1:02d}-10", "pedido_id": i,
+                  "participant_id": i % 20} for i in range(base, min(base + 1000, linhas))]
+        conexao.request("POST", "/transacoes/lote", body=json.dumps(itens),
+                        headers={"Content-Type": "application/json"})
+        conexao.getresponse().read()
+
+
+def _rotas(linhas: int):
+    return [
+        lambda: "/transacoes?limite=50",
+        lambda: f"/transacoes/pedido/{random.randrange(linhas)}",
+        lambda: f"/transacao/{random.randrange(1, linhas + 1)}",
+        lambda: "/transacoes/resumo",
+        lambda: "/transacoes/busca?termo=Conta%201",
+    ]
+
+
+def _gerar_carga(porta: int, duracao: float, concorrencia: int, linhas: int) -> dict:
+    rotas = _rotas(linhas)
+    latencias, erros = [], [0]
+    lock = threading.Lock()
+    fim = time.monotonic() + duracao
+
+    def cliente():
+        conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+        locais, falhas = [], 0
+        while time.monotonic() < fim:
+            caminho = random.choice(rotas)()
+            inicio = time.perf_counter()
+            try:
+                conexao.request("GET", caminho)
+                resposta = conexao.getresponse()
+                resposta.read()
+                if resposta.status >= 500:
+                    falhas += 1
+            except (OSError, http.client.HTTPException):
+                falhas += 1
+                conexao.close()
+                conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+                continue
+            locais.append(time.perf_counter() - inicio)
+        with lock:
+            latencias.extend(locais)
+            erros[0] += falhas
+
+    threads = [threading.Thread(target=cliente) for _ in range(concorrencia)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+
+    latencias.sort()
+    quantis = statistics.quantiles(latencias, n=100) if len(latencias) > 1 else [0.0] * 99
+    return {"requisicoes": len(latencias), "erros": erros[0],
+            "requisicoes_por_segundo": round(len(latencias) / decorrido, 1),
+            "latencia_ms": {"p50": round(quantis[49] * 1000, 2), "p95": round(quantis[94] * 1000, 2),
+                            "p99": round(quantis[98] * 1000, 2)}}
+
+
+def _comando(servidor: str, porta: int, args) -> list:
+    if servidor == "dev":
+        # Equivalente ao "python app.py" (debug=True), sem o reloader para controlar o processo
+        return [sys.executable, "-c",
+                f"from app import create_app; create_app().run(host='127.0.0.1', port={porta}, debug=True, "
+                f"use_reloader=False)"]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{porta}",
+            "--workers", str(args.workers), "--threads", str(args.threads)]
+
+
+def medir_servidor(servidor: str, args) -> dict:
+    diretorio = tempfile.mkdtemp(prefix=f"econome_carga_{servidor}_")
+    porta = _porta_livre()
+    ambiente = os.environ | {"DATABASE_URL": f"sqlite:///{os.path.join(diretorio, 'carga.sqlite3')}"}
+    with open(os.path.join(diretorio, "servidor.log"), "w") as log:
+        processo = subprocess.Popen(_comando(servidor, porta, args), cwd=RAIZ, env=ambiente,
+                                    stdout=log, stderr=subprocess.STDOUT)
+        try:
+            _aguardar(porta, processo)
+            _popular(porta, args.linhas)
+            return _gerar_carga(porta, args.duracao, args.concorrencia, args.linhas)
+        finally:
+            processo.terminate()
+            processo.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos de carga por servidor")
+    parser.add_argument("--concorrencia", type=int, default=16, help="clientes simultâneos")
+    parser.add_argument("--linhas", type=int, default=5000, help="transações no banco de teste")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() * 2 + 1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--servidores", default="dev,gunicorn", help="lista separada por vírgula")
+    parser.add_argument("--saida", help="grava o resultado em JSON neste arquivo")
+    args = parser.parse_args()
+
+    resultados = {}
+    for servidor in args.servidores.split(","):
+        resultados[servidor] = medir_servidor(servidor, args)
+        r = resultados[servidor]
+        print(f"{servidor:<10}{r['requisicoes_por_segundo']:>10.1f} req/s  p50={r['latencia_ms']['p50']}ms "
+              f"p95={r['latencia_ms']['p95']}ms p99={r['latencia_ms']['p99']}ms erros={r['erros']}")
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
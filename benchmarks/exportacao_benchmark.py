@@ -0,0 +1,120 @@
+"""Benchmark da exportação de transações (GET /transacoes/export) em CSV, NDJSON e Parquet.
+
+Popula um banco SQLite temporário com N transações (padrão: 1 milhão) e baixa a exportação completa
+em cada formato pelo test client do Flask, consumindo a resposta em streaming sem guardá-la. Mede
+tempo, linhas por segundo e bytes gerados; uma segunda passada com tracemalloc mede o pico de
+memória Python alocada durante a exportação (e, no Parquet, o pico do pool de memória do Arrow),
+que deve depender do tamanho do lote e não de N.
+
+Uso:
+    python -m benchmarks.exportacao_benchmark --linhas 1000000 --saida resultado.json
+    python -m benchmarks.exportacao_benchmark --linhas 1000000 --tamanho-lote 50000 --sem-memoria
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import create_app
+from database.connection import Session
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.transacao_model import TransacaoModel
+from services.transacao.exportacao_service import TAMANHO_LOTE_EXPORTACAO, parquet_disponivel, pyarrow
+
+
+def popular(linhas: int) -> None:
+    session = Session()
+    inicio = date(2024, 1, 1)
+    tipos = [TipoTransacao.RECEITA, TipoTransacao.DESPESA]
+    agora = datetime.now()
+    for base in range(0, linhas, 20000):
+        session.execute(insert(TransacaoModel), [
+            {"descricao": f"Transação {i}", "tipo_transacao": tipos[i % 2], "valor": round(10 + i * 0.37, 2),
+             "data_inclusao": agora, "pago": i % 3 == 0, "data_vencimento": inicio + timedelta(days=i % 730),
+             "data_pagamento": inicio + timedelta(days=i % 700) if i % 3 == 0 else None,
+             "pedido_id": i, "participant_id": i % 50}
+            for i in range(base, min(base + 20000, linhas))])
+        session.commit()
+    session.close()
+
+
+def baixar(cliente, formato: str) -> int:
+    """Consome a exportação em streaming e retorna o total de bytes recebidos."""
+    resposta = cliente.get(f"/transacoes/export?formato={formato}")
+    if resposta.status_code != 200:
+        raise RuntimeError(f"{formato}: status {resposta.status_code}")
+    total = sum(len(parte) for parte in resposta.iter_encoded())
+    resposta.close()
+    return total
+
+
+def medir_tempo(cliente, formato: str, linhas: int) -> dict:
+    inicio = time.perf_counter()
+    tamanho = baixar(cliente, formato)
+    decorrido = time.perf_counter() - inicio
+    return {"segundos": round(decorrido, 2), "linhas_por_segundo": round(linhas / decorrido),
+            "mib": round(tamanho / (1024 * 1024), 1)}
+
+
+def medir_memoria(cliente, formato: str) -> dict:
+    if formato == "parquet":
+        pyarrow.default_memory_pool().release_unused()
+    tracemalloc.start()
+    try:
+        baixar(cliente, formato)
+        resultado = {"pico_python_mib": round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)}
+    finally:
+        tracemalloc.stop()
+    if formato == "parquet":
+        resultado["pico_arrow_mib"] = round(pyarrow.default_memory_pool().max_memory() / (1024 * 1024), 1)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1000000)
+    parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_EXPORTACAO,
+                        help="linhas por lote (EXPORTACAO_TAMANHO_LOTE)")
+    parser.add_argument("--sem-memoria", action="store_true", help="pula a passada com tracemalloc (lenta)")
+    parser.add_argument("--saida", help="grava o resultado em JSON neste arquivo")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="econome_export_bench_")
+    app = create_app({"DATABASE_URL": f"sqlite:///{os.path.join(diretorio, 'bench.sqlite3')}",
+                      "CONFIGURAR_LOGGING": False, "LOG_REQUISICOES": "0", "METRICAS": "0",
+                      "EXPORTACAO_TAMANHO_LOTE": args.tamanho_lote})
+    inicio = time.perf_counter()
+    popular(args.linhas)
+    print(f"Banco populado com {args.linhas} transações em {time.perf_counter() - inicio:.1f}s ({diretorio})")
+
+    cliente = app.test_client()
+    formatos = ["csv", "ndjson"] + (["parquet"] if parquet_disponivel() else [])
+    if not parquet_disponivel():
+        print("pyarrow não instalado: Parquet fora da medição")
+    resultado = {"linhas": args.linhas, "tamanho_lote": args.tamanho_lote, "formatos": {}}
+    for formato in formatos:
+        medidas = medir_tempo(cliente, formato, args.linhas)
+        if not args.sem_memoria:
+            medidas |= medir_memoria(cliente, formato)
+        resultado["formatos"][formato] = medidas
+        print(f"{formato:<8}{medidas['segundos']:>8.2f}s {medidas['linhas_por_segundo']:>10} linhas/s "
+              f"{medidas['mib']:>8.1f} MiB" + "".join(f"  {nome}={valor}" for nome, valor in medidas.items()
+                                                     if nome.startswith("pico")))
+    # ru_maxrss é em KiB no Linux e em bytes no macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    resultado["memoria_rss_maxima_mib"] = round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    print(f"RSS máxima do processo: {resultado['memoria_rss_maxima_mib']} MiB")
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Mede o tempo de importação e de inicialização da aplicação e verifica que importar não faz I/O.
+
+Em um subprocesso limpo (diretório de trabalho temporário, sem bytecode), um audit hook registra
+durante a importação dos pacotes da aplicação qualquer escrita em arquivo, criação de diretório,
+conexão SQLite ou socket. Em seguida create_app() é executado e o tempo de cada etapa é reportado.
+Sai com código 1 se a importação tiver efeitos colaterais.
+
+Uso:
+    python -m benchmarks.inicializacao_benchmark [--saida resultado.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+_SCRIPT = r"""
+import json, os, sys, time
+
+eventos = []
+monitorando = True
+ESCRITA = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+def auditar(evento, args):
+    if not monitorando:
+        return
+    if evento == "open":
+        caminho, modo, flags = args
+        escrita = (isinstance(modo, str) and any(c in modo for c in "wax+")) or (flags or 0) & ESCRITA
+        if escrita:
+            eventos.append(f"open({caminho!r}, {modo!r})")
+    elif evento in ("os.mkdir", "os.makedirs", "sqlite3.connect", "socket.connect", "os.remove", "os.rename"):
+        eventos.append(f"{evento}{args!r}")
+
+sys.addaudithook(auditar)
+inicio = time.perf_counter()
+import app
+import commands.consolidacao_command, database.connection, repositories.transacao.transacao_repository
+import services.transacao.lote_service, services.transacao.upsert_service, utils.logger
+tempo_importacao = time.perf_counter() - inicio
+monitorando = False
+
+inicio = time.perf_counter()
+aplicacao = app.create_app()
+tempo_create_app = time.perf_counter() - inicio
+with open(sys.argv[1], "w") as saida:
+    json.dump({"eventos_io_na_importacao": eventos, "importacao_ms": tempo_importacao * 1000,
+               "create_app_ms": tempo_create_app * 1000,
+               "etapas_ms": {k: v * 1000 for k, v in aplicacao.extensions["tempos_inicializacao"].items()}}, saida)
+"""
+
+
+def medir() -> dict:
+    diretorio = tempfile.mkdtemp(prefix="econome_init_")
+    ambiente = os.environ | {
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(RAIZ), os.environ.get("PYTHONPATH")])),
+        "DATABASE_URL": f"sqlite:///{os.path.join(diretorio, 'init.sqlite3')}",
+    }
+    # O resultado vai para um arquivo: no stdout ele se misturaria aos logs da aplicação (escritos por outra thread)
+    resultado = os.path.join(diretorio, "resultado.json")
+    subprocess.run([sys.executable, "-c", _SCRIPT, resultado], cwd=diretorio, env=ambiente,
+                   capture_output=True, text=True, check=True)
+    with open(resultado) as arquivo:
+        return json.load(arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", help="grava o resultado em JSON neste arquivo")
+    args = parser.parse_args()
+
+    resultado = medir()
+    print(f"importação: {resultado['importacao_ms']:.1f} ms")
+    print(f"create_app: {resultado['create_app_ms']:.1f} ms "
+          f"({', '.join(f'{k}={v:.1f}ms' for k, v in resultado['etapas_ms'].items())})")
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+    if resultado["eventos_io_na_importacao"]:
+        print("Importação com efeitos colaterais:")
+        for evento in resultado["eventos_io_na_importacao"]:
+            print(f"  {evento}")
+        sys.exit(1)
+    print("Importação sem I/O: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark do custo por linha da leitura e serialização da listagem de transações.
+
+Compara o caminho ORM (TransacaoModel hidratado + selectinload + apresenta_transacoes + encoder da
+biblioteca padrão) com o caminho rápido (tuplas via Core + dicts + orjson), sobre um banco SQLite
+temporário populado com N transações.
+
+Uso:
+    python -m benchmarks.serializacao_benchmark --linhas 100000
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# O banco precisa estar definido antes de importar os módulos que criam o engine
+_diretorio = tempfile.mkdtemp(prefix="econome_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_diretorio, 'bench.sqlite3')}")
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from database.config import ConfiguracaoBanco  # noqa: E402
+from database.connection import Session, init_banco  # noqa: E402
+from model.transacao.enums.tipo_transacao_model import TipoTransacao  # noqa: E402
+from model.transacao.observacao_model import ObservacaoModel  # noqa: E402
+from model.transacao.transacao_model import TransacaoModel  # noqa: E402
+from repositories.transacao.transacao_repository import iterar_linhas, select_transacoes  # noqa: E402
+from schemas.transacao.transacao_schema import TransacaoFiltroSchema, apresenta_transacoes  # noqa: E402
+from utils.json_provider import JSONProviderRapido, orjson  # noqa: E402
+
+
+def popular(linhas: int, observacoes_a_cada: int) -> None:
+    session = Session()
+    if session.scalar(select(TransacaoModel.id).limit(1)) is not None:
+        return
+    inicio = date(2024, 1, 1)
+    tipos = [TipoTransacao.RECEITA, TipoTransacao.DESPESA]
+    for base in range(0, linhas, 10000):
+        session.execute(insert(TransacaoModel), [
+            {"descricao": f"Transação {i}", "tipo_transacao": tipos[i % 2], "valor": round(10 + i * 0.37, 2),
+             "data_inclusao": datetime.now(), "pago": i % 3 == 0, "data_vencimento": inicio + timedelta(days=i % 730),
+             "data_pagamento": inicio + timedelta(days=i % 700) if i % 3 == 0 else None,
+             "pedido_id": i, "participant_id": i % 50}
+            for i in range(base, min(base + 10000, linhas))])
+    ids = session.scalars(select(TransacaoModel.id).where(TransacaoModel.id % observacoes_a_cada == 0)).all()
+    session.execute(insert(ObservacaoModel), [{"fk_id_produto": i, "texto": f"Observação {i}",
+                                               "data_inclusao": datetime.now()} for i in ids])
+    session.commit()
+    session.close()
+
+
+def medir(funcao):
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def executar(linhas: int, repeticoes: int) -> dict:
+    app = Flask(__name__)
+    padrao, rapido = DefaultJSONProvider(app), JSONProviderRapido(app)
+    filtros = TransacaoFiltroSchema()
+    resultados = {}
+
+    for _ in range(repeticoes):
+        session = Session()
+        transacoes, t_orm = medir(lambda: list(session.scalars(select_transacoes().order_by(TransacaoModel.id))))
+        dicts, t_apresenta = medir(lambda: apresenta_transacoes(transacoes)["transacoes"])
+        _, t_json_padrao = medir(lambda: padrao.dumps(dicts))
+        session.close()
+
+        session = Session()
+        linhas_core, t_core = medir(lambda: list(iterar_linhas(session, filtros)))
+        _, t_orjson = medir(lambda: rapido.dumps(linhas_core))
+        _, t_stdlib_core = medir(lambda: padrao.dumps(linhas_core))
+        session.close()
+
+        for nome, valor in {"orm_consulta_hidratacao": t_orm, "orm_apresenta": t_apresenta,
+                            "orm_json_stdlib": t_json_padrao, "core_consulta_dicts": t_core,
+                            "core_json_orjson": t_orjson, "core_json_stdlib": t_stdlib_core}.items():
+            resultados[nome] = min(resultados.get(nome, valor), valor)
+
+    resultados["orm_total"] = resultados["orm_consulta_hidratacao"] + resultados["orm_apresenta"] + \
+        resultados["orm_json_stdlib"]
+    resultados["core_total"] = resultados["core_consulta_dicts"] + resultados["core_json_orjson"]
+    return {"linhas": linhas, "orjson": orjson is not None,
+            "microssegundos_por_linha": {nome: round(valor / linhas * 1e6, 3) for nome, valor in resultados.items()},
+            "speedup_total": round(resultados["orm_total"] / resultados["core_total"], 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--observacoes-a-cada", type=int, default=10, help="uma observação a cada N transações")
+    parser.add_argument("--repeticoes", type=int, default=3, help="melhor de N execuções")
+    parser.add_argument("--saida", help="grava o resultado em JSON neste arquivo")
+    args = parser.parse_args()
+
+    init_banco(ConfiguracaoBanco.from_env())
+    popular(args.linhas, args.observacoes_a_cada)
+    resultado = executar(args.linhas, args.repeticoes)
+    for nome, valor in resultado["microssegundos_por_linha"].items():
+        print(f"{nome:<26}{valor:>10.3f} µs/linha")
+    print(f"{'speedup_total':<26}{resultado['speedup_total']:>10.2f}x (orjson={'sim' if resultado['orjson'] else 'não'})")
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+import click
+
+from database.connection import obter_engine
+from repositories.transacao.arquivo_repository import listar_catalogo
+from services.transacao.arquivo_service import arquivar_liquidadas, idade_arquivamento, tamanho_lote_arquivamento
+
+
+def config_arquivo_commands(app):
+    @app.cli.group("arquivo")
+    def arquivo():
+        """Arquivo frio das transações liquidadas (tabelas por ano de vencimento)."""
+
+    @arquivo.command("arquivar")
+    @click.option("--idade-dias", type=float, default=None,
+                  help="Arquiva as pagas com vencimento há mais de N dias (padrão: ARQUIVO_IDADE_DIAS)")
+    def arquivar(idade_dias):
+        """Move para o arquivo, em lotes, as transações pagas antigas e suas observações."""
+        idade = idade_arquivamento(app) if idade_dias is None else timedelta(days=idade_dias)
+        por_ano = arquivar_liquidadas(obter_engine(), idade, tamanho_lote_arquivamento(app))
+        for ano, quantidade in sorted(por_ano.items()):
+            click.echo(f"{ano}: {quantidade} transação(ões)")
+        click.echo(f"Arquivamento concluído: {sum(por_ano.values())} transação(ões) arquivada(s).")
+
+    @arquivo.command("listar")
+    def listar():
+        """Lista os anos arquivados com a quantidade de transações de cada um."""
+        with obter_engine().connect() as conn:
+            catalogo = listar_catalogo(conn)
+        if not catalogo:
+            click.echo("Nenhuma transação arquivada.")
+        for linha in catalogo:
+            click.echo(f"{linha.ano}: {linha.quantidade} transação(ões), ids {linha.id_minimo}..{linha.id_maximo}, "
+                       f"atualizado em {linha.data_atualizacao:%Y-%m-%d %H:%M}")
@@ -0,0 +1,31 @@
+import click
+
+from database.connection import obter_engine
+from services.transacao.consolidacao_service import reconstruir_consolidado, verificar_consolidado
+
+
+def config_consolidacao_commands(app):
+    @app.cli.group("consolidacao")
+    def consolidacao():
+        """Manutenção da tabela de consolidado (resumo_transacao)."""
+
+    @consolidacao.command("verificar")
+    def verificar():
+        """Recalcula o consolidado em memória e reporta as divergências (drift) encontradas."""
+        with obter_engine().connect() as conn:
+            divergencias = verificar_consolidado(conn)
+        if not divergencias:
+            click.echo("Consolidado íntegro: nenhuma divergência encontrada.")
+            return
+        for d in divergencias:
+            click.echo(f"mes={d['mes']} participant_id={d['participant_id']} tipo={d['tipo_transacao']} "
+                       f"pago={d['pago']}: quantidade {d['quantidade_consolidada']} (real {d['quantidade_real']}), "
+                       f"total {d['total_consolidado']:.2f} (real {d['total_real']:.2f})")
+        raise click.ClickException(f"{len(divergencias)} divergência(s) no consolidado")
+
+    @consolidacao.command("reconstruir")
+    def reconstruir():
+        """Reconstrói o consolidado do zero a partir da tabela transacao."""
+        with obter_engine().begin() as conn:
+            linhas = reconstruir_consolidado(conn)
+        click.echo(f"Consolidado reconstruído: {linhas} linha(s).")
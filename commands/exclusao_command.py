@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+import click
+
+from database.connection import obter_engine
+from services.transacao.exclusao_service import expurgar_excluidas, retencao_expurgo, tamanho_lote_expurgo
+from services.transacao.upsert_service import expurgar_chaves_idempotencia, retencao_idempotencia
+
+
+def config_exclusao_commands(app):
+    @app.cli.group("exclusao")
+    def exclusao():
+        """Manutenção das transações excluídas logicamente e das chaves de idempotência."""
+
+    @exclusao.command("expurgar")
+    @click.option("--retencao-dias", type=float, default=None,
+                  help="Expurga as excluídas há mais que N dias (padrão: EXPURGO_RETENCAO_DIAS)")
+    def expurgar(retencao_dias):
+        """Remove fisicamente, em lotes, as transações excluídas logicamente e suas observações."""
+        retencao = retencao_expurgo(app) if retencao_dias is None else timedelta(days=retencao_dias)
+        total = expurgar_excluidas(obter_engine(), retencao, tamanho_lote_expurgo(app))
+        click.echo(f"Expurgo concluído: {total} transação(ões) removida(s).")
+
+    @exclusao.command("expurgar-chaves")
+    @click.option("--retencao-dias", type=float, default=None,
+                  help="Remove as chaves gravadas há mais que N dias (padrão: IDEMPOTENCIA_RETENCAO_DIAS)")
+    def expurgar_chaves(retencao_dias):
+        """Remove as chaves de idempotência de eventos de Pedidos mais antigas que a retenção."""
+        retencao = retencao_idempotencia(app) if retencao_dias is None else timedelta(days=retencao_dias)
+        total = expurgar_chaves_idempotencia(obter_engine(), retencao)
+        click.echo(f"Expurgo concluído: {total} chave(s) de idempotência removida(s).")
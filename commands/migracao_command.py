@@ -0,0 +1,25 @@
+import click
+
+from database.connection import obter_engine, preparar_esquema
+from database.migracoes import listar_migracoes, versoes_aplicadas
+
+
+def config_migracao_commands(app):
+    @app.cli.group("migracoes")
+    def migracoes():
+        """Migrações versionadas do esquema do banco (tabela versao_esquema)."""
+
+    @migracoes.command("status")
+    def status():
+        """Lista as migrações disponíveis, indicando as já aplicadas e as pendentes."""
+        with obter_engine().connect() as conn:
+            aplicadas = set(versoes_aplicadas(conn))
+        for migracao in listar_migracoes():
+            situacao = "aplicada" if migracao.versao in aplicadas else "pendente"
+            click.echo(f"{migracao.versao:04d} [{situacao}] {migracao.descricao}")
+
+    @migracoes.command("aplicar")
+    def aplicar():
+        """Cria o banco, se necessário, e aplica as migrações pendentes."""
+        quantidade = preparar_esquema(obter_engine())
+        click.echo(f"{quantidade} migração(ões) aplicada(s).")
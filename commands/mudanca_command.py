@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+import click
+
+from database.connection import obter_engine
+from services.transacao.mudanca_service import expurgar_mudancas_antigas, retencao_mudancas
+
+
+def config_mudanca_commands(app):
+    @app.cli.group("mudancas")
+    def mudancas():
+        """Manutenção do feed de mudanças das transações (transacao_mudanca)."""
+
+    @mudancas.command("expurgar")
+    @click.option("--retencao-dias", type=float, default=None,
+                  help="Remove as mudanças com mais de N dias (padrão: MUDANCAS_RETENCAO_DIAS)")
+    def expurgar(retencao_dias):
+        """Remove do feed as mudanças antigas (a mais recente é sempre mantida)."""
+        retencao = retencao_mudancas(app) if retencao_dias is None else timedelta(days=retencao_dias)
+        total = expurgar_mudancas_antigas(obter_engine(), retencao)
+        click.echo(f"Expurgo concluído: {total} mudança(s) removida(s).")
@@ -0,0 +1,121 @@
+"""Arquivo frio das transações liquidadas: tabelas por ano de vencimento.
+
+transacao_arquivo_AAAA e observacao_arquivo_AAAA têm as colunas de transacao e observacao (nomes do
+banco) e são criadas pelo arquivamento à medida que os anos aparecem; o catálogo arquivo_transacao
+registra quais existem. Com ARQUIVO_SQLITE as tabelas ficam em outro arquivo SQLite, anexado (ATTACH)
+a cada conexão do pool com o nome "arquivo", e o banco principal guarda apenas o catálogo e
+pedido_arquivado. Colunas novas em transacao exigem o mesmo ALTER nas tabelas de arquivo existentes.
+
+Triggers (apenas SQLite):
+- os de exclusão do consolidado e do feed ignoram as linhas listadas em transacao_arquivamento, que o
+  arquivamento preenche enquanto move um lote: o consolidado continua contando as arquivadas e o feed
+  não registra exclusão;
+- pedido_arquivado_bi/_bu recusam em transacao um pedido_id já arquivado, com o mesmo erro de
+  unicidade de transacao.pedido_id.
+"""
+import threading
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+from sqlalchemy import Column, Index, MetaData, Table, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.transacao_model import TransacaoModel
+from utils.logger import logger
+
+# Nome do banco anexado com ARQUIVO_SQLITE
+ESQUEMA_ARQUIVO = "arquivo"
+
+# Condição dos triggers AFTER DELETE de transacao que não devem tratar o arquivamento como exclusão
+CONDICAO_NAO_ARQUIVANDO = ("NOT EXISTS (SELECT 1 FROM transacao_arquivamento "
+                           "WHERE transacao_id = old.pk_transacao)")
+
+_ERRO_PEDIDO = "'UNIQUE constraint failed: transacao.pedido_id'"
+
+_DDL_GATILHOS = [
+    f"""CREATE TRIGGER IF NOT EXISTS pedido_arquivado_bi BEFORE INSERT ON transacao
+        WHEN new.pedido_id IS NOT NULL
+             AND EXISTS (SELECT 1 FROM pedido_arquivado WHERE pedido_id = new.pedido_id) BEGIN
+        SELECT RAISE(ABORT, {_ERRO_PEDIDO});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pedido_arquivado_bu BEFORE UPDATE OF pedido_id ON transacao
+        WHEN new.pedido_id IS NOT NULL AND new.pedido_id IS NOT old.pedido_id
+             AND EXISTS (SELECT 1 FROM pedido_arquivado WHERE pedido_id = new.pedido_id) BEGIN
+        SELECT RAISE(ABORT, {_ERRO_PEDIDO});
+    END""",
+]
+
+
+@dataclass(frozen=True)
+class TabelasArquivo:
+    ano: int
+    transacao: Table
+    observacao: Table
+    # Colunas de transacao pelos nomes dos atributos de TransacaoModel (id, pago, ...), para os mesmos filtros
+    colunas: SimpleNamespace
+
+
+# Esquema das tabelas de arquivo: None (banco principal) ou ESQUEMA_ARQUIVO, definido por registrar_banco_arquivo
+_esquema: Optional[str] = None
+_metadata = MetaData()
+_tabelas: Dict[int, TabelasArquivo] = {}
+_lock = threading.Lock()
+
+
+def _copiar_colunas(tabela: Table):
+    return [Column(coluna.name, coluna.type, primary_key=coluna.primary_key, autoincrement=False)
+            for coluna in tabela.columns]
+
+
+def tabelas_arquivo(ano: int) -> TabelasArquivo:
+    """Tabelas de arquivo do ano (definições SQLAlchemy; a criação no banco é feita por criar_tabelas_arquivo)."""
+    tabelas = _tabelas.get(ano)
+    if tabelas is not None:
+        return tabelas
+    with _lock:
+        if ano not in _tabelas:
+            sufixo = f"arquivo_{ano}"
+            transacao = Table(f"transacao_{sufixo}", _metadata, *_copiar_colunas(TransacaoModel.__table__),
+                              Index(f"ix_transacao_{sufixo}_pedido_id", "pedido_id"),
+                              Index(f"ix_transacao_{sufixo}_data_vencimento", "data_vencimento"),
+                              Index(f"ix_transacao_{sufixo}_recorrencia_parcela", "recorrencia_id", "parcela"),
+                              schema=_esquema)
+            observacao = Table(f"observacao_{sufixo}", _metadata, *_copiar_colunas(ObservacaoModel.__table__),
+                               Index(f"ix_observacao_{sufixo}_fk_id_produto_id", "fk_id_produto", "id"),
+                               schema=_esquema)
+            colunas = SimpleNamespace(**{atributo.key: transacao.c[atributo.columns[0].name]
+                                         for atributo in inspect(TransacaoModel).column_attrs})
+            _tabelas[ano] = TabelasArquivo(ano, transacao, observacao, colunas)
+        return _tabelas[ano]
+
+
+def criar_tabelas_arquivo(conn: Connection, ano: int) -> TabelasArquivo:
+    tabelas = tabelas_arquivo(ano)
+    tabelas.transacao.create(conn, checkfirst=True)
+    tabelas.observacao.create(conn, checkfirst=True)
+    return tabelas
+
+
+def registrar_banco_arquivo(engine: Engine, caminho: str) -> None:
+    """Anexa o arquivo SQLite do arquivo frio a cada nova conexão DBAPI do pool (criando-o se não existir)."""
+    global _esquema
+    _esquema = ESQUEMA_ARQUIVO
+
+    @event.listens_for(engine, "connect")
+    def anexar_arquivo(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"ATTACH DATABASE ? AS {ESQUEMA_ARQUIVO}", (caminho,))
+        finally:
+            cursor.close()
+
+
+def criar_gatilhos_arquivo(conn: Connection) -> None:
+    """Instala os triggers que reservam os pedido_id arquivados (idempotente)."""
+    if conn.dialect.name != "sqlite":
+        return
+    for ddl in _DDL_GATILHOS:
+        conn.execute(text(ddl))
+    logger.info("Triggers do arquivo de transações (pedido_arquivado) instalados")
@@ -0,0 +1,68 @@
+"""Índice de busca textual das descrições de transação (SQLite FTS5).
+
+A tabela virtual transacao_fts é do tipo "external content": não duplica o texto, apenas indexa
+a coluna descricao de transacao. Triggers mantêm o índice sincronizado em qualquer caminho de
+escrita (ORM, INSERT em lote, upsert e DELETE em massa). Em outros backends a busca textual
+recai sobre LIKE.
+"""
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from utils.logger import logger
+
+TABELA_FTS = "transacao_fts"
+
+_DDL_FTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        descricao, content='transacao', content_rowid='pk_transacao',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_fts_ai AFTER INSERT ON transacao BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, descricao) VALUES (new.pk_transacao, new.descricao);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_fts_ad AFTER DELETE ON transacao BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, descricao) VALUES ('delete', old.pk_transacao, old.descricao);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_fts_au AFTER UPDATE OF descricao ON transacao BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, descricao) VALUES ('delete', old.pk_transacao, old.descricao);
+        INSERT INTO {TABELA_FTS}(rowid, descricao) VALUES (new.pk_transacao, new.descricao);
+    END""",
+]
+
+
+def _indice_existe(conn: Connection) -> bool:
+    return conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+                        {"nome": TABELA_FTS}).first() is not None
+
+
+def busca_textual_disponivel(engine: Engine) -> bool:
+    """Indica se o índice FTS5 existe no banco do engine."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return _indice_existe(conn)
+
+
+def criar_indice_textual(conn: Connection) -> None:
+    """Cria (se necessário) o índice FTS5 e seus triggers, populando-o a partir das transações existentes.
+
+    Executa em um savepoint da transação da conexão, para que a falha (SQLite sem FTS5) não a invalide.
+    """
+    if conn.dialect.name != "sqlite" or _indice_existe(conn):
+        return
+    try:
+        with conn.begin_nested():
+            for ddl in _DDL_FTS:
+                conn.execute(text(ddl))
+            conn.execute(text(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')"))
+        logger.info("Índice de busca textual (FTS5) criado para transacao.descricao")
+    except Exception as e:
+        # SQLite compilado sem FTS5: a busca textual usa LIKE como alternativa
+        logger.warning("Não foi possível criar o índice FTS5; busca textual usará LIKE: %s", e)
+
+
+def expressao_fts(termo: str) -> str:
+    """Converte o termo livre em uma expressão MATCH segura: cada palavra vira um prefixo entre aspas."""
+    palavras = re.findall(r"\w+", termo)
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
@@ -0,0 +1,85 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
+
+# Banco padrão: arquivo SQLite local dentro do diretório database/
+DB_PATH_PADRAO = "database/"
+DB_URL_PADRAO = 'sqlite:///%s/econome_db_transacoes.sqlite3' % DB_PATH_PADRAO
+
+
+@dataclass
+class PerfilSQLite:
+    """PRAGMAs aplicados a cada nova conexão SQLite no perfil de desempenho.
+
+    WAL permite leitores concorrentes durante a escrita; synchronous=NORMAL é seguro em WAL
+    (só perde as últimas transações em queda de energia, sem corromper o banco).
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    # Valor negativo = tamanho em KiB (aqui 64 MiB de cache de páginas por conexão)
+    cache_size: int = -64 * 1024
+    busy_timeout: int = 5000
+    temp_store: str = "MEMORY"
+
+    def pragmas(self) -> Dict[str, Any]:
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "busy_timeout": self.busy_timeout,
+            "temp_store": self.temp_store,
+        }
+
+
+@dataclass
+class ConfiguracaoBanco:
+    """Configuração do engine de banco, carregada de variáveis de ambiente.
+
+    DATABASE_URL permite apontar para outro backend (ex.: postgresql+psycopg://...); o perfil
+    de desempenho só é aplicado quando o backend é SQLite e SQLITE_PERFIL=desempenho. ARQUIVO_SQLITE
+    (arquivo frio em um banco anexado) também só vale para SQLite.
+    """
+    url: str = DB_URL_PADRAO
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = False
+    perfil_sqlite: str = "desempenho"
+    sqlite: PerfilSQLite = field(default_factory=PerfilSQLite)
+    # Arquivo SQLite anexado que guarda as tabelas do arquivo frio (vazio: no próprio banco)
+    arquivo_sqlite: Optional[str] = None
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.url.startswith("sqlite")
+
+    @classmethod
+    def from_env(cls, ambiente: Optional[Mapping[str, Any]] = None) -> "ConfiguracaoBanco":
+        """Lê a configuração das variáveis de ambiente ou, se informado, de um mapeamento com os mesmos nomes."""
+        ambiente = os.environ if ambiente is None else ambiente
+
+        def valor(nome: str, padrao: Any) -> str:
+            return str(ambiente.get(nome, padrao))
+
+        padrao_sqlite = PerfilSQLite()
+        return cls(
+            url=valor("DATABASE_URL", DB_URL_PADRAO),
+            pool_size=int(valor("DB_POOL_SIZE", "5")),
+            max_overflow=int(valor("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(valor("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(valor("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=valor("DB_POOL_PRE_PING", "0") == "1",
+            perfil_sqlite=valor("SQLITE_PERFIL", "desempenho"),
+            sqlite=PerfilSQLite(
+                journal_mode=valor("SQLITE_JOURNAL_MODE", padrao_sqlite.journal_mode),
+                synchronous=valor("SQLITE_SYNCHRONOUS", padrao_sqlite.synchronous),
+                mmap_size=int(valor("SQLITE_MMAP_SIZE", padrao_sqlite.mmap_size)),
+                cache_size=int(valor("SQLITE_CACHE_SIZE", padrao_sqlite.cache_size)),
+                busy_timeout=int(valor("SQLITE_BUSY_TIMEOUT", padrao_sqlite.busy_timeout)),
+                temp_store=valor("SQLITE_TEMP_STORE", padrao_sqlite.temp_store),
+            ),
+            arquivo_sqlite=valor("ARQUIVO_SQLITE", "") or None,
+        )
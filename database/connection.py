@@ -1,91 +1,119 @@
 import os.path
+from typing import Optional
 
-from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy_utils import database_exists, create_database
-import re
 
-# Importando os elementos definidos no modelo
-from model.base.base_model import Base
+from database.arquivo import registrar_banco_arquivo
+from database.config import ConfiguracaoBanco, DB_PATH_PADRAO, DB_URL_PADRAO, PerfilSQLite
+from database.instrumentacao import instrumentar_engine
+from database.migracoes import migrar
+from database.pool import PoolMonitorado
+from database.versionamento import registrar_versionamento
+# Importando os elementos definidos no modelo (todas as tabelas registradas em Base.metadata)
+from model.base.versao_esquema_model import VersaoEsquemaModel
+from model.transacao.arquivo_model import ArquivoTransacaoModel, PedidoArquivadoModel, TransacaoArquivamentoModel
+from model.transacao.idempotencia_model import ChaveIdempotenciaModel
+from model.transacao.mudanca_model import TransacaoMudancaModel
 from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.recorrencia_model import OcorrenciaExcluidaModel, RecorrenciaModel
+from model.transacao.resumo_model import ResumoTransacaoModel
 from model.transacao.transacao_model import TransacaoModel
+from model.transacao.versao_model import VersaoTabelaModel
+from utils.logger import logger
 
-db_path = "database/"
-# Verifica se o diretório não existe e cria um novo
-if not os.path.exists(db_path):
-    os.makedirs(db_path)
-    print("Diretório de banco de dados criado.")
-
-# URL de conexão para o banco de dados SQLite local
-db_url = 'sqlite:///%s/econome_db_transacoes.sqlite3' % db_path
-
-# Cria o banco de dados e a tabela
-engine = create_engine(db_url, echo=False)
-
-# Instancia um criador de sessão com o banco
-Session = sessionmaker(bind=engine)
-
-# Verifica se o banco de dados já existe e cria se não existir
-if not database_exists(engine.url):
-    create_database(engine.url)
-
-"""
-Rotina simples de "migração" incremental:
-
-1) Se a coluna pedido_id ainda não existir na tabela transacao (bancos criados antes da funcionalidade
-    de vínculo Pedido-Transação), ela é adicionada via ALTER TABLE e um índice único é criado. Em seguida,
-    tentamos fazer backfill a partir do padrão de descrição: "Pedido <numero> (#<id>)".
-
-2) Se a coluna participant_id não existir (feature de associação opcional de Participante à transação),
-    ela é adicionada e criado um índice simples (não unique). Não há backfill possível.
-
-Obs.: Para algo mais robusto, considerar Alembic no futuro.
-"""
-
-
-def aplicar_migracoes_simples():
-    inspector = inspect(engine)
-    try:
-        tables = inspector.get_table_names()
-    except Exception:
-        return
-    if 'transacao' not in tables:
-        # Tabela ainda não existe; será criada normalmente abaixo
-        return
-    col_names = [c['name'] for c in inspector.get_columns('transacao')]
-    changed = False
-    if 'pedido_id' not in col_names:
-        with engine.begin() as conn:
-            conn.execute(text("ALTER TABLE transacao ADD COLUMN pedido_id INTEGER"))
-            # Em SQLite não dá para adicionar constraint UNIQUE facilmente após criação; criamos índice único.
-            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_transacao_pedido_id ON transacao(pedido_id)"))
-        changed = True
-        # Backfill best-effort
-        pattern = re.compile(r"\(#(\d+)\)")
-        with engine.begin() as conn:
-            result = conn.execute(text("SELECT pk_transacao, descricao FROM transacao WHERE pedido_id IS NULL"))
-            for row in result.fetchall():
-                pk, desc = row
-                if not desc:
-                    continue
-                m = pattern.search(desc)
-                if not m:
-                    continue
-                pedido_id = int(m.group(1))
-                try:
-                    conn.execute(text("UPDATE transacao SET pedido_id = :pid WHERE pk_transacao = :pk"), {"pid": pedido_id, "pk": pk})
-                except Exception:
-                    # Ignora conflitos (duplicados) para manter operação resiliente
-                    pass
-    if 'participant_id' not in col_names:
-        with engine.begin() as conn:
-            conn.execute(text("ALTER TABLE transacao ADD COLUMN participant_id INTEGER"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transacao_participant_id ON transacao(participant_id)"))
-        changed = True
-    if not changed:
-        return
-
-
-# Aplica migrações simples antes de criar novas tabelas/colunas padrão
-aplicar_migracoes_simples()
-Base.metadata.create_all(engine)
\ No newline at end of file
+
+def _registrar_pragmas_sqlite(engine: Engine, perfil: PerfilSQLite) -> None:
+    """Aplica os PRAGMAs do perfil de desempenho a cada nova conexão DBAPI do pool."""
+    pragmas = perfil.pragmas()
+
+    @event.listens_for(engine, "connect")
+    def aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+        finally:
+            cursor.close()
+
+
+def criar_engine(config: ConfiguracaoBanco) -> Engine:
+    """Cria o engine a partir da configuração, com pool monitorado e perfil SQLite quando aplicável."""
+    engine = create_engine(
+        config.url,
+        echo=False,
+        poolclass=PoolMonitorado,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        pool_pre_ping=config.pool_pre_ping,
+    )
+    if config.is_sqlite and config.perfil_sqlite == "desempenho":
+        _registrar_pragmas_sqlite(engine, config.sqlite)
+    if config.is_sqlite and config.arquivo_sqlite:
+        registrar_banco_arquivo(engine, config.arquivo_sqlite)
+    return engine
+
+
+# Engine criado por init_banco; nenhum recurso (arquivo, conexão) é aberto na importação deste módulo
+engine: Optional[Engine] = None
+
+# A fábrica só recebe o engine (bind) em init_banco
+fabrica_sessao = sessionmaker()
+# Toda escrita em transações/observações incrementa o contador usado nas ETags
+registrar_versionamento(fabrica_sessao)
+
+# Sessão com escopo de thread: cada requisição usa a mesma sessão, removida no teardown do app
+Session = scoped_session(fabrica_sessao)
+
+
+def obter_engine() -> Engine:
+    """Engine inicializado por init_banco."""
+    if engine is None:
+        raise RuntimeError("Banco não inicializado: chame init_banco (ou use create_app)")
+    return engine
+
+
+def config_sessao(app) -> None:
+    """Encerra a sessão da requisição (devolvendo a conexão ao pool) ao final de cada app context."""
+    @app.teardown_appcontext
+    def remover_sessao(exc):
+        Session.remove()
+
+
+def preparar_esquema(engine: Engine) -> int:
+    """Cria o banco (se necessário) e aplica as migrações pendentes (ver database/migracoes).
+
+    Retorna a quantidade de migrações aplicadas.
+    """
+    # Verifica se o banco de dados já existe e cria se não existir
+    if not database_exists(engine.url):
+        create_database(engine.url)
+    return migrar(engine)
+
+
+def init_banco(config: ConfiguracaoBanco, preparar: bool = True) -> Engine:
+    """Cria o engine a partir da configuração, associa-o às sessões e, opcionalmente, prepara o esquema.
+
+    Chamadas seguintes devolvem o engine já criado. Deve ser executado uma única vez por processo
+    (no master do gunicorn quando há preload; cada worker apenas descarta as conexões herdadas).
+    """
+    global engine
+    if engine is not None:
+        return engine
+
+    # Verifica se o diretório do banco SQLite padrão não existe e cria um novo
+    if config.url == DB_URL_PADRAO and not os.path.exists(DB_PATH_PADRAO):
+        os.makedirs(DB_PATH_PADRAO)
+        logger.info("Diretório de banco de dados criado.")
+
+    novo_engine = criar_engine(config)
+    instrumentar_engine(novo_engine)
+    fabrica_sessao.configure(bind=novo_engine)
+    if preparar:
+        preparar_esquema(novo_engine)
+    engine = novo_engine
+    return engine
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""Manutenção incremental da tabela resumo_transacao (SQLite).
+
+Triggers em transacao aplicam, na mesma transação de banco da escrita, o delta de quantidade e
+valor na linha de consolidado da chave (mês de vencimento, participante, tipo, pago). Assim
+qualquer caminho de escrita (ORM, INSERT em lote, upsert ON CONFLICT e DELETE em massa) mantém o
+consolidado correto. As comparações usam IS para tratar chaves nulas (sem vencimento/participante).
+Transações excluídas logicamente (data_exclusao preenchida) não fazem parte do consolidado: a
+exclusão lógica subtrai a linha e o expurgo posterior (DELETE) não a subtrai de novo. Transações
+arquivadas continuam no consolidado: a remoção de transacao feita pelo arquivamento não as subtrai.
+Em outros backends os triggers não são criados e o resumo é calculado direto sobre transacao.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from database.arquivo import CONDICAO_NAO_ARQUIVANDO
+from model.transacao.arquivo_model import TransacaoArquivamentoModel
+from utils.logger import logger
+
+_COLUNAS_CHAVE = "data_vencimento, participant_id, tipo_transacao, pago, valor, data_exclusao"
+
+
+def _aplicar_delta(registro: str, sinal: str) -> str:
+    """SQL que soma (sinal '+') ou subtrai (sinal '-') o registro NEW/OLD do consolidado."""
+    chave = (f"mes IS strftime('%Y-%m', {registro}.data_vencimento) "
+             f"AND participant_id IS {registro}.participant_id "
+             f"AND tipo_transacao = {registro}.tipo_transacao AND pago = {registro}.pago")
+    return f"""
+        INSERT INTO resumo_transacao (mes, participant_id, tipo_transacao, pago, quantidade, total)
+            SELECT strftime('%Y-%m', {registro}.data_vencimento), {registro}.participant_id,
+                   {registro}.tipo_transacao, {registro}.pago, 0, 0
+            WHERE NOT EXISTS (SELECT 1 FROM resumo_transacao WHERE {chave});
+        UPDATE resumo_transacao SET quantidade = quantidade {sinal} 1, total = total {sinal} {registro}.valor
+            WHERE {chave};
+        DELETE FROM resumo_transacao WHERE quantidade = 0 AND {chave};"""
+
+
+_DDL_GATILHOS = [
+    f"""CREATE TRIGGER IF NOT EXISTS resumo_transacao_ai AFTER INSERT ON transacao
+        WHEN new.data_exclusao IS NULL BEGIN
+        {_aplicar_delta('new', '+')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS resumo_transacao_ad AFTER DELETE ON transacao
+        WHEN old.data_exclusao IS NULL AND {CONDICAO_NAO_ARQUIVANDO} BEGIN
+        {_aplicar_delta('old', '-')}
+    END""",
+    # Na atualização, a linha antiga sai e a nova entra apenas se cada uma não estiver excluída
+    f"""CREATE TRIGGER IF NOT EXISTS resumo_transacao_au_antiga AFTER UPDATE OF {_COLUNAS_CHAVE} ON transacao
+        WHEN old.data_exclusao IS NULL BEGIN
+        {_aplicar_delta('old', '-')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS resumo_transacao_au_nova AFTER UPDATE OF {_COLUNAS_CHAVE} ON transacao
+        WHEN new.data_exclusao IS NULL BEGIN
+        {_aplicar_delta('new', '+')}
+    END""",
+]
+
+# Nomes de todas as versões dos triggers, para a recriação (resumo_transacao_au: antes da exclusão lógica)
+_NOMES_GATILHOS = ["resumo_transacao_ai", "resumo_transacao_ad", "resumo_transacao_au",
+                   "resumo_transacao_au_antiga", "resumo_transacao_au_nova"]
+
+
+def _gatilhos_instalados(conn: Connection) -> bool:
+    return conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :nome"),
+                        {"nome": "resumo_transacao_ai"}).first() is not None
+
+
+def consolidacao_disponivel(engine: Engine) -> bool:
+    """Indica se os triggers de consolidação estão instalados no banco do engine."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return _gatilhos_instalados(conn)
+
+
+def criar_gatilhos_consolidacao(conn: Connection, reconstruir) -> None:
+    """Instala os triggers de consolidação e, na primeira instalação, reconstrói o consolidado.
+
+    reconstruir recebe a conexão e recalcula resumo_transacao a partir de transacao, na mesma
+    transação da criação dos triggers.
+    """
+    if conn.dialect.name != "sqlite" or _gatilhos_instalados(conn):
+        return
+    # Referenciada pelo trigger de exclusão
+    TransacaoArquivamentoModel.__table__.create(conn, checkfirst=True)
+    for ddl in _DDL_GATILHOS:
+        conn.execute(text(ddl))
+    reconstruir(conn)
+    logger.info("Triggers de consolidação (resumo_transacao) instalados")
+
+
+def recriar_gatilhos_consolidacao(conn: Connection, reconstruir) -> None:
+    """Substitui os triggers (de qualquer versão anterior) pela versão atual e reconstrói o consolidado."""
+    if conn.dialect.name != "sqlite":
+        return
+    for nome in _NOMES_GATILHOS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+    criar_gatilhos_consolidacao(conn, reconstruir)
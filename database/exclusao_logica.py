@@ -0,0 +1,49 @@
+"""Oculta das leituras e escritas via ORM as transações excluídas logicamente (data_exclusao preenchida).
+
+O critério é adicionado pelo listener do_orm_execute a todo SELECT, UPDATE e DELETE emitido pela
+sessão que envolva TransacaoModel (inclusive selects só de colunas e agregações), de modo que as
+consultas existentes não precisam conhecer a exclusão lógica. O expurgo e a restauração pelo upsert
+usam a opção de execução incluir_excluidas ou instruções Core via Connection, fora deste filtro.
+O listener só é registrado quando pode haver excluídas (ver config_exclusao_logica em exclusao_service):
+sem elas, as consultas não pagam pelo critério.
+"""
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import ORMExecuteState, with_loader_criteria
+
+from model.transacao.transacao_model import TransacaoModel
+
+# Opção de execução que desliga o filtro: session.execute(stmt, execution_options={OPCAO_INCLUIR_EXCLUIDAS: True})
+OPCAO_INCLUIR_EXCLUIDAS = "incluir_excluidas"
+
+
+def _ocultar_excluidas(estado: ORMExecuteState) -> None:
+    if not (estado.is_select or estado.is_update or estado.is_delete):
+        return
+    if estado.is_column_load or estado.is_relationship_load:
+        return
+    if estado.execution_options.get(OPCAO_INCLUIR_EXCLUIDAS, False):
+        return
+    estado.statement = estado.statement.options(
+        with_loader_criteria(TransacaoModel, TransacaoModel.data_exclusao.is_(None), include_aliases=True))
+
+
+def registrar_exclusao_logica(fabrica_sessao) -> None:
+    """Registra o filtro de transações excluídas nas sessões criadas pela fábrica (sessionmaker)."""
+    if event.contains(fabrica_sessao, "do_orm_execute", _ocultar_excluidas):
+        return
+    event.listen(fabrica_sessao, "do_orm_execute", _ocultar_excluidas)
+
+
+def existem_excluidas(engine: Engine) -> bool:
+    """Indica se há transações excluídas logicamente ainda não expurgadas (pelo índice parcial de data_exclusao).
+
+    Sem a tabela ou a coluna (migrações pendentes, MIGRAR_NA_INICIALIZACAO=0) não há excluídas.
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(TransacaoModel.id).where(TransacaoModel.data_exclusao.is_not(None))
+                                .limit(1)).first() is not None
+    except DBAPIError:
+        return False
@@ -0,0 +1,95 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from flask import g
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metricas import metricas_habilitadas
+
+
+@dataclass
+class ContadorSQL:
+    """Acumula a quantidade e o tempo total das instruções SQL executadas em um contexto."""
+    quantidade: int = 0
+    tempo_total: float = 0.0
+
+
+# Contador ativo no contexto atual (thread/requisição); None quando não há medição em andamento
+_contador_atual: ContextVar[Optional[ContadorSQL]] = ContextVar("contador_sql", default=None)
+
+
+def _antes_execucao(conn, cursor, statement, parameters, context, executemany):
+    if _contador_atual.get() is not None:
+        conn.info.setdefault("inicio_sql", []).append(time.perf_counter())
+
+
+def _depois_execucao(conn, cursor, statement, parameters, context, executemany):
+    contador = _contador_atual.get()
+    if contador is None:
+        return
+    inicios = conn.info.get("inicio_sql")
+    contador.quantidade += 1
+    if inicios:
+        contador.tempo_total += time.perf_counter() - inicios.pop()
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Registra no engine os listeners que alimentam os contadores de SQL.
+
+    Sem um contador ativo (ver contar_sql) os listeners apenas retornam, com custo desprezível.
+    """
+    if not event.contains(engine, "before_cursor_execute", _antes_execucao):
+        event.listen(engine, "before_cursor_execute", _antes_execucao)
+        event.listen(engine, "after_cursor_execute", _depois_execucao)
+
+
+@contextmanager
+def contar_sql() -> Iterator[ContadorSQL]:
+    """Conta as instruções SQL executadas no bloco, isolado por thread/contexto.
+
+    Exemplo::
+
+        with contar_sql() as contador:
+            client.get("/transacoes?limite=50")
+        assert contador.quantidade == 2
+    """
+    contador = ContadorSQL()
+    token = _contador_atual.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador_atual.reset(token)
+
+
+def config_contagem_sql(app) -> None:
+    """Conta o SQL de cada requisição (g.contador_sql) quando as métricas (METRICAS) ou EXPOR_CONTAGEM_SQL
+    estiverem ativos; com EXPOR_CONTAGEM_SQL a contagem também sai nos headers X-SQL-Count e
+    X-SQL-Time-ms. Útil para detectar regressões de N+1 a partir de testes de API.
+    """
+    expor = app.config.get("EXPOR_CONTAGEM_SQL", os.getenv("EXPOR_CONTAGEM_SQL", "0") == "1")
+    if not expor and not metricas_habilitadas(app):
+        return
+
+    @app.before_request
+    def _iniciar_contagem_sql():
+        g.contador_sql = ContadorSQL()
+        g.token_contador_sql = _contador_atual.set(g.contador_sql)
+
+    @app.after_request
+    def _expor_contagem_sql(response):
+        contador = g.get("contador_sql")
+        if expor and contador is not None:
+            response.headers["X-SQL-Count"] = str(contador.quantidade)
+            response.headers["X-SQL-Time-ms"] = f"{contador.tempo_total * 1000:.3f}"
+        return response
+
+    @app.teardown_request
+    def _encerrar_contagem_sql(exc):
+        token = g.pop("token_contador_sql", None)
+        if token is not None:
+            _contador_atual.reset(token)
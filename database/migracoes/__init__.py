@@ -0,0 +1,85 @@
+"""Migrações de esquema versionadas.
+
+Cada módulo mNNNN_<nome>.py deste pacote define VERSAO, DESCRICAO e aplicar(conn). As migrações
+são aplicadas em ordem de versão, cada uma em sua própria transação junto com o registro em
+versao_esquema; na inicialização, com o banco atualizado, o custo é uma única consulta.
+
+Bancos criados antes deste mecanismo (pela antiga migração ad-hoc de connection.py) podem já ter
+parte das alterações; por isso as migrações verificam o estado antes de alterar o esquema.
+"""
+import importlib
+import pkgutil
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import inspect, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from model.base.base_model import Base
+from model.base.versao_esquema_model import VersaoEsquemaModel
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class Migracao:
+    versao: int
+    descricao: str
+    aplicar: Callable[[Connection], None]
+
+
+def listar_migracoes() -> List[Migracao]:
+    """Migrações disponíveis no pacote, em ordem de versão."""
+    migracoes = []
+    for modulo in pkgutil.iter_modules(__path__):
+        if not modulo.name.startswith("m"):
+            continue
+        m = importlib.import_module(f"{__name__}.{modulo.name}")
+        migracoes.append(Migracao(m.VERSAO, m.DESCRICAO, m.aplicar))
+    migracoes.sort(key=lambda m: m.versao)
+    versoes = [m.versao for m in migracoes]
+    if len(set(versoes)) != len(versoes):
+        raise RuntimeError(f"Versões de migração duplicadas: {versoes}")
+    return migracoes
+
+
+def versoes_aplicadas(conn: Connection) -> List[int]:
+    if not inspect(conn).has_table(VersaoEsquemaModel.__tablename__):
+        return []
+    return list(conn.scalars(select(VersaoEsquemaModel.versao).order_by(VersaoEsquemaModel.versao)))
+
+
+def migracoes_pendentes(engine: Engine) -> List[Migracao]:
+    with engine.connect() as conn:
+        aplicadas = set(versoes_aplicadas(conn))
+    return [m for m in listar_migracoes() if m.versao not in aplicadas]
+
+
+def migrar(engine: Engine) -> int:
+    """Aplica as migrações pendentes e retorna quantas foram aplicadas.
+
+    Em um banco vazio as tabelas são criadas pelo create_all no formato atual dos modelos e as
+    migrações ainda rodam (as alterações de esquema viram no-op), instalando índices, triggers e dados
+    iniciais que o create_all não cobre.
+    """
+    pendentes = migracoes_pendentes(engine)
+    if not pendentes:
+        return 0
+
+    with engine.begin() as conn:
+        if not inspect(conn).has_table("transacao"):
+            Base.metadata.create_all(conn)
+        else:
+            VersaoEsquemaModel.__table__.create(conn, checkfirst=True)
+
+    for migracao in pendentes:
+        logger.info("Aplicando migração %04d: %s", migracao.versao, migracao.descricao)
+        inicio = time.perf_counter()
+        with engine.begin() as conn:
+            migracao.aplicar(conn)
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            conn.execute(insert(VersaoEsquemaModel).values(versao=migracao.versao, descricao=migracao.descricao,
+                                                           data_aplicacao=datetime.now(), duracao_ms=duracao_ms))
+        logger.info("Migração %04d aplicada em %.0f ms", migracao.versao, duracao_ms)
+    return len(pendentes)
@@ -0,0 +1,104 @@
+"""Adiciona transacao.pedido_id (índice único) e preenche a partir do padrão de descrição "Pedido <n> (#<id>)".
+
+O backfill carrega os pares (transação, pedido) das linhas candidatas (descrição contendo "(#") em uma
+tabela temporária, em faixas de chave primária com progresso no log, e um único UPDATE set-based aplica
+todos. A extração roda no banco: regex nativa no PostgreSQL e função registrada na conexão no SQLite;
+em outros backends o regex é aplicado em Python, lote a lote. Pedidos repetidos são ignorados: a
+primeira transação (menor id) fica com o pedido, como na antiga migração linha a linha.
+"""
+import re
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from utils.logger import logger
+
+VERSAO = 1
+DESCRICAO = "Vínculo Pedido-Transação (transacao.pedido_id) com backfill pela descrição"
+
+TAMANHO_LOTE = 250000
+_PADRAO = re.compile(r"\(#(\d+)\)")
+# Filtro LIKE das linhas candidatas, aplicado no banco antes do regex
+_CANDIDATAS = "%(#%"
+
+
+def _extrair_pedido(descricao):
+    encontrado = _PADRAO.search(descricao) if descricao else None
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def _expressao_pedido(conn: Connection):
+    """Expressão SQL que extrai o pedido da descrição, ou None se o backend não tiver suporte."""
+    if conn.dialect.name == "sqlite":
+        conn.connection.driver_connection.create_function("pedido_da_descricao", 1, _extrair_pedido,
+                                                          deterministic=True)
+        return "pedido_da_descricao(descricao)"
+    if conn.dialect.name == "postgresql":
+        return "CAST(substring(descricao from '\\(#(\\d+)\\)') AS INTEGER)"
+    return None
+
+
+def _carregar_por_faixas(conn: Connection, expressao: str, tamanho_lote: int) -> None:
+    """INSERT ... SELECT por faixa de pk_transacao, extraindo o pedido no próprio banco."""
+    maior = conn.scalar(text("SELECT max(pk_transacao) FROM transacao")) or 0
+    inserir = text(f"INSERT INTO backfill_pedido (pk, pid) SELECT pk_transacao, {expressao} FROM transacao "
+                   f"WHERE pk_transacao > :inicio AND pk_transacao <= :fim AND pedido_id IS NULL "
+                   f"AND descricao LIKE :padrao AND {expressao} IS NOT NULL")
+    carregadas = 0
+    for inicio in range(0, maior, tamanho_lote):
+        fim = min(inicio + tamanho_lote, maior)
+        carregadas += conn.execute(inserir, {"inicio": inicio, "fim": fim, "padrao": _CANDIDATAS}).rowcount
+        logger.info("Backfill pedido_id: faixa até pk %s/%s, %s pedidos encontrados", fim, maior, carregadas)
+
+
+def _carregar_em_python(conn: Connection, total: int, tamanho_lote: int) -> None:
+    """Alternativa sem regex no banco: lê as candidatas em lotes por chave primária e extrai em Python."""
+    ultimo, lidas = 0, 0
+    while True:
+        linhas = conn.execute(text("SELECT pk_transacao, descricao FROM transacao "
+                                   "WHERE pk_transacao > :ultimo AND pedido_id IS NULL AND descricao LIKE :padrao "
+                                   "ORDER BY pk_transacao LIMIT :limite"),
+                              {"ultimo": ultimo, "padrao": _CANDIDATAS, "limite": tamanho_lote}).all()
+        if not linhas:
+            break
+        ultimo = linhas[-1][0]
+        lidas += len(linhas)
+        pares = [{"pk": pk, "pid": pid} for pk, descricao in linhas if (pid := _extrair_pedido(descricao)) is not None]
+        if pares:
+            conn.execute(text("INSERT INTO backfill_pedido (pk, pid) VALUES (:pk, :pid)"), pares)
+        logger.info("Backfill pedido_id: %s/%s linhas candidatas lidas", lidas, total)
+
+
+def backfill_pedido_id(conn: Connection, tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Preenche pedido_id a partir da descrição; retorna a quantidade de transações atualizadas."""
+    total = conn.scalar(text("SELECT count(*) FROM transacao WHERE pedido_id IS NULL AND descricao LIKE :padrao"),
+                        {"padrao": _CANDIDATAS})
+    if not total:
+        return 0
+
+    conn.execute(text("CREATE TEMPORARY TABLE backfill_pedido (pk INTEGER PRIMARY KEY, pid INTEGER NOT NULL)"))
+    expressao = _expressao_pedido(conn)
+    if expressao is not None:
+        _carregar_por_faixas(conn, expressao, tamanho_lote)
+    else:
+        _carregar_em_python(conn, total, tamanho_lote)
+
+    atualizadas = conn.execute(text("""
+        UPDATE transacao SET pedido_id = (SELECT b.pid FROM backfill_pedido b WHERE b.pk = transacao.pk_transacao)
+        WHERE pk_transacao IN (
+            SELECT min(b.pk) FROM backfill_pedido b
+            WHERE b.pid NOT IN (SELECT pedido_id FROM transacao WHERE pedido_id IS NOT NULL)
+            GROUP BY b.pid)""")).rowcount
+    conn.execute(text("DROP TABLE backfill_pedido"))
+    logger.info("Backfill pedido_id: %s transações vinculadas a pedidos", atualizadas)
+    return atualizadas
+
+
+def aplicar(conn: Connection) -> None:
+    colunas = [c["name"] for c in inspect(conn).get_columns("transacao")]
+    if "pedido_id" not in colunas:
+        conn.execute(text("ALTER TABLE transacao ADD COLUMN pedido_id INTEGER"))
+    backfill_pedido_id(conn)
+    # Em SQLite não dá para adicionar constraint UNIQUE facilmente após criação; criamos índice único.
+    # Criado depois do backfill: construir o índice de uma vez é mais barato que mantê-lo a cada UPDATE.
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_transacao_pedido_id ON transacao(pedido_id)"))
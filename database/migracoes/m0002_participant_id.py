@@ -0,0 +1,16 @@
+"""Adiciona transacao.participant_id (associação opcional de Participante), com índice simples.
+
+Não há backfill possível.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+VERSAO = 2
+DESCRICAO = "Participante opcional da transação (transacao.participant_id)"
+
+
+def aplicar(conn: Connection) -> None:
+    colunas = [c["name"] for c in inspect(conn).get_columns("transacao")]
+    if "participant_id" not in colunas:
+        conn.execute(text("ALTER TABLE transacao ADD COLUMN participant_id INTEGER"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transacao_participant_id ON transacao(participant_id)"))
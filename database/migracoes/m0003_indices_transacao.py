@@ -0,0 +1,12 @@
+"""Cria os índices de consulta de transacao (descrição e compostos dos filtros frequentes)."""
+from sqlalchemy.engine import Connection
+
+from model.transacao.transacao_model import TransacaoModel
+
+VERSAO = 3
+DESCRICAO = "Índices de consulta em transacao"
+
+
+def aplicar(conn: Connection) -> None:
+    for indice in TransacaoModel.__table__.indexes:
+        indice.create(conn, checkfirst=True)
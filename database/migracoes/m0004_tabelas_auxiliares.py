@@ -0,0 +1,15 @@
+"""Cria as tabelas de idempotência, consolidado e versão de tabelas."""
+from sqlalchemy.engine import Connection
+
+from model.base.base_model import Base
+from model.transacao.idempotencia_model import ChaveIdempotenciaModel
+from model.transacao.resumo_model import ResumoTransacaoModel
+from model.transacao.versao_model import VersaoTabelaModel
+
+VERSAO = 4
+DESCRICAO = "Tabelas chave_idempotencia, resumo_transacao e versao_tabela"
+
+
+def aplicar(conn: Connection) -> None:
+    Base.metadata.create_all(conn, tables=[ChaveIdempotenciaModel.__table__, ResumoTransacaoModel.__table__,
+                                           VersaoTabelaModel.__table__])
@@ -0,0 +1,11 @@
+"""Cria o índice FTS5 de transacao.descricao e seus triggers (apenas SQLite)."""
+from sqlalchemy.engine import Connection
+
+from database.busca_textual import criar_indice_textual
+
+VERSAO = 5
+DESCRICAO = "Índice de busca textual (FTS5) das descrições"
+
+
+def aplicar(conn: Connection) -> None:
+    criar_indice_textual(conn)
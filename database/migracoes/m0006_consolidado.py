@@ -0,0 +1,16 @@
+"""Instala os triggers do consolidado resumo_transacao e o reconstrói a partir de transacao (apenas SQLite)."""
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from database.consolidacao import criar_gatilhos_consolidacao
+from services.transacao.consolidacao_service import reconstruir_consolidado
+
+VERSAO = 6
+DESCRICAO = "Triggers e carga inicial do consolidado resumo_transacao"
+
+
+def aplicar(conn: Connection) -> None:
+    # Triggers e reconstrução já usam transacao.data_exclusao; sem a coluna, a instalação fica para a 0008
+    if "data_exclusao" not in [c["name"] for c in inspect(conn).get_columns("transacao")]:
+        return
+    criar_gatilhos_consolidacao(conn, reconstruir_consolidado)
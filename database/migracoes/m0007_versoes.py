@@ -0,0 +1,11 @@
+"""Cria as linhas iniciais do contador de versão usado nas ETags."""
+from sqlalchemy.engine import Connection
+
+from database.versionamento import criar_versoes
+
+VERSAO = 7
+DESCRICAO = "Linhas iniciais de versao_tabela"
+
+
+def aplicar(conn: Connection) -> None:
+    criar_versoes(conn)
@@ -0,0 +1,21 @@
+"""Exclusão lógica de transações: coluna transacao.data_exclusao, índice parcial para o expurgo e triggers
+do consolidado que ignoram as linhas excluídas (recriados, com reconstrução do consolidado).
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from database.consolidacao import recriar_gatilhos_consolidacao
+from services.transacao.consolidacao_service import reconstruir_consolidado
+
+VERSAO = 8
+DESCRICAO = "Exclusão lógica de transações (transacao.data_exclusao)"
+
+
+def aplicar(conn: Connection) -> None:
+    colunas = [c["name"] for c in inspect(conn).get_columns("transacao")]
+    if "data_exclusao" not in colunas:
+        conn.execute(text("ALTER TABLE transacao ADD COLUMN data_exclusao TIMESTAMP"))
+    # Parcial: só as excluídas (em geral poucas) entram no índice usado pelo expurgo
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transacao_data_exclusao ON transacao (data_exclusao) "
+                      "WHERE data_exclusao IS NOT NULL"))
+    recriar_gatilhos_consolidacao(conn, reconstruir_consolidado)
@@ -0,0 +1,12 @@
+"""Cria o índice (fk_id_produto, id) de observacao, usado na paginação e na carga das observações da transação."""
+from sqlalchemy.engine import Connection
+
+from model.transacao.observacao_model import ObservacaoModel
+
+VERSAO = 9
+DESCRICAO = "Índice de observacao por transação"
+
+
+def aplicar(conn: Connection) -> None:
+    for indice in ObservacaoModel.__table__.indexes:
+        indice.create(conn, checkfirst=True)
@@ -0,0 +1,13 @@
+"""Cria a tabela transacao_mudanca e os triggers que a alimentam (triggers apenas no SQLite)."""
+from sqlalchemy.engine import Connection
+
+from database.mudancas import criar_gatilhos_mudancas
+from model.transacao.mudanca_model import TransacaoMudancaModel
+
+VERSAO = 10
+DESCRICAO = "Feed de mudanças das transações (transacao_mudanca)"
+
+
+def aplicar(conn: Connection) -> None:
+    TransacaoMudancaModel.__table__.create(conn, checkfirst=True)
+    criar_gatilhos_mudancas(conn)
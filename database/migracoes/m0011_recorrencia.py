@@ -0,0 +1,22 @@
+"""Recorrências e parcelamentos: tabela recorrencia e transacao.recorrencia_id/parcela.
+
+O índice único parcial (recorrencia_id, parcela) impede materializar a mesma ocorrência duas vezes.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from model.transacao.recorrencia_model import RecorrenciaModel
+
+VERSAO = 11
+DESCRICAO = "Recorrências e parcelamentos (recorrencia, transacao.recorrencia_id/parcela)"
+
+
+def aplicar(conn: Connection) -> None:
+    RecorrenciaModel.__table__.create(conn, checkfirst=True)
+    colunas = [c["name"] for c in inspect(conn).get_columns("transacao")]
+    if "recorrencia_id" not in colunas:
+        conn.execute(text("ALTER TABLE transacao ADD COLUMN recorrencia_id INTEGER REFERENCES recorrencia(id)"))
+    if "parcela" not in colunas:
+        conn.execute(text("ALTER TABLE transacao ADD COLUMN parcela INTEGER"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ux_transacao_recorrencia_parcela "
+                      "ON transacao (recorrencia_id, parcela) WHERE recorrencia_id IS NOT NULL"))
@@ -0,0 +1,24 @@
+"""Arquivo frio de transações liquidadas: catálogo, pedido_arquivado e transacao_arquivamento.
+
+Os triggers de exclusão do consolidado e do feed passam a ignorar as linhas em arquivamento
+(recriados; o consolidado é reconstruído, o feed não muda) e os pedido_id arquivados ficam reservados.
+As tabelas de cada ano são criadas pelo próprio arquivamento.
+"""
+from sqlalchemy.engine import Connection
+
+from database.arquivo import criar_gatilhos_arquivo
+from database.consolidacao import recriar_gatilhos_consolidacao
+from database.mudancas import recriar_gatilhos_mudancas
+from model.transacao.arquivo_model import ArquivoTransacaoModel, PedidoArquivadoModel, TransacaoArquivamentoModel
+from services.transacao.consolidacao_service import reconstruir_consolidado
+
+VERSAO = 12
+DESCRICAO = "Arquivo frio de transações liquidadas (arquivo_transacao, pedido_arquivado)"
+
+
+def aplicar(conn: Connection) -> None:
+    for modelo in (ArquivoTransacaoModel, PedidoArquivadoModel, TransacaoArquivamentoModel):
+        modelo.__table__.create(conn, checkfirst=True)
+    recriar_gatilhos_consolidacao(conn, reconstruir_consolidado)
+    recriar_gatilhos_mudancas(conn)
+    criar_gatilhos_arquivo(conn)
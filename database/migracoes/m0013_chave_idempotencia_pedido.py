@@ -0,0 +1,27 @@
+"""Chaves de idempotência por pedido: chave primária (pedido_id, chave) em chave_idempotencia e índice de
+data_inclusao para o expurgo. O SQLite não altera chaves primárias: a tabela é recriada e as chaves copiadas.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from model.transacao.idempotencia_model import ChaveIdempotenciaModel
+
+VERSAO = 13
+DESCRICAO = "Chaves de idempotência por pedido (chave_idempotencia: pk (pedido_id, chave))"
+
+
+def aplicar(conn: Connection) -> None:
+    tabela = ChaveIdempotenciaModel.__table__
+    chave_primaria = inspect(conn).get_pk_constraint(tabela.name)
+    if chave_primaria["constrained_columns"] != ["pedido_id", "chave"]:
+        if conn.dialect.name == "sqlite":
+            conn.execute(text("ALTER TABLE chave_idempotencia RENAME TO chave_idempotencia_antiga"))
+            tabela.create(conn)
+            conn.execute(text("INSERT INTO chave_idempotencia (pedido_id, chave, data_inclusao) "
+                              "SELECT pedido_id, chave, data_inclusao FROM chave_idempotencia_antiga"))
+            conn.execute(text("DROP TABLE chave_idempotencia_antiga"))
+        else:
+            conn.execute(text(f'ALTER TABLE chave_idempotencia DROP CONSTRAINT "{chave_primaria["name"]}"'))
+            conn.execute(text("ALTER TABLE chave_idempotencia ADD PRIMARY KEY (pedido_id, chave)"))
+    for indice in tabela.indexes:
+        indice.create(conn, checkfirst=True)
@@ -0,0 +1,73 @@
+"""AUTOINCREMENT em transacao (SQLite): ids de transações arquivadas ou removidas nunca são reutilizados.
+
+Sem AUTOINCREMENT o SQLite atribui max(rowid) + 1, e um id arquivado no arquivo frio (ou de uma
+transação removida) voltaria a ser usado quando as linhas de ids maiores saíssem de transacao. O SQLite
+não altera a chave primária: a tabela é recriada no formato do modelo, com as linhas copiadas sem
+disparar triggers (os ids são mantidos, e o FTS, o consolidado e o feed continuam válidos), e os índices
+da tabela e os triggers e views do banco são recriados. A sequência parte do maior id conhecido: transacao, o catálogo do
+arquivo e o feed de mudanças. Em outros backends a sequência já não reutiliza ids.
+"""
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+from model.transacao.transacao_model import TransacaoModel
+from utils.logger import logger
+
+VERSAO = 14
+DESCRICAO = "AUTOINCREMENT em transacao (ids arquivados não são reutilizados)"
+
+_TABELA_NOVA = "transacao_nova"
+
+
+def _possui_autoincrement(conn: Connection) -> bool:
+    sql = conn.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transacao'"))
+    return "AUTOINCREMENT" in sql.upper()
+
+
+def _recriar_tabela(conn: Connection) -> None:
+    # Índices da tabela (inclusive os parciais das migrações; os automáticos, com sql NULL, vêm do DDL) e
+    # todos os triggers e views: os de outras tabelas que citam transacao impediriam a renomeação
+    objetos = conn.execute(text("SELECT type, name, tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL AND "
+                                "(type IN ('trigger', 'view') OR (type = 'index' AND tbl_name = 'transacao')) "
+                                "ORDER BY type, name")).all()
+    for tipo, nome, tabela_objeto, _ in objetos:
+        if tipo != "index" and tabela_objeto != "transacao":
+            conn.execute(text(f'DROP {tipo.upper()} "{nome}"'))
+    tabela, metadados = TransacaoModel.__table__, MetaData()
+    # As tabelas referenciadas pelas chaves estrangeiras precisam estar nos mesmos metadados para o DDL
+    for chave in tabela.foreign_keys:
+        chave.column.table.to_metadata(metadados)
+    nova = tabela.to_metadata(metadados, name=_TABELA_NOVA)
+    conn.execute(CreateTable(nova))
+    colunas = ", ".join(c["name"] for c in inspect(conn).get_columns("transacao") if c["name"] in nova.c)
+    total = conn.execute(text(f"INSERT INTO {_TABELA_NOVA} ({colunas}) SELECT {colunas} FROM transacao "
+                              f"ORDER BY pk_transacao")).rowcount
+    conn.execute(text("DROP TABLE transacao"))
+    conn.execute(text(f"ALTER TABLE {_TABELA_NOVA} RENAME TO transacao"))
+    for *_, sql in objetos:
+        conn.execute(text(sql))
+    logger.info("Tabela transacao recriada com AUTOINCREMENT (%s transação(ões) copiada(s))", total)
+
+
+def _maior_id_conhecido(conn: Connection) -> int:
+    consultas = ["SELECT max(pk_transacao) FROM transacao"]
+    tabelas = set(inspect(conn).get_table_names())
+    if "arquivo_transacao" in tabelas:
+        consultas.append("SELECT max(id_maximo) FROM arquivo_transacao")
+    if "transacao_mudanca" in tabelas:
+        consultas.append("SELECT max(transacao_id) FROM transacao_mudanca")
+    return max(conn.scalar(text(consulta)) or 0 for consulta in consultas)
+
+
+def aplicar(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    if not _possui_autoincrement(conn):
+        _recriar_tabela(conn)
+    maior_id = _maior_id_conhecido(conn)
+    atual = conn.scalar(text("SELECT seq FROM sqlite_sequence WHERE name = 'transacao'"))
+    if atual is None:
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('transacao', :seq)"), {"seq": maior_id})
+    elif atual < maior_id:
+        conn.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = 'transacao'"), {"seq": maior_id})
@@ -0,0 +1,15 @@
+"""Ocorrências de recorrência excluídas: tabela recorrencia_ocorrencia_excluida.
+
+As transações removidas fisicamente antes desta migração não têm registro e continuam a aparecer como
+previstas.
+"""
+from sqlalchemy.engine import Connection
+
+from model.transacao.recorrencia_model import OcorrenciaExcluidaModel
+
+VERSAO = 15
+DESCRICAO = "Ocorrências de recorrência excluídas (recorrencia_ocorrencia_excluida)"
+
+
+def aplicar(conn: Connection) -> None:
+    OcorrenciaExcluidaModel.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,84 @@
+"""Feed de mudanças das transações (tabela transacao_mudanca, SQLite).
+
+Triggers em transacao e observacao anexam uma linha por transação alterada na mesma transação de
+banco da escrita, cobrindo qualquer caminho (ORM, INSERT em lote, upsert ON CONFLICT, exclusão lógica
+e DELETE em massa). Como o SQLite serializa as escritas, os ids são confirmados em ordem crescente e
+servem de cursor sem risco de um leitor saltar uma mudança ainda não confirmada.
+A exclusão lógica registra "exclusao" e o expurgo posterior não registra de novo; restaurar uma
+excluída (upsert do mesmo pedido) registra "criacao". Mover uma transação para o arquivo frio não é
+registrado: ela continua existindo para as leituras. Em outros backends os triggers não são criados
+e o feed fica indisponível.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from database.arquivo import CONDICAO_NAO_ARQUIVANDO
+from model.transacao.arquivo_model import TransacaoArquivamentoModel
+from utils.logger import logger
+
+_AGORA = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+_DDL_GATILHOS = [
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_mudanca_ai AFTER INSERT ON transacao
+        WHEN new.data_exclusao IS NULL BEGIN
+        INSERT INTO transacao_mudanca (transacao_id, pedido_id, operacao, data_mudanca)
+            VALUES (new.pk_transacao, new.pedido_id, 'criacao', {_AGORA});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_mudanca_au AFTER UPDATE ON transacao
+        WHEN old.data_exclusao IS NULL OR new.data_exclusao IS NULL BEGIN
+        INSERT INTO transacao_mudanca (transacao_id, pedido_id, operacao, data_mudanca)
+            VALUES (new.pk_transacao, new.pedido_id,
+                    CASE WHEN new.data_exclusao IS NOT NULL THEN 'exclusao'
+                         WHEN old.data_exclusao IS NOT NULL THEN 'criacao'
+                         ELSE 'atualizacao' END, {_AGORA});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_mudanca_ad AFTER DELETE ON transacao
+        WHEN old.data_exclusao IS NULL AND {CONDICAO_NAO_ARQUIVANDO} BEGIN
+        INSERT INTO transacao_mudanca (transacao_id, pedido_id, operacao, data_mudanca)
+            VALUES (old.pk_transacao, old.pedido_id, 'exclusao', {_AGORA});
+    END""",
+    # Observações fazem parte da representação da transação; só são removidas junto com ela
+    f"""CREATE TRIGGER IF NOT EXISTS transacao_mudanca_observacao_ai AFTER INSERT ON observacao BEGIN
+        INSERT INTO transacao_mudanca (transacao_id, pedido_id, operacao, data_mudanca)
+            VALUES (new.fk_id_produto,
+                    (SELECT pedido_id FROM transacao WHERE pk_transacao = new.fk_id_produto),
+                    'atualizacao', {_AGORA});
+    END""",
+]
+
+
+_NOMES_GATILHOS = ["transacao_mudanca_ai", "transacao_mudanca_au", "transacao_mudanca_ad",
+                   "transacao_mudanca_observacao_ai"]
+
+
+def _gatilhos_instalados(conn: Connection) -> bool:
+    return conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :nome"),
+                        {"nome": "transacao_mudanca_ai"}).first() is not None
+
+
+def feed_mudancas_disponivel(engine: Engine) -> bool:
+    """Indica se os triggers do feed de mudanças estão instalados no banco do engine."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return _gatilhos_instalados(conn)
+
+
+def criar_gatilhos_mudancas(conn: Connection) -> None:
+    """Instala os triggers do feed de mudanças (idempotente). O feed começa vazio na instalação."""
+    if conn.dialect.name != "sqlite" or _gatilhos_instalados(conn):
+        return
+    # Referenciada pelo trigger de exclusão
+    TransacaoArquivamentoModel.__table__.create(conn, checkfirst=True)
+    for ddl in _DDL_GATILHOS:
+        conn.execute(text(ddl))
+    logger.info("Triggers do feed de mudanças (transacao_mudanca) instalados")
+
+
+def recriar_gatilhos_mudancas(conn: Connection) -> None:
+    """Substitui os triggers (de qualquer versão anterior) pela versão atual, sem alterar o feed."""
+    if conn.dialect.name != "sqlite":
+        return
+    for nome in _NOMES_GATILHOS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+    criar_gatilhos_mudancas(conn)
@@ -0,0 +1,57 @@
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+@dataclass
+class EstatisticasPool:
+    """Contadores acumulados de checkout de conexões do pool."""
+    checkouts: int = 0
+    timeouts: int = 0
+    tempo_espera_total: float = 0.0
+    tempo_espera_maximo: float = 0.0
+
+
+_estatisticas = EstatisticasPool()
+_lock = threading.Lock()
+
+
+class PoolMonitorado(QueuePool):
+    """QueuePool que mede o tempo de espera de cada checkout de conexão.
+
+    As estatísticas ficam em nível de módulo para sobreviverem a engine.dispose(), que recria o pool.
+    """
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            with _lock:
+                _estatisticas.timeouts += 1
+            raise
+        espera = time.perf_counter() - inicio
+        with _lock:
+            _estatisticas.checkouts += 1
+            _estatisticas.tempo_espera_total += espera
+            _estatisticas.tempo_espera_maximo = max(_estatisticas.tempo_espera_maximo, espera)
+        return conexao
+
+
+def estatisticas_pool(pool) -> Dict[str, Any]:
+    """Retorna a configuração e o estado atual do pool junto às métricas de checkout."""
+    with _lock:
+        dados = asdict(_estatisticas)
+    dados["tempo_espera_medio"] = dados["tempo_espera_total"] / dados["checkouts"] if dados["checkouts"] else 0.0
+    if isinstance(pool, QueuePool):
+        dados.update({
+            "tamanho": pool.size(),
+            "conexoes_em_uso": pool.checkedout(),
+            "conexoes_ociosas": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    return dados
@@ -0,0 +1,99 @@
+"""Contador de versão das tabelas de transações, base dos validadores HTTP (ETag/Last-Modified).
+
+Listeners de sessão marcam a sessão quando há escrita em uma tabela versionada, seja pelo flush do
+ORM (add/alteração/remoção de objetos) ou por instruções em massa (insert/update/delete executados
+via session.execute). No before_commit o contador do escopo é incrementado na mesma transação de
+banco da escrita: um rollback desfaz os dois juntos, e leitores nunca veem dados novos com versão
+antiga. O custo da leitura da versão é uma busca por chave primária em uma tabela de poucas linhas.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from model.transacao.versao_model import VersaoTabelaModel
+
+# Escopo de versão de cada tabela: observações fazem parte da representação da transação
+ESCOPO_TRANSACOES = "transacao"
+TABELAS_VERSIONADAS: Dict[str, str] = {"transacao": ESCOPO_TRANSACOES, "observacao": ESCOPO_TRANSACOES}
+
+_CHAVE_ESCOPOS = "escopos_alterados"
+
+
+@dataclass(frozen=True)
+class VersaoTabela:
+    nome: str
+    numero: int
+    data_alteracao: datetime
+
+    def etag(self, variante: Optional[str] = None) -> str:
+        """Valor da ETag (sem aspas); a variante distingue representações que dependem de algo além dos dados."""
+        return f"{self.nome}-{self.numero}" + (f"-{variante}" if variante else "")
+
+
+def _agora_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _marcar(session: Session, nome_tabela: Optional[str]) -> None:
+    escopo = TABELAS_VERSIONADAS.get(nome_tabela)
+    if escopo is not None:
+        session.info.setdefault(_CHAVE_ESCOPOS, set()).add(escopo)
+
+
+def _apos_flush(session: Session, flush_context) -> None:
+    # Neste ponto new/dirty/deleted ainda refletem o estado anterior ao flush
+    alterados = [*session.new, *session.deleted, *(o for o in session.dirty if session.is_modified(o))]
+    for objeto in alterados:
+        _marcar(session, getattr(type(objeto), "__tablename__", None))
+
+
+def _ao_executar(estado) -> None:
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabela = getattr(estado.statement, "table", None)
+        _marcar(estado.session, getattr(tabela, "name", None))
+
+
+def _antes_commit(session: Session) -> None:
+    # O commit só faz o flush final depois deste evento; antecipá-lo garante que a marcação esteja completa
+    session.flush()
+    escopos = session.info.pop(_CHAVE_ESCOPOS, None)
+    if not escopos:
+        return
+    agora = _agora_utc()
+    for escopo in sorted(escopos):
+        session.execute(update(VersaoTabelaModel).where(VersaoTabelaModel.nome == escopo)
+                        .values(versao=VersaoTabelaModel.versao + 1, data_alteracao=agora))
+
+
+def _descartar_marcacao(session: Session, *args) -> None:
+    session.info.pop(_CHAVE_ESCOPOS, None)
+
+
+def registrar_versionamento(fabrica_sessao) -> None:
+    """Registra os listeners de versionamento nas sessões criadas pela fábrica (sessionmaker)."""
+    if event.contains(fabrica_sessao, "before_commit", _antes_commit):
+        return
+    event.listen(fabrica_sessao, "after_flush", _apos_flush)
+    event.listen(fabrica_sessao, "do_orm_execute", _ao_executar)
+    event.listen(fabrica_sessao, "before_commit", _antes_commit)
+    event.listen(fabrica_sessao, "after_soft_rollback", _descartar_marcacao)
+
+
+def criar_versoes(conn: Connection) -> None:
+    """Garante uma linha de versão por escopo (idempotente)."""
+    existentes = set(conn.scalars(select(VersaoTabelaModel.nome)))
+    for escopo in sorted(set(TABELAS_VERSIONADAS.values()) - existentes):
+        conn.execute(insert(VersaoTabelaModel).values(nome=escopo, versao=0, data_alteracao=_agora_utc()))
+
+
+def obter_versao(session: Session, escopo: str = ESCOPO_TRANSACOES) -> VersaoTabela:
+    """Lê a versão atual do escopo sem tocar nas linhas de dados."""
+    linha = session.execute(select(VersaoTabelaModel.versao, VersaoTabelaModel.data_alteracao)
+                            .where(VersaoTabelaModel.nome == escopo)).first()
+    if linha is None:
+        return VersaoTabela(escopo, 0, datetime(1970, 1, 1))
+    return VersaoTabela(escopo, linha.versao, linha.data_alteracao)
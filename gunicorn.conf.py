@@ -0,0 +1,72 @@
+"""Configuração do gunicorn para produção.
+
+Uso: gunicorn -c gunicorn.conf.py
+
+Todos os parâmetros podem ser ajustados por variáveis de ambiente (ver README, seção "Produção").
+"""
+import copy
+import multiprocessing
+import os
+
+from utils.logger import CONFIG_LOG, criar_diretorio_log, iniciar_fila_logging, parar_fila_logging
+
+# Fábrica da aplicação; com preload_app é chamada uma vez no master
+wsgi_app = "app:create_app()"
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5001")
+# Workers síncronos com threads: a aplicação é bloqueante (Flask + SQLAlchemy), sem ganho com event loop
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+
+# Carrega a aplicação (migrações, engine, rotas) uma única vez no master antes do fork
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+if preload_app:
+    from services.transacao.escrita_assincrona_service import adiar_escritor
+
+    # O master não atende requisições: o escritor assíncrono (e a reaplicação dos diários) fica para os
+    # workers, iniciado em post_fork
+    adiar_escritor()
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+# Tempo para os workers concluírem as requisições em andamento em reloads (HUP) e desligamentos (TERM)
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Reciclagem periódica dos workers, com jitter para que não reiniciem todos ao mesmo tempo
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Logs do gunicorn pelos mesmos handlers da aplicação (gunicorn.error -> console e log/gunicorn.error.log)
+criar_diretorio_log()
+logconfig_dict = copy.deepcopy(CONFIG_LOG)
+# Access log (uma linha por requisição) só quando pedido: sob carga alta a escrita no console vira gargalo
+logconfig_dict["loggers"]["gunicorn.access"]["level"] = "INFO" if os.getenv("GUNICORN_ACCESS_LOG") == "1" else "WARNING"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """Prepara o worker recém-criado: fila de logs própria e descarte das conexões herdadas do master (preload_app).
+
+    Conexões DBAPI não podem ser compartilhadas entre processos; close=False apenas esquece as do
+    pool herdado, sem fechá-las, e o worker abre as suas sob demanda.
+    """
+    from database import connection
+    from services.transacao.escrita_assincrona_service import obter_escritor
+
+    # A thread da fila de logs do master não sobrevive ao fork: o worker cria a sua
+    iniciar_fila_logging()
+    # Sem preload a aplicação ainda não foi carregada neste ponto e não há conexões herdadas
+    if connection.engine is not None:
+        connection.engine.dispose(close=False)
+        server.log.info("Worker %s pronto (pool de conexões reiniciado)", worker.pid)
+    # Escritor assíncrono do worker (no-op sem ESCRITA_ASSINCRONA=1); sem preload, create_app o inicia
+    obter_escritor()
+
+
+def worker_exit(server, worker):
+    """Grava as escritas assíncronas ainda na fila e escoa os logs antes de o worker terminar."""
+    from services.transacao.escrita_assincrona_service import parar_escritor
+
+    parar_escritor()
+    parar_fila_logging()
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float
+
+from model.base.base_model import Base
+
+
+class VersaoEsquemaModel(Base):
+    """
+    Migrações de esquema já aplicadas ao banco (ver database/migracoes).
+
+    Uma linha por migração, gravada na mesma transação em que a migração é executada.
+    """
+    __tablename__ = 'versao_esquema'
+
+    versao = Column(Integer, primary_key=True, autoincrement=False)
+    descricao = Column(String(255), nullable=False)
+    data_aplicacao = Column(DateTime, nullable=False)
+    duracao_ms = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, DateTime
+
+from model.base.base_model import Base
+
+
+class ArquivoTransacaoModel(Base):
+    """
+    Catálogo do arquivo frio: um registro por ano de vencimento com transações arquivadas.
+
+    As transações do ano ficam em transacao_arquivo_AAAA (e as observações em observacao_arquivo_AAAA),
+    criadas pelo arquivamento (ver database/arquivo.py). As leituras consultam o catálogo para decidir
+    quais anos o filtro alcança; id_minimo e id_maximo limitam a busca por id.
+    """
+    __tablename__ = 'arquivo_transacao'
+
+    ano = Column(Integer, primary_key=True, autoincrement=False)
+    quantidade = Column(Integer, nullable=False, default=0)
+    id_minimo = Column(Integer, nullable=False)
+    id_maximo = Column(Integer, nullable=False)
+    data_atualizacao = Column(DateTime, nullable=False)
+
+
+class PedidoArquivadoModel(Base):
+    """
+    pedido_id das transações arquivadas, com o ano em que cada uma está.
+
+    Atende a busca por pedido sem percorrer os anos e, por trigger, mantém o pedido_id único entre
+    transacao e o arquivo.
+    """
+    __tablename__ = 'pedido_arquivado'
+
+    pedido_id = Column(Integer, primary_key=True, autoincrement=False)
+    transacao_id = Column(Integer, nullable=False)
+    ano = Column(Integer, nullable=False)
+
+
+class TransacaoArquivamentoModel(Base):
+    """
+    Transações sendo movidas para o arquivo na transação de banco corrente (vazia fora dela).
+
+    Os triggers de exclusão do consolidado e do feed de mudanças ignoram essas linhas: arquivar não é
+    excluir.
+    """
+    __tablename__ = 'transacao_arquivamento'
+
+    transacao_id = Column(Integer, primary_key=True, autoincrement=False)
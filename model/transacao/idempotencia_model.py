@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime
+
+from model.base.base_model import Base
+
+
+class ChaveIdempotenciaModel(Base):
+    """
+    Registro das chaves de idempotência já processadas nos eventos de Pedidos, por pedido.
+
+    A chave é gravada na mesma transação do upsert; reenvios do mesmo evento encontram a chave
+    e são tratados como no-op. A mesma chave em outro pedido é outro evento. Chaves mais antigas
+    que IDEMPOTENCIA_RETENCAO_DIAS são expurgadas.
+    """
+    __tablename__ = 'chave_idempotencia'
+
+    pedido_id = Column(Integer, primary_key=True, autoincrement=False)
+    chave = Column(String(255), primary_key=True)
+    data_inclusao = Column(DateTime, nullable=False, index=True)
+
+    def __init__(self, chave: str, pedido_id: int, data_inclusao: datetime = None):
+        self.chave = chave
+        self.pedido_id = pedido_id
+        self.data_inclusao = data_inclusao if data_inclusao else datetime.now()
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime
+
+from model.base.base_model import Base
+
+# Valores de TransacaoMudancaModel.operacao
+OPERACAO_CRIACAO = "criacao"
+OPERACAO_ATUALIZACAO = "atualizacao"
+OPERACAO_EXCLUSAO = "exclusao"
+
+
+class TransacaoMudancaModel(Base):
+    """
+    Registro append-only das mudanças em transações (feed de mudanças para sincronização).
+
+    Gravado por triggers na mesma transação de banco de cada escrita em transacao/observacao (ver
+    database/mudancas.py). O id é o cursor do feed: AUTOINCREMENT garante que nunca é reutilizado.
+    """
+    __tablename__ = 'transacao_mudanca'
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    transacao_id = Column(Integer, nullable=False)
+    pedido_id = Column(Integer, nullable=True)
+    # criacao, atualizacao (inclui novas observações) ou exclusao
+    operacao = Column(String(16), nullable=False)
+    # Instante (UTC) da mudança
+    data_mudanca = Column(DateTime, nullable=False)
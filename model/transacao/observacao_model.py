@@ -1,11 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 
 from model.base.base_model import Base
 
 class ObservacaoModel(Base):
     __tablename__ = 'observacao'
+    __table_args__ = (
+        # Observações de uma transação em ordem de inclusão: paginação por cursor e carga em lote (IN) pelo índice
+        Index("ix_observacao_fk_id_produto_id", "fk_id_produto", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     texto = Column(String(5000))
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, Boolean, ForeignKey
+
+from model.base.base_model import Base
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+
+
+class RecorrenciaModel(Base):
+    """
+    Regra de uma transação recorrente ou de um parcelamento.
+
+    As ocorrências materializadas são linhas de transacao com recorrencia_id e parcela (número da
+    ocorrência, a partir de 1). Recorrências sem quantidade não são materializadas na criação: as
+    ocorrências são calculadas na leitura (ver services/transacao/recorrencia_service.py).
+    """
+    __tablename__ = 'recorrencia'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    descricao = Column(String(255), nullable=False)
+    tipo_transacao = Column(Enum(TipoTransacao), nullable=False)
+    # Parcelado: valor total dividido entre as parcelas; caso contrário, valor de cada ocorrência
+    valor = Column(Float(), nullable=False)
+    parcelado = Column(Boolean, nullable=False, default=False)
+    # diaria, semanal, mensal ou anual, a cada "intervalo" unidades
+    regra = Column(String(16), nullable=False)
+    intervalo = Column(Integer, nullable=False, default=1)
+    # Vencimento da primeira ocorrência
+    data_inicio = Column(Date, nullable=False)
+    # Quantidade de ocorrências; nula para recorrências sem fim
+    quantidade = Column(Integer, nullable=True)
+    participant_id = Column(Integer, nullable=True)
+    data_inclusao = Column(DateTime, nullable=False)
+
+    def __init__(self, descricao: str, tipo_transacao: TipoTransacao, valor: float, regra: str, data_inicio: date,
+                 intervalo: int = 1, quantidade: Optional[int] = None, parcelado: bool = False,
+                 participant_id: Optional[int] = None, data_inclusao: Optional[datetime] = None):
+        self.descricao = descricao
+        self.tipo_transacao = tipo_transacao
+        self.valor = valor
+        self.regra = regra
+        self.data_inicio = data_inicio
+        self.intervalo = intervalo
+        self.quantidade = quantidade
+        self.parcelado = parcelado
+        self.participant_id = participant_id
+        self.data_inclusao = data_inclusao if data_inclusao else datetime.now()
+
+
+class OcorrenciaExcluidaModel(Base):
+    """
+    Ocorrências de recorrência cuja transação foi removida fisicamente (exclusão ou expurgo).
+
+    Sem a linha em transacao, nada distinguiria a ocorrência excluída de uma ainda não materializada:
+    o registro impede que ela volte como prevista na leitura ou seja criada de novo.
+    """
+    __tablename__ = 'recorrencia_ocorrencia_excluida'
+
+    recorrencia_id = Column(Integer, ForeignKey("recorrencia.id"), primary_key=True, autoincrement=False)
+    parcela = Column(Integer, primary_key=True, autoincrement=False)
+    data_exclusao = Column(DateTime, nullable=False)
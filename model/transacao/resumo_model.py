@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, Enum, Index
+
+from model.base.base_model import Base
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+
+
+class ResumoTransacaoModel(Base):
+    """
+    Consolidado de transações por (mês de vencimento, participante, tipo, pago).
+
+    Mantido incrementalmente por triggers a cada escrita em transacao (ver database/consolidacao.py),
+    permite ler saldos a partir de poucas linhas pré-agregadas.
+    """
+    __tablename__ = 'resumo_transacao'
+    __table_args__ = (
+        Index("ix_resumo_transacao_chave", "mes", "participant_id", "tipo_transacao", "pago"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Mês de vencimento no formato AAAA-MM; nulo para transações sem vencimento
+    mes = Column(String(7), nullable=True)
+    participant_id = Column(Integer, nullable=True)
+    tipo_transacao = Column(Enum(TipoTransacao), nullable=False)
+    pago = Column(Boolean, nullable=False)
+    quantidade = Column(Integer, nullable=False, default=0)
+    total = Column(Float(), nullable=False, default=0.0)
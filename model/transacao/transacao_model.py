@@ -2,7 +2,7 @@ from _pydatetime import date
 from datetime import datetime
 from typing import Union, Optional
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Boolean, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Boolean, Date, Index, ForeignKey
 from sqlalchemy.orm import relationship
 
 from model.base.base_model import Base
@@ -15,9 +15,16 @@ class TransacaoModel(Base):
     Classe que representa uma transação financeira no sistema.
     """
     __tablename__ = 'transacao'
+    __table_args__ = (
+        # Índices compostos para os filtros mais comuns da listagem (pendentes por vencimento, extrato do participante)
+        Index("ix_transacao_pago_data_vencimento", "pago", "data_vencimento"),
+        Index("ix_transacao_participant_id_data_vencimento", "participant_id", "data_vencimento"),
+        # Ids de transações arquivadas ou removidas não são reutilizados (bancos antigos: migração 0014)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column("pk_transacao", Integer, primary_key=True, autoincrement=True)
-    descricao = Column(String(255), nullable=False)
+    descricao = Column(String(255), nullable=False, index=True)
     tipo_transacao = Column(Enum(TipoTransacao), nullable=False)
     valor = Column(Float(), nullable=False)
     data_inclusao = Column(DateTime, default=datetime.now())
@@ -28,6 +35,13 @@ class TransacaoModel(Base):
     pedido_id = Column(Integer, unique=True, index=True, nullable=True)
     # Relacionamento lógico com Participante (opcional) - não enforced (microserviço separado)
     participant_id = Column(Integer, index=True, nullable=True)
+    # Exclusão lógica (EXCLUSAO_LOGICA=1): preenchida ao excluir; a linha some das leituras e é expurgada depois.
+    # O índice parcial ix_transacao_data_exclusao fica na migração 0008 (fora de m0003, que cria os demais)
+    data_exclusao = Column(DateTime, nullable=True)
+    # Ocorrência de recorrência/parcelamento: regra e número da ocorrência (1..N). O índice único parcial
+    # ux_transacao_recorrencia_parcela fica na migração 0011, como o de data_exclusao
+    recorrencia_id = Column(Integer, ForeignKey("recorrencia.id"), nullable=True)
+    parcela = Column(Integer, nullable=True)
 
     observacoes = relationship("ObservacaoModel")
 
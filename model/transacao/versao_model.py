@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, DateTime
+
+from model.base.base_model import Base
+
+
+class VersaoTabelaModel(Base):
+    """
+    Contador de alterações por conjunto de tabelas (ex.: "transacao" cobre transações e observações).
+
+    Incrementado na mesma transação de banco de toda escrita (ver database/versionamento.py); serve
+    de validador barato para ETag/Last-Modified sem ler as linhas de dados.
+    """
+    __tablename__ = 'versao_tabela'
+
+    nome = Column(String(64), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    # Instante (UTC) da última alteração
+    data_alteracao = Column(DateTime, nullable=False)
+
+    def __init__(self, nome: str, versao: int = 0, data_alteracao: datetime = None):
+        self.nome = nome
+        self.versao = versao
+        self.data_alteracao = data_alteracao if data_alteracao else datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,116 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.orm import Session
+
+from database.arquivo import TabelasArquivo, criar_tabelas_arquivo, tabelas_arquivo
+from model.transacao.arquivo_model import ArquivoTransacaoModel, PedidoArquivadoModel, TransacaoArquivamentoModel
+from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.transacao_model import TransacaoModel
+from schemas.transacao.transacao_schema import FiltrosTransacaoSchema
+
+
+def listar_catalogo(conexao: Union[Session, Connection]) -> List[Row]:
+    """Anos arquivados (ano, quantidade, id_minimo, id_maximo, data_atualizacao), em ordem."""
+    return conexao.execute(select(ArquivoTransacaoModel.ano, ArquivoTransacaoModel.quantidade,
+                                  ArquivoTransacaoModel.id_minimo, ArquivoTransacaoModel.id_maximo,
+                                  ArquivoTransacaoModel.data_atualizacao)
+                           .order_by(ArquivoTransacaoModel.ano)).all()
+
+
+def tabelas_arquivadas(conexao: Union[Session, Connection]) -> List[TabelasArquivo]:
+    return [tabelas_arquivo(ano) for ano in conexao.scalars(select(ArquivoTransacaoModel.ano)
+                                                            .order_by(ArquivoTransacaoModel.ano))]
+
+
+def tabelas_no_periodo(session: Session, filtros: FiltrosTransacaoSchema) -> List[TabelasArquivo]:
+    """Anos do arquivo que o filtro alcança. Só há transações pagas no arquivo: pago=false não consulta nada."""
+    if filtros.pago is False:
+        return []
+    inicio, fim = filtros.data_vencimento_inicio, filtros.data_vencimento_fim
+    stmt = select(ArquivoTransacaoModel.ano).order_by(ArquivoTransacaoModel.ano)
+    if inicio is not None:
+        stmt = stmt.where(ArquivoTransacaoModel.ano >= inicio.year)
+    if fim is not None:
+        stmt = stmt.where(ArquivoTransacaoModel.ano <= fim.year)
+    return [tabelas_arquivo(ano) for ano in session.scalars(stmt)]
+
+
+def tabelas_com_ids(session: Session, ids: Sequence[int]) -> List[TabelasArquivo]:
+    """Anos do arquivo cujo intervalo de ids contém algum dos ids informados."""
+    if not ids:
+        return []
+    minimo, maximo = min(ids), max(ids)
+    stmt = (select(ArquivoTransacaoModel.ano)
+            .where(ArquivoTransacaoModel.id_minimo <= maximo, ArquivoTransacaoModel.id_maximo >= minimo)
+            .order_by(ArquivoTransacaoModel.ano))
+    return [tabelas_arquivo(ano) for ano in session.scalars(stmt)]
+
+
+def buscar_pedido_arquivado(session: Session, pedido_id: int) -> Optional[Row]:
+    """(transacao_id, ano) da transação arquivada do pedido, ou None."""
+    return session.execute(select(PedidoArquivadoModel.transacao_id, PedidoArquivadoModel.ano)
+                           .where(PedidoArquivadoModel.pedido_id == pedido_id)).first()
+
+
+def selecionar_lote_arquivamento(conn: Connection, corte: date, tamanho_lote: int) -> List[Row]:
+    """Próximo lote de transações pagas com vencimento anterior ao corte (todas as colunas, nomes do banco).
+
+    Excluídas logicamente ficam para o expurgo. Os ids arquivados não voltam a ser atribuídos: transacao
+    usa AUTOINCREMENT (migração 0014).
+    """
+    tabela = TransacaoModel.__table__
+    return conn.execute(select(tabela)
+                        .where(tabela.c.pago.is_(True), tabela.c.data_vencimento < corte,
+                               tabela.c.data_exclusao.is_(None))
+                        .order_by(tabela.c.pk_transacao).limit(tamanho_lote)).all()
+
+
+def _atualizar_catalogo(conn: Connection, ano: int, ids: List[int], agora: datetime) -> None:
+    catalogo = ArquivoTransacaoModel
+    atual = conn.execute(select(catalogo.id_minimo, catalogo.id_maximo).where(catalogo.ano == ano)).first()
+    if atual is None:
+        conn.execute(insert(catalogo).values(ano=ano, quantidade=len(ids), id_minimo=min(ids), id_maximo=max(ids),
+                                             data_atualizacao=agora))
+        return
+    conn.execute(update(catalogo).where(catalogo.ano == ano)
+                 .values(quantidade=catalogo.quantidade + len(ids), id_minimo=min(atual.id_minimo, *ids),
+                         id_maximo=max(atual.id_maximo, *ids), data_atualizacao=agora))
+
+
+def mover_para_arquivo(conn: Connection, linhas: Sequence[Row]) -> Dict[int, int]:
+    """Copia as transações (e observações) para as tabelas do ano de vencimento e as remove de transacao.
+
+    Tudo na transação de banco da conexão; retorna a quantidade movida por ano. As cópias usam
+    INSERT OR REPLACE (SQLite): com o arquivo em outro banco (ARQUIVO_SQLITE, em WAL) o commit é atômico
+    por arquivo, e um lote interrompido entre os dois é simplesmente movido de novo na próxima execução.
+    """
+    ids = [linha.pk_transacao for linha in linhas]
+    por_ano: Dict[int, List[Row]] = {}
+    for linha in linhas:
+        por_ano.setdefault(linha.data_vencimento.year, []).append(linha)
+    observacoes: Dict[int, List[dict]] = {}
+    for observacao in conn.execute(select(ObservacaoModel.__table__)
+                                   .where(ObservacaoModel.fk_id_produto.in_(ids))).mappings():
+        observacoes.setdefault(observacao["fk_id_produto"], []).append(dict(observacao))
+
+    agora = datetime.now()
+    conn.execute(insert(TransacaoArquivamentoModel), [{"transacao_id": transacao_id} for transacao_id in ids])
+    for ano, grupo in por_ano.items():
+        tabelas = criar_tabelas_arquivo(conn, ano)
+        conn.execute(insert(tabelas.transacao).prefix_with("OR REPLACE", dialect="sqlite"),
+                     [dict(linha._mapping) for linha in grupo])
+        observacoes_ano = [o for linha in grupo for o in observacoes.get(linha.pk_transacao, [])]
+        if observacoes_ano:
+            conn.execute(insert(tabelas.observacao).prefix_with("OR REPLACE", dialect="sqlite"), observacoes_ano)
+        pedidos = [{"pedido_id": linha.pedido_id, "transacao_id": linha.pk_transacao, "ano": ano}
+                   for linha in grupo if linha.pedido_id is not None]
+        if pedidos:
+            conn.execute(insert(PedidoArquivadoModel).prefix_with("OR REPLACE", dialect="sqlite"), pedidos)
+        _atualizar_catalogo(conn, ano, [linha.pk_transacao for linha in grupo], agora)
+    conn.execute(delete(ObservacaoModel).where(ObservacaoModel.fk_id_produto.in_(ids)))
+    conn.execute(delete(TransacaoModel).where(TransacaoModel.id.in_(ids)))
+    conn.execute(delete(TransacaoArquivamentoModel))
+    return {ano: len(grupo) for ano, grupo in por_ano.items()}
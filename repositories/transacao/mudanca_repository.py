@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from model.transacao.mudanca_model import OPERACAO_EXCLUSAO, TransacaoMudancaModel
+from repositories.transacao.transacao_repository import linhas_por_ids
+
+# Colunas da mudança já com os nomes da representação da API
+COLUNAS_MUDANCA = (TransacaoMudancaModel.id.label("cursor"), TransacaoMudancaModel.transacao_id,
+                   TransacaoMudancaModel.pedido_id, TransacaoMudancaModel.operacao,
+                   TransacaoMudancaModel.data_mudanca)
+
+
+def listar_mudancas(session: Session, desde: int, limite: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """Retorna as mudanças posteriores ao cursor (em ordem), o cursor da próxima leitura e se há mais.
+
+    A leitura é uma faixa da chave primária a partir do cursor. Cada mudança traz o estado atual da
+    transação (None se ela já não existir), lido com uma consulta em lote para a página toda.
+    """
+    linhas = session.execute(select(*COLUNAS_MUDANCA).where(TransacaoMudancaModel.id > desde)
+                             .order_by(TransacaoMudancaModel.id).limit(limite + 1)).all()
+    mais = len(linhas) > limite
+    linhas = linhas[:limite]
+    atuais = linhas_por_ids(session, list({linha.transacao_id for linha in linhas
+                                           if linha.operacao != OPERACAO_EXCLUSAO}))
+    mudancas = []
+    for linha in linhas:
+        mudanca = linha._asdict()
+        mudanca["transacao"] = atuais.get(linha.transacao_id) if linha.operacao != OPERACAO_EXCLUSAO else None
+        mudancas.append(mudanca)
+    return mudancas, (linhas[-1].cursor if linhas else desde), mais
+
+
+def cursor_expirado(session: Session, desde: int) -> bool:
+    """Indica se mudanças posteriores ao cursor já foram expurgadas (o consumidor precisa ressincronizar)."""
+    if desde <= 0:
+        return False
+    menor = session.scalar(select(func.min(TransacaoMudancaModel.id)))
+    return menor is not None and desde < menor - 1
+
+
+def expurgar_mudancas(conn: Connection, limite: datetime) -> int:
+    """Remove as mudanças anteriores ao limite, preservando sempre a mais recente.
+
+    Manter a última linha deixa o menor id presente como referência para cursor_expirado.
+    """
+    ultima = conn.scalar(select(func.max(TransacaoMudancaModel.id)))
+    if ultima is None:
+        return 0
+    resultado = conn.execute(delete(TransacaoMudancaModel).where(TransacaoMudancaModel.data_mudanca < limite,
+                                                                 TransacaoMudancaModel.id < ultima))
+    return resultado.rowcount
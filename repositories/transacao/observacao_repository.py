@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.transacao_model import TransacaoModel
+
+# Colunas da observação já com os nomes da representação da API
+COLUNAS_OBSERVACAO = (ObservacaoModel.id, ObservacaoModel.fk_id_produto.label("transacao_id"), ObservacaoModel.texto,
+                      ObservacaoModel.data_inclusao)
+
+
+def buscar_pedido_da_transacao(session: Session, transacao_id: int) -> Optional[Row]:
+    """Retorna (id, pedido_id) da transação, ou None se ela não existir, sem carregar as observações."""
+    return session.execute(select(TransacaoModel.id, TransacaoModel.pedido_id)
+                           .where(TransacaoModel.id == transacao_id)).first()
+
+
+def listar_observacoes(session: Session, transacao_id: int, cursor: Optional[int],
+                       limite: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Retorna uma página das observações da transação (ordem de inclusão) e o cursor da próxima página.
+
+    A consulta percorre o índice ix_observacao_fk_id_produto_id a partir do cursor, com custo
+    proporcional à página e não à quantidade de observações da transação.
+    """
+    stmt = select(*COLUNAS_OBSERVACAO).where(ObservacaoModel.fk_id_produto == transacao_id)
+    if cursor is not None:
+        stmt = stmt.where(ObservacaoModel.id > cursor)
+    # Busca um registro a mais apenas para saber se existe próxima página
+    linhas = session.execute(stmt.order_by(ObservacaoModel.id).limit(limite + 1)).all()
+    proximo_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo_cursor = linhas[-1].id
+    return [linha._asdict() for linha in linhas], proximo_cursor
+
+
+def inserir_observacoes(session: Session, transacao_id: int, textos: Sequence[str]) -> List[Dict[str, Any]]:
+    """Inclui as observações com um único INSERT em lote e retorna apenas as criadas.
+
+    O commit fica a cargo do chamador.
+    """
+    agora = datetime.now()
+    stmt = insert(ObservacaoModel).returning(*COLUNAS_OBSERVACAO, sort_by_parameter_order=True)
+    linhas = session.execute(stmt, [{"fk_id_produto": transacao_id, "texto": texto, "data_inclusao": agora}
+                                    for texto in textos])
+    return [linha._asdict() for linha in linhas]
@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from database.exclusao_logica import OPCAO_INCLUIR_EXCLUIDAS
+from model.transacao.recorrencia_model import OcorrenciaExcluidaModel, RecorrenciaModel
+from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.arquivo_repository import tabelas_arquivadas
+from repositories.transacao.transacao_repository import COLUNAS_LEITURA
+
+
+# Colunas das ocorrências materializadas, em transacao ou no arquivo
+_COLUNAS_OCORRENCIA = ("parcela", "id", "data_vencimento", "descricao", "valor", "pago", "data_exclusao")
+
+
+def buscar_recorrencia(session: Session, recorrencia_id: int) -> Optional[RecorrenciaModel]:
+    return session.get(RecorrenciaModel, recorrencia_id)
+
+
+def inserir_ocorrencias(session: Session, linhas: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Inclui as ocorrências com um único INSERT em lote e retorna as transações criadas, na ordem enviada.
+
+    O índice único ux_transacao_recorrencia_parcela impede duas transações para a mesma ocorrência.
+    O commit fica a cargo do chamador.
+    """
+    stmt = insert(TransacaoModel).returning(*COLUNAS_LEITURA, sort_by_parameter_order=True)
+    criadas = []
+    for linha in session.execute(stmt, list(linhas)):
+        item = linha._asdict()
+        item["tipo_transacao"] = item["tipo_transacao"].value
+        item["observacoes"] = []
+        criadas.append(item)
+    return criadas
+
+
+def ocorrencias_materializadas(session: Session, recorrencia_id: int,
+                               numeros: Sequence[int]) -> Dict[int, Optional[Row]]:
+    """Transações já criadas para as ocorrências informadas, indexadas pelo número da parcela.
+
+    Ocorrências excluídas (logicamente, ou removidas e registradas em recorrencia_ocorrencia_excluida) ficam
+    no resultado com valor None, para não voltarem como previstas. As não encontradas em transacao são
+    procuradas no arquivo (ocorrências antigas já pagas).
+    """
+    if not numeros:
+        return {}
+    materializadas: Dict[int, Optional[Row]] = dict.fromkeys(session.scalars(
+        select(OcorrenciaExcluidaModel.parcela).where(OcorrenciaExcluidaModel.recorrencia_id == recorrencia_id,
+                                                      OcorrenciaExcluidaModel.parcela.in_(numeros))))
+    for origem in [TransacaoModel] + [tabelas.colunas for tabelas in tabelas_arquivadas(session)]:
+        faltantes = [numero for numero in numeros if numero not in materializadas]
+        if not faltantes:
+            break
+        stmt = (select(*[getattr(origem, nome).label(nome) for nome in _COLUNAS_OCORRENCIA])
+                .where(origem.recorrencia_id == recorrencia_id, origem.parcela.in_(faltantes)))
+        for linha in session.execute(stmt, execution_options={OPCAO_INCLUIR_EXCLUIDAS: True}):
+            materializadas[linha.parcela] = linha if linha.data_exclusao is None else None
+    return materializadas
@@ -0,0 +1,228 @@
+import calendar
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakSet
+
+from sqlalchemy import and_, case, func, select, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database.consolidacao import consolidacao_disponivel
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.resumo_model import ResumoTransacaoModel
+from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.arquivo_repository import tabelas_no_periodo
+from repositories.transacao.transacao_repository import aplicar_filtros
+from schemas.transacao.transacao_schema import ResumoFiltroSchema
+
+CAMPOS_TOTAIS = ["quantidade", "receitas", "despesas", "receitas_pagas", "despesas_pagas", "receitas_pendentes",
+                 "despesas_pendentes", "receitas_vencidas", "despesas_vencidas"]
+
+
+def expressao_mes(dialeto: str, coluna=TransacaoModel.data_vencimento):
+    """Expressão SQL do mês (AAAA-MM) de uma coluna de data, conforme o dialeto."""
+    if dialeto == "postgresql":
+        return func.to_char(coluna, "YYYY-MM")
+    return func.strftime("%Y-%m", coluna)
+
+
+def _soma(condicao, valor):
+    return func.coalesce(func.sum(case((condicao, valor), else_=0)), 0)
+
+
+def _colunas_totais(hoje: date, origem=TransacaoModel) -> List[Any]:
+    receita = origem.tipo_transacao == TipoTransacao.RECEITA
+    despesa = origem.tipo_transacao == TipoTransacao.DESPESA
+    pago = origem.pago.is_(True)
+    pendente = origem.pago.is_(False)
+    vencida = and_(pendente, origem.data_vencimento < hoje)
+    return [
+        func.count(origem.id).label("quantidade"),
+        _soma(receita, origem.valor).label("receitas"),
+        _soma(despesa, origem.valor).label("despesas"),
+        _soma(and_(receita, pago), origem.valor).label("receitas_pagas"),
+        _soma(and_(despesa, pago), origem.valor).label("despesas_pagas"),
+        _soma(and_(receita, pendente), origem.valor).label("receitas_pendentes"),
+        _soma(and_(despesa, pendente), origem.valor).label("despesas_pendentes"),
+        _soma(and_(receita, vencida), origem.valor).label("receitas_vencidas"),
+        _soma(and_(despesa, vencida), origem.valor).label("despesas_vencidas"),
+    ]
+
+
+def totais_vazios() -> Dict[str, Any]:
+    return {"quantidade": 0} | {campo: 0.0 for campo in CAMPOS_TOTAIS[1:]} | {"saldo": 0.0}
+
+
+def acumular_totais(total: Dict[str, Any], grupo: Dict[str, Any]) -> None:
+    for campo in CAMPOS_TOTAIS:
+        total[campo] += grupo[campo]
+    total["saldo"] = total["receitas"] - total["despesas"]
+
+
+def _colunas_agrupamento(filtros: ResumoFiltroSchema, mes, participant_id) -> List[Any]:
+    colunas = []
+    if filtros.agrupar_por in ("mes", "mes_participante"):
+        colunas.append(mes.label("mes"))
+    if filtros.agrupar_por in ("participante", "mes_participante"):
+        colunas.append(participant_id.label("participant_id"))
+    return colunas
+
+
+# Colunas de transacao usadas pela agregação, também lidas das tabelas de arquivo
+_COLUNAS_AGREGACAO = ("id", "tipo_transacao", "valor", "pago", "data_vencimento", "participant_id")
+
+
+def _origem_com_arquivo(session: Session, filtros: ResumoFiltroSchema):
+    """Transações filtradas unidas (UNION ALL) às arquivadas dos anos alcançados, ou None se nenhum ano for."""
+    tabelas = tabelas_no_periodo(session, filtros)
+    if not tabelas:
+        return None
+    partes = [aplicar_filtros(select(*[getattr(origem, nome).label(nome) for nome in _COLUNAS_AGREGACAO]),
+                              filtros, origem)
+              for origem in [TransacaoModel] + [tabela.colunas for tabela in tabelas]]
+    return union_all(*partes).subquery().c
+
+
+def _resumir_agregando_transacoes(session: Session, filtros: ResumoFiltroSchema, hoje: date) -> Dict[str, Any]:
+    """Agrega direto sobre transacao (e o arquivo, se o período o alcançar): uma linha por grupo, no banco."""
+    origem = _origem_com_arquivo(session, filtros)
+    dialeto = session.get_bind().dialect.name
+    if origem is None:
+        agrupamento = _colunas_agrupamento(filtros, expressao_mes(dialeto), TransacaoModel.participant_id)
+        stmt = aplicar_filtros(select(*agrupamento, *_colunas_totais(hoje)), filtros)
+    else:
+        agrupamento = _colunas_agrupamento(filtros, expressao_mes(dialeto, origem.data_vencimento),
+                                           origem.participant_id)
+        stmt = select(*agrupamento, *_colunas_totais(hoje, origem))
+    if agrupamento:
+        stmt = stmt.group_by(*agrupamento).order_by(*agrupamento)
+
+    grupos = []
+    total = totais_vazios()
+    for linha in session.execute(stmt).mappings():
+        grupo = dict(linha)
+        if not grupo["quantidade"]:
+            continue
+        for campo in CAMPOS_TOTAIS[1:]:
+            grupo[campo] = float(grupo[campo])
+        grupo["saldo"] = grupo["receitas"] - grupo["despesas"]
+        acumular_totais(total, grupo)
+        grupos.append(grupo)
+    return {"grupos": grupos, "total": total, "fonte": "transacoes"}
+
+
+# Engines em que os triggers do consolidado já foram encontrados. Só a presença é guardada: com
+# MIGRAR_NA_INICIALIZACAO=0 a migração aplicada depois passa a valer sem reiniciar a aplicação.
+_engines_com_consolidado: "WeakSet[Engine]" = WeakSet()
+
+
+def _consolidado_disponivel(engine: Engine) -> bool:
+    if engine in _engines_com_consolidado:
+        return True
+    if not consolidacao_disponivel(engine):
+        return False
+    _engines_com_consolidado.add(engine)
+    return True
+
+
+def _atende_pelo_consolidado(filtros: ResumoFiltroSchema) -> bool:
+    """O consolidado só responde filtros nas suas chaves, com período de vencimento em meses inteiros."""
+    if filtros.data_pagamento_inicio is not None or filtros.data_pagamento_fim is not None:
+        return False
+    inicio, fim = filtros.data_vencimento_inicio, filtros.data_vencimento_fim
+    if inicio is not None and inicio.day != 1:
+        return False
+    if fim is not None and fim.day != calendar.monthrange(fim.year, fim.month)[1]:
+        return False
+    return True
+
+
+def _filtrar_consolidado(stmt, filtros: ResumoFiltroSchema):
+    r = ResumoTransacaoModel
+    if filtros.tipo_transacao is not None:
+        stmt = stmt.where(r.tipo_transacao == TipoTransacao(filtros.tipo_transacao))
+    if filtros.pago is not None:
+        stmt = stmt.where(r.pago == filtros.pago)
+    if filtros.participant_id is not None:
+        stmt = stmt.where(r.participant_id == filtros.participant_id)
+    if filtros.data_vencimento_inicio is not None:
+        stmt = stmt.where(r.mes >= filtros.data_vencimento_inicio.strftime("%Y-%m"))
+    if filtros.data_vencimento_fim is not None:
+        stmt = stmt.where(r.mes <= filtros.data_vencimento_fim.strftime("%Y-%m"))
+    return stmt
+
+
+def _vencidas_mes_atual(session: Session, filtros: ResumoFiltroSchema, hoje: date) -> Dict[Tuple, Dict[str, float]]:
+    """Pendentes do mês corrente já vencidas (vencimento antes de hoje), via índice (pago, data_vencimento)."""
+    agrupamento = _colunas_agrupamento(filtros, expressao_mes(session.get_bind().dialect.name),
+                                       TransacaoModel.participant_id)
+    stmt = aplicar_filtros(select(*agrupamento, TransacaoModel.tipo_transacao,
+                                  func.sum(TransacaoModel.valor).label("total")), filtros)
+    stmt = stmt.where(TransacaoModel.pago.is_(False),
+                      TransacaoModel.data_vencimento >= hoje.replace(day=1),
+                      TransacaoModel.data_vencimento < hoje)
+    stmt = stmt.group_by(*agrupamento, TransacaoModel.tipo_transacao)
+
+    vencidas: Dict[Tuple, Dict[str, float]] = {}
+    for linha in session.execute(stmt):
+        *chave, tipo, total = linha
+        campo = "receitas_vencidas" if tipo == TipoTransacao.RECEITA else "despesas_vencidas"
+        vencidas.setdefault(tuple(chave), {})[campo] = float(total)
+    return vencidas
+
+
+def _resumir_pelo_consolidado(session: Session, filtros: ResumoFiltroSchema, hoje: date) -> Dict[str, Any]:
+    """Monta o resumo a partir das linhas pré-agregadas de resumo_transacao.
+
+    Pendentes de meses anteriores ao atual estão todas vencidas; as do mês atual vencidas antes de
+    hoje são somadas por uma consulta indexada restrita ao mês corrente.
+    """
+    r = ResumoTransacaoModel
+    agrupamento = _colunas_agrupamento(filtros, r.mes, r.participant_id)
+    mes_anterior = (r.mes < hoje.strftime("%Y-%m")).label("mes_anterior")
+    stmt = _filtrar_consolidado(select(*agrupamento, r.tipo_transacao, r.pago, mes_anterior,
+                                       func.sum(r.quantidade).label("quantidade"),
+                                       func.sum(r.total).label("total")), filtros)
+    stmt = stmt.group_by(*agrupamento, r.tipo_transacao, r.pago, mes_anterior)
+
+    nomes_chave = [c.name for c in agrupamento]
+    grupos: Dict[Tuple, Dict[str, Any]] = {}
+    for linha in session.execute(stmt).mappings():
+        chave = tuple(linha[nome] for nome in nomes_chave)
+        grupo = grupos.setdefault(chave, dict(zip(nomes_chave, chave)) | totais_vazios())
+        prefixo = "receitas" if linha["tipo_transacao"] == TipoTransacao.RECEITA else "despesas"
+        total = float(linha["total"])
+        grupo["quantidade"] += linha["quantidade"]
+        grupo[prefixo] += total
+        grupo[f"{prefixo}_pagas" if linha["pago"] else f"{prefixo}_pendentes"] += total
+        if not linha["pago"] and linha["mes_anterior"]:
+            grupo[f"{prefixo}_vencidas"] += total
+
+    for chave, valores in _vencidas_mes_atual(session, filtros, hoje).items():
+        # Sem o grupo no consolidado (ex.: divergência a corrigir com "consolidacao reconstruir")
+        grupo = grupos.setdefault(chave, dict(zip(nomes_chave, chave)) | totais_vazios())
+        for campo, valor in valores.items():
+            grupo[campo] += valor
+
+    total = totais_vazios()
+    ordenados = []
+    for chave in sorted(grupos, key=lambda c: tuple((v is not None, v) for v in c)):
+        grupo = grupos[chave]
+        grupo["saldo"] = grupo["receitas"] - grupo["despesas"]
+        acumular_totais(total, grupo)
+        ordenados.append(grupo)
+    return {"grupos": ordenados, "total": total, "fonte": "consolidado"}
+
+
+def resumir_transacoes(session: Session, filtros: ResumoFiltroSchema,
+                       hoje: Optional[date] = None) -> Dict[str, Any]:
+    """Calcula os totais de receitas, despesas, pagos, pendentes e vencidos por grupo.
+
+    Usa o consolidado resumo_transacao quando disponível e compatível com os filtros (ele já inclui
+    as transações arquivadas); caso contrário agrega (GROUP BY) direto sobre transacao e os anos do
+    arquivo que o período alcança. Em ambos os casos o total geral é a soma dos grupos.
+    """
+    hoje = hoje or date.today()
+    if _atende_pelo_consolidado(filtros) and _consolidado_disponivel(session.get_bind()):
+        return _resumir_pelo_consolidado(session, filtros, hoje)
+    return _resumir_agregando_transacoes(session, filtros, hoje)
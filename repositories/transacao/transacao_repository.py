@@ -0,0 +1,295 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Integer, Select, column, delete, insert, literal, literal_column, select, table, \
+    text, union_all, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload
+
+from database.arquivo import tabelas_arquivo
+from database.busca_textual import TABELA_FTS, busca_textual_disponivel, expressao_fts
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.recorrencia_model import OcorrenciaExcluidaModel
+from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.arquivo_repository import buscar_pedido_arquivado, tabelas_com_ids, tabelas_no_periodo
+from schemas.transacao.transacao_schema import FiltrosTransacaoSchema, TransacaoFiltroSchema
+
+# Quantidade de linhas trazidas do cursor do banco por vez no modo streaming
+TAMANHO_LOTE_STREAMING = 500
+# Ids por instrução (IN) na exclusão em lote; abaixo do limite de parâmetros do SQLite
+TAMANHO_CHUNK_EXCLUSAO = 500
+
+
+def aplicar_filtros(stmt: Select, filtros: FiltrosTransacaoSchema, origem=TransacaoModel) -> Select:
+    """Aplica ao select os filtros server-side informados na listagem de transações.
+
+    origem fornece as colunas pelos nomes dos atributos de TransacaoModel (ex.: TabelasArquivo.colunas).
+    """
+    if filtros.tipo_transacao is not None:
+        stmt = stmt.where(origem.tipo_transacao == TipoTransacao(filtros.tipo_transacao))
+    if filtros.pago is not None:
+        stmt = stmt.where(origem.pago == filtros.pago)
+    if filtros.participant_id is not None:
+        stmt = stmt.where(origem.participant_id == filtros.participant_id)
+    if filtros.data_vencimento_inicio is not None:
+        stmt = stmt.where(origem.data_vencimento >= filtros.data_vencimento_inicio)
+    if filtros.data_vencimento_fim is not None:
+        stmt = stmt.where(origem.data_vencimento <= filtros.data_vencimento_fim)
+    if filtros.data_pagamento_inicio is not None:
+        stmt = stmt.where(origem.data_pagamento >= filtros.data_pagamento_inicio)
+    if filtros.data_pagamento_fim is not None:
+        stmt = stmt.where(origem.data_pagamento <= filtros.data_pagamento_fim)
+    return stmt
+
+
+def select_transacoes() -> Select:
+    """Select base de transações com as observações carregadas em lote.
+
+    As observações de todas as transações retornadas são buscadas em uma única consulta
+    com IN (por lote, no modo streaming), evitando um SELECT adicional por transação.
+    """
+    return select(TransacaoModel).options(selectinload(TransacaoModel.observacoes))
+
+
+def buscar_por_id(session: Session, transacao_id: int) -> Optional[TransacaoModel]:
+    """Retorna a transação pelo id, com observações carregadas."""
+    return session.scalars(select_transacoes().where(TransacaoModel.id == transacao_id)).first()
+
+
+def buscar_por_descricao(session: Session, descricao: str) -> Optional[TransacaoModel]:
+    """Retorna a primeira transação com a descrição informada, com observações carregadas."""
+    return session.scalars(select_transacoes().where(TransacaoModel.descricao == descricao).limit(1)).first()
+
+
+def buscar_por_pedido(session: Session, pedido_id: int) -> Optional[TransacaoModel]:
+    """Retorna a transação vinculada ao pedido, com observações carregadas."""
+    return session.scalars(select_transacoes().where(TransacaoModel.pedido_id == pedido_id)).first()
+
+
+def select_exclusao(ids: Optional[Sequence[int]] = None,
+                    filtros: Optional[FiltrosTransacaoSchema] = None) -> Select:
+    """Select (id, pedido_id) das transações alvo de uma exclusão: ids e filtros combinados com E."""
+    stmt = select(TransacaoModel.id, TransacaoModel.pedido_id)
+    if ids is not None:
+        stmt = stmt.where(TransacaoModel.id.in_(ids))
+    if filtros is not None:
+        stmt = aplicar_filtros(stmt, filtros)
+    return stmt
+
+
+def excluir_transacoes(session: Session, alvo: Select, logica: bool,
+                       tamanho_chunk: int = TAMANHO_CHUNK_EXCLUSAO) -> List[Tuple[int, Optional[int]]]:
+    """Exclui as transações de alvo (select de id, pedido_id) e retorna (id, pedido_id) de cada uma.
+
+    Com logica=True apenas preenche data_exclusao (a linha some das consultas e é expurgada depois);
+    senão remove as observações e as transações. As instruções são emitidas em chunks de ids para
+    limitar o tamanho do IN, todas na transação da sessão: o commit (ou rollback) fica a cargo do chamador.
+    """
+    removidas = [tuple(linha) for linha in session.execute(alvo)]
+    agora = datetime.now()
+    opcoes = {"synchronize_session": False}
+    for inicio in range(0, len(removidas), tamanho_chunk):
+        ids = [transacao_id for transacao_id, _ in removidas[inicio:inicio + tamanho_chunk]]
+        if logica:
+            session.execute(update(TransacaoModel).where(TransacaoModel.id.in_(ids)).values(data_exclusao=agora),
+                            execution_options=opcoes)
+            continue
+        session.execute(delete(ObservacaoModel).where(ObservacaoModel.fk_id_produto.in_(ids)),
+                        execution_options=opcoes)
+        registrar_ocorrencias_excluidas(session, ids, agora)
+        session.execute(delete(TransacaoModel).where(TransacaoModel.id.in_(ids)), execution_options=opcoes)
+    return removidas
+
+
+def registrar_ocorrencias_excluidas(conexao, ids: Sequence[int], agora: datetime) -> None:
+    """Registra as ocorrências de recorrência entre as transações (ids) que serão removidas fisicamente.
+
+    conexao é uma Session ou Connection; deve ser chamado antes do DELETE, na mesma transação.
+    """
+    ocorrencias = (select(TransacaoModel.recorrencia_id, TransacaoModel.parcela, literal(agora, DateTime))
+                   .where(TransacaoModel.id.in_(ids), TransacaoModel.recorrencia_id.is_not(None)))
+    conexao.execute(insert(OcorrenciaExcluidaModel)
+                    .from_select(["recorrencia_id", "parcela", "data_exclusao"], ocorrencias))
+
+
+def _select_keyset(filtros: TransacaoFiltroSchema, base: Optional[Select] = None, origem=TransacaoModel) -> Select:
+    """Monta o select ordenado por pk_transacao a partir do cursor (keyset pagination)."""
+    stmt = aplicar_filtros(base if base is not None else select_transacoes(), filtros, origem)
+    if filtros.cursor is not None:
+        stmt = stmt.where(origem.id > filtros.cursor)
+    return stmt.order_by(origem.id)
+
+
+# Colunas lidas no caminho rápido, já com os nomes da representação da API
+COLUNAS_LEITURA = (TransacaoModel.id, TransacaoModel.data_vencimento, TransacaoModel.descricao,
+                   TransacaoModel.tipo_transacao, TransacaoModel.valor, TransacaoModel.pago,
+                   TransacaoModel.data_pagamento, TransacaoModel.pedido_id, TransacaoModel.participant_id)
+NOMES_LEITURA = tuple(coluna.key for coluna in COLUNAS_LEITURA)
+
+
+def _colunas_leitura(origem, ano: Optional[int], com_origem: bool) -> List[Any]:
+    """COLUNAS_LEITURA rotuladas, em transacao ou no arquivo (origem); com_origem acrescenta ano_arquivo."""
+    colunas = [getattr(origem, nome).label(nome) for nome in NOMES_LEITURA]
+    return colunas + [literal(ano, Integer).label("ano_arquivo")] if com_origem else colunas
+
+
+def _select_linhas(session: Session, filtros: TransacaoFiltroSchema, limite: Optional[int],
+                   com_origem: bool = True):
+    """Select das linhas de leitura em ordem de id, unindo (UNION ALL) os anos do arquivo que o filtro alcança.
+
+    Sem ano arquivado no período é o select de sempre sobre transacao. Com arquivo, cada parte percorre
+    a própria chave primária e o SQLite intercala as partes já ordenadas, parando no limite.
+    """
+    tabelas = tabelas_no_periodo(session, filtros)
+    if not tabelas:
+        stmt = _select_keyset(filtros, select(*COLUNAS_LEITURA))
+        return stmt.limit(limite) if limite is not None else stmt
+    partes = []
+    for origem, ano in [(TransacaoModel, None)] + [(tabela.colunas, tabela.ano) for tabela in tabelas]:
+        parte = aplicar_filtros(select(*_colunas_leitura(origem, ano, com_origem)), filtros, origem)
+        if filtros.cursor is not None:
+            parte = parte.where(origem.id > filtros.cursor)
+        partes.append(parte)
+    stmt = union_all(*partes).order_by(literal_column("id"))
+    return stmt.limit(limite) if limite is not None else stmt
+
+
+def _observacoes_por_transacao(session: Session, ids: Sequence[int],
+                               origem=ObservacaoModel) -> Dict[int, List[Dict[str, Any]]]:
+    """Observações das transações informadas, em uma única consulta com IN (origem: observacao ou arquivo)."""
+    observacoes: Dict[int, List[Dict[str, Any]]] = {}
+    if not ids:
+        return observacoes
+    stmt = (select(origem.fk_id_produto, origem.texto, origem.data_inclusao)
+            .where(origem.fk_id_produto.in_(ids)).order_by(origem.id))
+    for transacao_id, texto, data_inclusao in session.execute(stmt):
+        observacoes.setdefault(transacao_id, []).append({"texto": texto, "data_inclusao": data_inclusao})
+    return observacoes
+
+
+def _linhas_para_dicts(session: Session, linhas: Sequence[Row]) -> List[Dict[str, Any]]:
+    """Converte tuplas de colunas no mesmo formato de apresenta_transacao, sem instanciar o ORM.
+
+    Linhas com ano_arquivo buscam as observações na tabela de arquivo do ano.
+    """
+    ids_por_origem: Dict[Optional[int], List[int]] = {}
+    for linha in linhas:
+        ids_por_origem.setdefault(getattr(linha, "ano_arquivo", None), []).append(linha.id)
+    observacoes: Dict[int, List[Dict[str, Any]]] = {}
+    for ano, ids in ids_por_origem.items():
+        origem = ObservacaoModel if ano is None else tabelas_arquivo(ano).observacao.c
+        observacoes.update(_observacoes_por_transacao(session, ids, origem))
+    resultado = []
+    for linha in linhas:
+        item = linha._asdict()
+        item.pop("ano_arquivo", None)
+        item["tipo_transacao"] = item["tipo_transacao"].value
+        item["observacoes"] = observacoes.get(linha.id, [])
+        resultado.append(item)
+    return resultado
+
+
+def listar_pagina_linhas(session: Session, filtros: TransacaoFiltroSchema,
+                         limite: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Uma página de transações (dicts prontos para serialização) e o cursor da próxima, ou None no fim.
+
+    Inclui as transações arquivadas dos anos que o filtro alcança.
+    """
+    linhas = session.execute(_select_linhas(session, filtros, limite + 1)).all()
+    proximo_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo_cursor = linhas[-1].id
+    return _linhas_para_dicts(session, linhas), proximo_cursor
+
+
+def _linhas_arquivadas(session: Session, ids: Sequence[int]) -> List[Row]:
+    """Linhas de leitura (com ano_arquivo) das transações arquivadas com os ids, só nos anos que podem contê-las."""
+    linhas = []
+    for tabelas in tabelas_com_ids(session, ids):
+        linhas += session.execute(select(*_colunas_leitura(tabelas.colunas, tabelas.ano, com_origem=True))
+                                  .where(tabelas.colunas.id.in_(ids))).all()
+    return linhas
+
+
+def linhas_por_ids(session: Session, ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Representação atual (como apresenta_transacao) das transações informadas, indexada pelo id.
+
+    Transações inexistentes ou excluídas ficam de fora do resultado; as não encontradas em transacao
+    são procuradas no arquivo.
+    """
+    if not ids:
+        return {}
+    linhas = session.execute(select(*COLUNAS_LEITURA).where(TransacaoModel.id.in_(ids))).all()
+    faltantes = list(set(ids) - {linha.id for linha in linhas})
+    if faltantes:
+        linhas += _linhas_arquivadas(session, faltantes)
+    return {item["id"]: item for item in _linhas_para_dicts(session, linhas)}
+
+
+def linha_arquivada_por_id(session: Session, transacao_id: int) -> Optional[Dict[str, Any]]:
+    """Representação da transação arquivada com o id informado, ou None."""
+    linhas = _linhas_arquivadas(session, [transacao_id])
+    return _linhas_para_dicts(session, linhas)[0] if linhas else None
+
+
+def linha_arquivada_por_pedido(session: Session, pedido_id: int) -> Optional[Dict[str, Any]]:
+    """Representação da transação arquivada do pedido (localizada por pedido_arquivado), ou None."""
+    arquivada = buscar_pedido_arquivado(session, pedido_id)
+    if arquivada is None:
+        return None
+    tabelas = tabelas_arquivo(arquivada.ano)
+    linhas = session.execute(select(*_colunas_leitura(tabelas.colunas, tabelas.ano, com_origem=True))
+                             .where(tabelas.colunas.id == arquivada.transacao_id)).all()
+    return _linhas_para_dicts(session, linhas)[0] if linhas else None
+
+
+def iterar_linhas(session: Session, filtros: TransacaoFiltroSchema) -> Iterator[Dict[str, Any]]:
+    """Itera sobre as transações filtradas em dicts, lendo do cursor do banco um lote de linhas e uma consulta
+    de observações por vez. O limite, quando informado, restringe a quantidade total de linhas emitidas.
+    """
+    stmt = _select_linhas(session, filtros, filtros.limite)
+    resultado = session.execute(stmt.execution_options(yield_per=TAMANHO_LOTE_STREAMING))
+    for lote in resultado.partitions():
+        yield from _linhas_para_dicts(session, lote)
+
+
+def iterar_lotes_linhas(session: Session, filtros: TransacaoFiltroSchema, tamanho_lote: int) -> Iterator[List[Row]]:
+    """Lotes de tuplas (COLUNAS_LEITURA, sem observações) lidos do cursor do banco, tamanho_lote linhas por vez.
+
+    Base da exportação: a memória usada depende do tamanho do lote, e não do total de linhas.
+    """
+    stmt = _select_linhas(session, filtros, filtros.limite, com_origem=False)
+    yield from session.execute(stmt.execution_options(yield_per=tamanho_lote)).partitions()
+
+
+def _select_busca(session: Session, termo: str, modo: str) -> Select:
+    """Monta o select da busca por descrição, já ordenado por relevância (texto) ou id."""
+    stmt = select_transacoes()
+    if modo == "exato":
+        return stmt.where(TransacaoModel.descricao == termo).order_by(TransacaoModel.id)
+    if modo == "prefixo":
+        # Intervalo [termo, termo + maior caractere) percorre o índice ix_transacao_descricao (LIKE não o usaria)
+        return stmt.where(TransacaoModel.descricao >= termo,
+                          TransacaoModel.descricao < termo + "\U0010ffff").order_by(TransacaoModel.descricao)
+
+    expressao = expressao_fts(termo)
+    if expressao and busca_textual_disponivel(session.get_bind()):
+        fts = table(TABELA_FTS, column("rowid"), column("rank"))
+        return (stmt.join(fts, fts.c.rowid == TransacaoModel.id)
+                .where(text(f"{TABELA_FTS} MATCH :expressao").bindparams(expressao=expressao))
+                .order_by(fts.c.rank, TransacaoModel.id))
+    return stmt.where(TransacaoModel.descricao.ilike(f"%{termo}%")).order_by(TransacaoModel.id)
+
+
+def buscar_por_texto(session: Session, termo: str, modo: str, limite: int,
+                     pagina: int) -> Tuple[List[TransacaoModel], bool]:
+    """Busca transações pela descrição e retorna a página pedida e se existe página seguinte.
+
+    Modos: exato (igualdade), prefixo (início da descrição) e texto (FTS5 com ranking bm25,
+    casando prefixos de cada palavra, sem diferenciar acentos ou maiúsculas).
+    """
+    stmt = _select_busca(session, termo, modo).limit(limite + 1).offset((pagina - 1) * limite)
+    transacoes = list(session.scalars(stmt))
+    return transacoes[:limite], len(transacoes) > limite
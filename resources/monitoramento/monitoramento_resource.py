@@ -0,0 +1,79 @@
+from flask import Response
+from flask_openapi3 import Tag
+
+from database.connection import obter_engine
+from database.pool import estatisticas_pool
+from schemas.monitoramento.monitoramento_schema import EstatisticasPoolSchema, EstatisticasCacheSchema
+from services.transacao.cache_service import estatisticas_cache
+from services.transacao.escrita_assincrona_service import obter_escritor
+from utils.metricas import TIPO_CONTEUDO, metricas_habilitadas, registro_metricas
+
+monitoramento_tag = Tag(name="Monitoramento", description="Estado interno da aplicação (pool de conexões e cache)")
+
+# Campos de estatisticas_pool expostos em /metrics: (campo, métrica, tipo, descrição)
+_METRICAS_POOL = [
+    ("checkouts", "econome_pool_checkouts_total", "counter", "Conexões entregues pelo pool"),
+    ("timeouts", "econome_pool_timeouts_total", "counter", "Esperas por conexão encerradas por timeout"),
+    ("tempo_espera_total", "econome_pool_espera_segundos_total", "counter", "Tempo total de espera por conexão"),
+    ("tempo_espera_maximo", "econome_pool_espera_maxima_segundos", "gauge", "Maior espera por conexão"),
+    ("tamanho", "econome_pool_tamanho", "gauge", "Tamanho configurado do pool"),
+    ("conexoes_em_uso", "econome_pool_conexoes_em_uso", "gauge", "Conexões emprestadas no momento"),
+    ("conexoes_ociosas", "econome_pool_conexoes_ociosas", "gauge", "Conexões ociosas no pool"),
+    ("overflow", "econome_pool_overflow", "gauge", "Conexões além do tamanho do pool (negativo: folga)"),
+]
+
+_METRICAS_CACHE = [
+    ("acertos", "econome_cache_acertos_total", "counter", "Leituras atendidas pelo cache de transações"),
+    ("falhas", "econome_cache_falhas_total", "counter", "Leituras não encontradas no cache de transações"),
+    ("invalidacoes", "econome_cache_invalidacoes_total", "counter", "Entradas invalidadas por escritas"),
+    ("itens", "econome_cache_itens", "gauge", "Itens no cache em memória"),
+]
+
+
+def _coletar_pool():
+    dados = estatisticas_pool(obter_engine().pool)
+    return [(nome, tipo, descricao, [({}, dados[campo])])
+            for campo, nome, tipo, descricao in _METRICAS_POOL if campo in dados]
+
+
+def _coletar_cache():
+    dados = estatisticas_cache()
+    return [(nome, tipo, descricao, [({"backend": dados["backend"]}, dados[campo])])
+            for campo, nome, tipo, descricao in _METRICAS_CACHE if campo in dados]
+
+
+def _coletar_escritas():
+    escritor = obter_escritor()
+    if escritor is None:
+        return []
+    return [("econome_escrita_fila_itens", "gauge", "Escritas assíncronas aguardando gravação",
+             [({}, escritor.tamanho_fila())]),
+            ("econome_escrita_grupos_total", "counter", "Grupos gravados com um único commit",
+             [({}, escritor.grupos_gravados)]),
+            ("econome_escrita_gravadas_total", "counter", "Escritas assíncronas gravadas",
+             [({}, escritor.escritas_gravadas)])]
+
+
+def config_monitoramento_routes(app):
+    @app.get('/monitoramento/pool', tags=[monitoramento_tag], responses={"200": EstatisticasPoolSchema})
+    def get_estatisticas_pool():
+        """Retorna o estado do pool de conexões com o banco e as métricas de espera por conexão"""
+        return estatisticas_pool(obter_engine().pool), 200
+
+    @app.get('/monitoramento/cache', tags=[monitoramento_tag], responses={"200": EstatisticasCacheSchema})
+    def get_estatisticas_cache():
+        """Retorna os contadores do cache de leitura de transações (acertos, falhas, remoções e invalidações)"""
+        return estatisticas_cache(), 200
+
+    if not metricas_habilitadas(app):
+        return
+
+    registro_metricas.registrar_coletor("pool", _coletar_pool)
+    registro_metricas.registrar_coletor("cache", _coletar_cache)
+    registro_metricas.registrar_coletor("escritas", _coletar_escritas)
+
+    @app.get('/metrics', tags=[monitoramento_tag],
+             responses={"200": {"description": "Métricas no formato de texto do Prometheus"}})
+    def get_metricas():
+        """Retorna as métricas da aplicação (latência por rota, SQL por requisição, pool e cache) para o Prometheus"""
+        return Response(registro_metricas.exportar(), content_type=TIPO_CONTEUDO)
@@ -0,0 +1,27 @@
+from flask_openapi3 import Tag
+
+from schemas.error.error_schema import ErrorSchema
+from schemas.transacao.escrita_schema import EscritaIdPathSchema, StatusEscritaSchema
+from services.transacao.escrita_assincrona_service import escrita_assincrona_habilitada, obter_escritor
+
+escrita_tag = Tag(name="Escritas assíncronas", description="Acompanhamento das escritas aceitas com 202 "
+                                                           "(ESCRITA_ASSINCRONA=1)")
+
+
+def config_escrita_routes(app):
+    if not escrita_assincrona_habilitada(app):
+        return
+
+    @app.get('/escritas/<id_rastreamento>', tags=[escrita_tag],
+             responses={"200": StatusEscritaSchema,
+                        "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"]})
+    def get_status_escrita(path: EscritaIdPathSchema):
+        """Retorna a situação de uma escrita assíncrona: pendente, aplicada (com o id da transação) ou erro
+
+        A situação é mantida em memória pelo processo que aceitou a escrita (até ESCRITA_RESULTADOS_MANTIDOS
+        itens); com vários workers, ids de outro processo respondem 404.
+        """
+        resultado = obter_escritor().resultado(path.id_rastreamento)
+        if resultado is None:
+            return {"message": "Escrita não encontrada"}, 404
+        return resultado, 200
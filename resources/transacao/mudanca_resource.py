@@ -0,0 +1,123 @@
+import time
+from weakref import WeakSet
+
+from flask import Response, current_app, stream_with_context
+from flask_openapi3 import Tag
+from sqlalchemy.engine import Engine
+
+from database.connection import Session, obter_engine
+from database.mudancas import feed_mudancas_disponivel
+from repositories.transacao.mudanca_repository import cursor_expirado, listar_mudancas
+from schemas.error.error_schema import ErrorSchema
+from schemas.transacao.mudanca_schema import ListagemMudancasSchema, MudancaFiltroSchema, UltimoEventoHeaderSchema
+from services.transacao.mudanca_service import INTERVALO_HEARTBEAT_SEGUNDOS, duracao_maxima_sse, intervalo_sse
+from utils.logger import logger
+
+mudanca_tag = Tag(name="Feed de mudanças", description="Mudanças nas transações para sincronização incremental")
+
+# Mudanças lidas do banco por vez no stream SSE
+TAMANHO_LOTE_SSE = 500
+
+
+# Engines em que o feed já foi encontrado. Só a presença é guardada: no SQLite com MIGRAR_NA_INICIALIZACAO=0,
+# os triggers instalados depois pela migração passam a valer sem reiniciar a aplicação.
+_engines_com_feed: "WeakSet[Engine]" = WeakSet()
+
+
+def _feed_disponivel(engine: Engine) -> bool:
+    if engine in _engines_com_feed:
+        return True
+    if not feed_mudancas_disponivel(engine):
+        return False
+    _engines_com_feed.add(engine)
+    return True
+
+
+def config_mudanca_routes(app):
+    intervalo = intervalo_sse(app)
+    duracao_maxima = duracao_maxima_sse(app)
+
+    def _verificar_cursor(desde: int):
+        """Resposta de erro se o feed não puder atender o cursor (backend sem feed, triggers não instalados ou
+        mudanças expurgadas)."""
+        if not _feed_disponivel(obter_engine()):
+            return {"message": "Feed de mudanças indisponível: requer SQLite com as migrações aplicadas"}, 501
+        session = Session()
+        try:
+            if cursor_expirado(session, desde):
+                return {"message": "Cursor anterior às mudanças retidas; ressincronize a partir de GET /transacoes"}, 410
+        finally:
+            session.close()
+        return None
+
+    @app.get('/transacoes/mudancas', tags=[mudanca_tag],
+             responses={"200": ListagemMudancasSchema,
+                        "410": ErrorSchema.Config.json_schema_extra["examples"]["410"]["value"],
+                        "501": ErrorSchema.Config.json_schema_extra["examples"]["501"]["value"]})
+    def get_mudancas(query: MudancaFiltroSchema):
+        """Retorna as mudanças nas transações posteriores ao cursor, em ordem, com o estado atual de cada uma
+
+        Guarde proximo_cursor e envie-o como desde na próxima leitura; mais=true indica que há outra página
+        disponível imediatamente. Cursores anteriores ao expurgo do feed respondem 410.
+        """
+        try:
+            erro = _verificar_cursor(query.desde)
+            if erro is not None:
+                return erro
+            session = Session()
+            try:
+                mudancas, proximo_cursor, mais = listar_mudancas(session, query.desde, query.limite)
+            finally:
+                session.close()
+            return {"mudancas": mudancas, "proximo_cursor": proximo_cursor, "mais": mais}, 200
+        except Exception as e:
+            logger.error("Erro ao ler o feed de mudanças desde %s: %s", query.desde, e)
+            return {"message": "Erro inesperado"}, 400
+
+    @app.get('/transacoes/mudancas/stream', tags=[mudanca_tag],
+             responses={"200": {"description": "Stream text/event-stream: um evento 'mudanca' por mudança"},
+                        "410": ErrorSchema.Config.json_schema_extra["examples"]["410"]["value"],
+                        "501": ErrorSchema.Config.json_schema_extra["examples"]["501"]["value"]})
+    def stream_mudancas(query: MudancaFiltroSchema, header: UltimoEventoHeaderSchema):
+        """Transmite as mudanças posteriores ao cursor como Server-Sent Events, seguindo as novas
+
+        O id de cada evento é o cursor; ao reconectar o EventSource reenvia o header Last-Event-ID e o
+        stream continua dali. A conexão é encerrada após MUDANCAS_SSE_DURACAO_MAXIMA_SEGUNDOS para
+        liberar a thread do worker; o cliente simplesmente reconecta.
+        """
+        desde = header.last_event_id if header.last_event_id is not None else query.desde
+        erro = _verificar_cursor(desde)
+        if erro is not None:
+            return erro
+        resposta = Response(stream_with_context(_gerar_eventos(desde)), mimetype="text/event-stream")
+        resposta.headers["Cache-Control"] = "no-cache"
+        # Desliga o buffer de proxies (nginx) para os eventos chegarem assim que gravados
+        resposta.headers["X-Accel-Buffering"] = "no"
+        return resposta
+
+    def _gerar_eventos(cursor: int):
+        """Consulta o feed a cada intervalo, sem manter conexão com o banco entre as consultas."""
+        fim = time.monotonic() + duracao_maxima
+        ultimo_envio = time.monotonic()
+        yield f"retry: {int(intervalo * 1000)}\n\n"
+        while True:
+            session = Session()
+            try:
+                mudancas, cursor, mais = listar_mudancas(session, cursor, TAMANHO_LOTE_SSE)
+            except Exception as e:
+                logger.error("Erro no stream do feed de mudanças: %s", e)
+                raise
+            finally:
+                session.close()
+            for mudanca in mudancas:
+                yield f"id: {mudanca['cursor']}\nevent: mudanca\ndata: {current_app.json.dumps(mudanca)}\n\n"
+            agora = time.monotonic()
+            if mudancas:
+                ultimo_envio = agora
+            elif agora - ultimo_envio >= INTERVALO_HEARTBEAT_SEGUNDOS:
+                yield ": ping\n\n"
+                ultimo_envio = agora
+            if agora >= fim:
+                return
+            if not mais:
+                time.sleep(intervalo)
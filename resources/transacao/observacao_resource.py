@@ -1,18 +1,44 @@
 from flask_openapi3 import Tag
+from pydantic import BaseModel
 
 from database.connection import Session
-from model.transacao.observacao_model import ObservacaoModel
-from model.transacao.transacao_model import TransacaoModel
+from database.versionamento import obter_versao
+from repositories.transacao.observacao_repository import buscar_pedido_da_transacao, inserir_observacoes, \
+    listar_observacoes
 from schemas.error.error_schema import ErrorSchema
-from schemas.transacao.observacao_schema import ObservacaoSchema
-from schemas.transacao.transacao_schema import TransacaoViewSchema, apresenta_transacao
+from schemas.transacao.observacao_schema import ObservacaoSchema, ObservacaoViewSchema, ObservacaoFiltroSchema, \
+    ListagemObservacoesSchema, ObservacoesLoteSchema, ResultadoObservacoesLoteSchema
+from services.transacao.cache_service import invalidar_transacoes
+from utils.http_condicional import resposta_condicional
 from utils.logger import logger
 
 observacao_tag = Tag(name="Observações", description="Operações relacionadas às observações das transações")
 
 
 def config_observacao_routes(app):
-    @app.post('/transacao/observacao', tags=[observacao_tag], responses={"200": TransacaoViewSchema,
+    class TransacaoIdPathSchema(BaseModel):
+        transacao_id: int
+
+    def _incluir(transacao_id: int, textos):
+        """Inclui as observações em um único commit e retorna só as criadas (None se a transação não existir)."""
+        session = Session()
+        try:
+            transacao = buscar_pedido_da_transacao(session, transacao_id)
+            if transacao is None:
+                logger.warning("Transação com ID %s não encontrada", transacao_id)
+                return None
+            observacoes = inserir_observacoes(session, transacao_id, textos)
+            session.commit()
+            # A representação da transação em cache inclui as observações
+            invalidar_transacoes([transacao_id], [transacao.pedido_id])
+            return observacoes
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @app.post('/transacao/observacao', tags=[observacao_tag], responses={"200": ObservacaoViewSchema,
                                                                          "404": ErrorSchema.Config.json_schema_extra[
                                                                              "examples"]["404"]["value"],
                                                                          "400": ErrorSchema.Config.json_schema_extra[
@@ -20,24 +46,61 @@ def config_observacao_routes(app):
     def add_observacao(form: ObservacaoSchema):
         """Adiciona uma observação a uma transação existente
 
-        Retorna a transação atualizada com a nova observação.
+        Retorna apenas a observação criada; a lista completa está em GET /transacao/{id}/observacoes.
         """
-        logger.debug(f"Adicionando observação à transação ID {form.transacao_id}")
+        logger.debug("Adicionando observação à transação ID %s", form.transacao_id)
         try:
-            session = Session()
-            transacao = session.query(TransacaoModel).filter(TransacaoModel.id == form.transacao_id).first()
+            observacoes = _incluir(form.transacao_id, [form.texto])
+            if observacoes is None:
+                return {"message": "Transação não encontrada"}, 404
+            logger.debug("Observação adicionada com sucesso à transação ID %s", form.transacao_id)
+            return observacoes[0], 200
+
+        except Exception as e:
+            logger.error("Erro ao adicionar observação: %s", e)
+            return {"message": "Erro inesperado ao adicionar observação"}, 400
 
-            if not transacao:
-                logger.warning(f"Transação com ID {form.transacao_id} não encontrada")
+    @app.post('/transacao/<int:transacao_id>/observacoes', tags=[observacao_tag],
+              responses={"200": ResultadoObservacoesLoteSchema,
+                         "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"],
+                         "400": ErrorSchema.Config.json_schema_extra["examples"]["400"]["value"]})
+    def add_observacoes_lote(path: TransacaoIdPathSchema, body: ObservacoesLoteSchema):
+        """Adiciona várias observações a uma transação em um único INSERT e commit
+
+        Retorna apenas as observações criadas, na ordem enviada.
+        """
+        try:
+            observacoes = _incluir(path.transacao_id, body.textos)
+            if observacoes is None:
                 return {"message": "Transação não encontrada"}, 404
+            logger.debug("%s observação(ões) adicionada(s) à transação ID %s", len(observacoes), path.transacao_id)
+            return {"observacoes": observacoes}, 200
+        except Exception as e:
+            logger.error("Erro ao adicionar observações em lote à transação ID %s: %s", path.transacao_id, e)
+            return {"message": "Erro inesperado ao adicionar observações"}, 400
 
-            observacao = ObservacaoModel(fk_id_produto=form.transacao_id, texto=form.texto)
-            transacao.adiciona_observacao(observacao)
+    @app.get('/transacao/<int:transacao_id>/observacoes', tags=[observacao_tag],
+             responses={"200": ListagemObservacoesSchema,
+                        "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"]})
+    def get_observacoes(path: TransacaoIdPathSchema, query: ObservacaoFiltroSchema):
+        """Retorna as observações de uma transação em ordem de inclusão, paginadas por cursor
 
-            session.commit()
-            logger.debug(f"Observação adicionada com sucesso à transação ID {form.transacao_id}")
-            return apresenta_transacao(transacao), 200
+        Use o campo proximo_cursor da resposta como cursor da próxima página.
+        """
+        session = Session()
+        try:
+            def montar():
+                # Distingue transação sem observações de transação inexistente (ou excluída)
+                if buscar_pedido_da_transacao(session, path.transacao_id) is None:
+                    return {"message": "Transação não encontrada"}, 404
+                observacoes, proximo_cursor = listar_observacoes(session, path.transacao_id, query.cursor,
+                                                                 query.limite)
+                return {"observacoes": observacoes, "proximo_cursor": proximo_cursor}, 200
 
+            versao = obter_versao(session)
+            return resposta_condicional(versao.etag(), versao.data_alteracao, montar)
         except Exception as e:
-            logger.error(f"Erro ao adicionar observação: {str(e)}")
-            return {"message": "Erro inesperado ao adicionar observação"}, 400
+            logger.error("Erro ao buscar observações da transação ID %s: %s", path.transacao_id, e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
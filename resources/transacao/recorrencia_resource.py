@@ -0,0 +1,115 @@
+from flask_openapi3 import Tag
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+
+from database.connection import Session
+from database.versionamento import obter_versao
+from repositories.transacao.recorrencia_repository import buscar_recorrencia
+from repositories.transacao.transacao_repository import linhas_por_ids
+from schemas.error.error_schema import ErrorSchema
+from schemas.transacao.recorrencia_schema import RecorrenciaSchema, RecorrenciaCriadaSchema, OcorrenciasFiltroSchema, \
+    ListagemOcorrenciasSchema, apresenta_recorrencia
+from schemas.transacao.transacao_schema import TransacaoViewSchema
+from services.transacao.recorrencia_service import OcorrenciaInexistenteError, criar_recorrencia, \
+    listar_ocorrencias, materializar_ocorrencia
+from utils.http_condicional import resposta_condicional
+from utils.logger import logger
+
+recorrencia_tag = Tag(name="Recorrências", description="Transações recorrentes e parcelamentos")
+
+
+def config_recorrencia_routes(app):
+    class RecorrenciaIdPathSchema(BaseModel):
+        recorrencia_id: int
+
+    class OcorrenciaPathSchema(BaseModel):
+        recorrencia_id: int
+        numero: int
+
+    @app.post('/transacoes/recorrencias', tags=[recorrencia_tag],
+              responses={"201": RecorrenciaCriadaSchema,
+                         "400": ErrorSchema.Config.json_schema_extra["examples"]["400"]["value"]})
+    def add_recorrencia(body: RecorrenciaSchema):
+        """Cria uma transação recorrente ou um parcelamento (parcelado=true)
+
+        Com quantidade, todas as ocorrências são criadas como transações em um único INSERT e commit; no
+        parcelamento o valor total é dividido em centavos, com a diferença de arredondamento nas
+        primeiras parcelas. Sem quantidade nenhuma transação é criada: consulte as ocorrências em
+        GET /transacoes/recorrencias/{id}/ocorrencias.
+        """
+        session = Session()
+        try:
+            recorrencia, transacoes = criar_recorrencia(session, body)
+            session.commit()
+            logger.debug("Recorrência %s criada com %s transação(ões)", recorrencia.id, len(transacoes))
+            return {"recorrencia": apresenta_recorrencia(recorrencia), "transacoes": transacoes}, 201
+        except Exception as e:
+            session.rollback()
+            logger.error("Erro ao criar recorrência: %s", e)
+            return {"message": "Erro inesperado ao criar recorrência"}, 400
+        finally:
+            session.close()
+
+    @app.get('/transacoes/recorrencias/<int:recorrencia_id>/ocorrencias', tags=[recorrencia_tag],
+             responses={"200": ListagemOcorrenciasSchema,
+                        "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"]})
+    def get_ocorrencias(path: RecorrenciaIdPathSchema, query: OcorrenciasFiltroSchema):
+        """Retorna as ocorrências da recorrência com vencimento no período, criadas ou apenas previstas
+
+        Ocorrências ainda não criadas (materializada=false) são calculadas pela regra, sem gravar nada;
+        as criadas trazem o estado atual da transação. Com proxima_data_inicio preenchido há mais
+        ocorrências no período.
+        """
+        session = Session()
+        try:
+            def montar():
+                recorrencia = buscar_recorrencia(session, path.recorrencia_id)
+                if recorrencia is None:
+                    return {"message": "Recorrência não encontrada"}, 404
+                ocorrencias, proxima_data_inicio = listar_ocorrencias(session, recorrencia, query.data_inicio,
+                                                                      query.data_fim, query.limite)
+                return {"recorrencia": apresenta_recorrencia(recorrencia), "ocorrencias": ocorrencias,
+                        "proxima_data_inicio": proxima_data_inicio}, 200
+
+            versao = obter_versao(session)
+            return resposta_condicional(versao.etag(), versao.data_alteracao, montar)
+        except Exception as e:
+            logger.error("Erro ao listar ocorrências da recorrência %s: %s", path.recorrencia_id, e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    @app.post('/transacoes/recorrencias/<int:recorrencia_id>/ocorrencias/<int:numero>', tags=[recorrencia_tag],
+              responses={"200": TransacaoViewSchema, "201": TransacaoViewSchema,
+                         "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"],
+                         "409": ErrorSchema.Config.json_schema_extra["examples"]["409"]["value"],
+                         "400": ErrorSchema.Config.json_schema_extra["examples"]["400"]["value"]})
+    def add_ocorrencia(path: OcorrenciaPathSchema):
+        """Cria a transação de uma ocorrência prevista, para pagá-la ou editá-la antes do vencimento
+
+        Idempotente: se a ocorrência já existir como transação, retorna-a com 200. Ocorrências
+        excluídas respondem 409.
+        """
+        session = Session()
+        try:
+            recorrencia = buscar_recorrencia(session, path.recorrencia_id)
+            if recorrencia is None:
+                return {"message": "Recorrência não encontrada"}, 404
+            try:
+                transacao_id, criada = materializar_ocorrencia(session, recorrencia, path.numero)
+                session.commit()
+            except IntegrityError:
+                # Criada por uma requisição concorrente (índice único ux_transacao_recorrencia_parcela)
+                session.rollback()
+                transacao_id, criada = materializar_ocorrencia(session, recorrencia, path.numero)
+            if transacao_id is None:
+                return {"message": "Ocorrência excluída"}, 409
+            return linhas_por_ids(session, [transacao_id])[transacao_id], 201 if criada else 200
+        except OcorrenciaInexistenteError:
+            return {"message": "Ocorrência não encontrada"}, 404
+        except Exception as e:
+            session.rollback()
+            logger.error("Erro ao criar a ocorrência %s da recorrência %s: %s", path.numero, path.recorrencia_id, e)
+            return {"message": "Erro inesperado ao criar ocorrência"}, 400
+        finally:
+            session.close()
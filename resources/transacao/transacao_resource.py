@@ -1,27 +1,72 @@
-from urllib.parse import unquote
+import json
+from datetime import date
+from typing import Optional
 
+from flask import Response, current_app, request, stream_with_context
 from flask_openapi3 import Tag
 from sqlalchemy.exc import IntegrityError
 
 from database.connection import Session
+from database.versionamento import obter_versao
 from model.transacao.enums.tipo_transacao_model import TipoTransacao
 from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.arquivo_repository import buscar_pedido_arquivado
+from repositories.transacao.transacao_repository import listar_pagina_linhas, iterar_linhas, buscar_por_descricao, \
+    buscar_por_pedido, buscar_por_id, buscar_por_texto, excluir_transacoes, select_exclusao, iterar_lotes_linhas, \
+    linha_arquivada_por_id, linha_arquivada_por_pedido
+from repositories.transacao.resumo_repository import resumir_transacoes
 from schemas.error.error_schema import ErrorSchema
+from schemas.transacao.escrita_schema import EscritaAceitaSchema
 from schemas.transacao.transacao_schema import TransacaoSchema, apresenta_transacao, apresenta_transacoes, \
-    TransacaoViewSchema, ListagemTransacoesSchema, TransacaoBuscaSchema, TransacaoDelSchema, TransacaoAtualizacaoSchema
+    TransacaoViewSchema, ListagemTransacoesSchema, TransacaoBuscaSchema, TransacaoDelSchema, TransacaoAtualizacaoSchema, \
+    TransacaoFiltroSchema, ResultadoLoteSchema, UpsertQuerySchema, IdempotenciaHeaderSchema, EventosPedidoSchema, \
+    ResultadoEventosPedidoSchema, TransacaoTextoBuscaSchema, ResultadoBuscaTransacoesSchema, ResumoFiltroSchema, \
+    ResumoTransacoesSchema, TransacaoExcluidaSchema, ExclusaoLoteSchema, ResultadoExclusaoSchema, ExportacaoFiltroSchema
+from services.transacao.cache_service import chave_id, chave_pedido, obter_transacao_serializada, \
+    armazenar_transacao_serializada, invalidar_transacoes
+from services.transacao.escrita_assincrona_service import CRIAR, ATUALIZAR, OperacaoEscrita, FilaEscritaCheiaError, \
+    escrita_assincrona_habilitada, obter_escritor
+from services.transacao.exclusao_service import exclusao_logica_habilitada
+from services.transacao.exportacao_service import EXPORTADORES, FORMATOS_EXPORTACAO, parquet_disponivel, \
+    tamanho_lote_exportacao
+from services.transacao.lote_service import ingerir_lote
+from services.transacao.upsert_service import upsert_por_pedido, upsert_eventos, atualizar_campos, \
+    UpsertInvalidoError
 from pydantic import BaseModel
+from utils.http_condicional import resposta_condicional
 from utils.logger import logger
 
 transacao_tag = Tag(name="Transações", description="Operações relacionadas as transações")
 
+# Tamanho de página adotado quando o cliente não informa o limite
+LIMITE_PADRAO_PAGINA = 100
+
 
 def config_transacao_routes(app):
+    # Com EXCLUSAO_LOGICA=1 as exclusões só marcam data_exclusao; o expurgo físico roda depois (exclusao_service)
+    exclusao_logica = exclusao_logica_habilitada(app)
+    # Com ESCRITA_ASSINCRONA=1 a criação e o PUT por pedido respondem 202 e são gravados em grupo (escrita_assincrona_service)
+    escrita_assincrona = escrita_assincrona_habilitada(app)
+
     class PedidoIdPathSchema(BaseModel):
         pedido_id: int
     class TransacaoIdPathSchema(BaseModel):
         transacao_id: int
 
+    def _enfileirar(operacao: OperacaoEscrita):
+        """Enfileira a escrita e responde 202 com o id de rastreamento, ou 503 se a fila estiver cheia."""
+        try:
+            id_rastreamento = obter_escritor().enfileirar(operacao)
+        except FilaEscritaCheiaError:
+            logger.warning("Fila de escritas cheia, escrita recusada")
+            return {"message": "Fila de escritas cheia, tente novamente"}, 503, {"Retry-After": "1"}
+        return {"id_rastreamento": id_rastreamento, "status": "pendente"}, 202, \
+            {"Location": f"/escritas/{id_rastreamento}"}
+
     @app.post('/transacao', tags=[transacao_tag], responses={"200": TransacaoViewSchema,
+                                                             "202": EscritaAceitaSchema,
+                                                             "503": ErrorSchema.Config.json_schema_extra["examples"][
+                                                                 "503"]["value"],
                                                              "409": ErrorSchema.Config.json_schema_extra["examples"][
                                                                  "409"]["value"],
                                                              "400": ErrorSchema.Config.json_schema_extra["examples"][
@@ -29,8 +74,13 @@ def config_transacao_routes(app):
     def add_transacao(body: TransacaoSchema):
         """ Adiciona uma nova transação à base de dados
 
-        Retorna uma representação da transação adicionada.
+        Retorna uma representação da transação adicionada. Com ESCRITA_ASSINCRONA=1 responde 202 com o
+        id de rastreamento (GET /escritas/{id_rastreamento}); o 409 passa a aparecer como status erro.
         """
+        if escrita_assincrona:
+            return _enfileirar(OperacaoEscrita(CRIAR, body.model_dump(mode="json", by_alias=True),
+                                               pedido_id=body.pedido_id))
+
         transacao = TransacaoModel(
             data_vencimento=body.data_vencimento,
             descricao=body.descricao,
@@ -41,37 +91,217 @@ def config_transacao_routes(app):
             pedido_id=body.pedido_id,
             participant_id=body.participant_id
         )
-        logger.debug(f"Adicionando transação: '{transacao.descricao}'")
+        logger.debug("Adicionando transação: '%s'", transacao.descricao)
 
+        session = Session()
         try:
-            session = Session()
             session.add(transacao)
             session.commit()
             return apresenta_transacao(transacao), 200
 
         except IntegrityError:
+            session.rollback()
             logger.error("Erro de integridade ao adicionar transação")
             return {"message": "Erro de integridade ao adicionar transação"}, 409
 
         except Exception as e:
-            logger.error(f"Erro ao adicionar transação: '{transacao.descricao}', {str(e)}")
+            session.rollback()
+            logger.error("Erro ao adicionar transação: '%s', %s", body.descricao, e)
             return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    @app.post('/transacoes/lote', tags=[transacao_tag], responses={"200": ResultadoLoteSchema,
+                                                                   "400": ErrorSchema.Config.json_schema_extra[
+                                                                       "examples"]["400"]["value"]})
+    def add_transacoes_lote():
+        """Adiciona várias transações em lote
+
+        Aceita um array JSON de transações (mesmo formato de POST /transacao) ou, com
+        Content-Type application/x-ndjson, uma transação por linha. A gravação é feita em chunks
+        com INSERT em lote; conflitos de pedido_id e itens inválidos são reportados por item sem
+        abortar o lote.
+        """
+        try:
+            itens = _ler_itens_lote()
+        except ValueError as e:
+            logger.warning("Corpo inválido na ingestão em lote: %s", e)
+            return {"message": str(e)}, 400
+
+        session = Session()
+        try:
+            resultado = ingerir_lote(session, itens)
+            logger.debug("Lote processado: %s criadas, %s conflitos, %s inválidas",
+                         resultado["criadas"], resultado["conflitos"], resultado["invalidas"])
+            return resultado, 200
+        except Exception as e:
+            session.rollback()
+            logger.error("Erro na ingestão em lote de transações: %s", e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    def _ler_itens_lote():
+        """Lê os itens do corpo: array JSON, objeto {"transacoes": [...]} ou NDJSON (lido sob demanda)."""
+        if request.mimetype == "application/x-ndjson":
+            return _ler_ndjson(request.stream)
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get("transacoes")
+        if not isinstance(payload, list):
+            raise ValueError("Envie um array JSON de transações ou NDJSON (application/x-ndjson)")
+        return payload
+
+    def _ler_ndjson(stream):
+        for linha in stream:
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                # Linha malformada segue como texto e é reportada como inválida na validação do item
+                yield linha.decode(errors="replace")
 
     @app.get('/transacoes', tags=[transacao_tag], responses={"200": ListagemTransacoesSchema,
                                                              "404": ErrorSchema.Config.json_schema_extra["examples"][
                                                                  "404"]["value"]})
-    def get_transacoes():
-        """Retorna todas as transações cadastradas"""
+    def get_transacoes(query: TransacaoFiltroSchema):
+        """Retorna as transações cadastradas, paginadas por cursor e filtradas
+
+        Use o campo proximo_cursor da resposta como cursor da próxima página. Com formato=ndjson
+        as transações são transmitidas uma por linha diretamente do cursor do banco.
+        """
+        session = Session()
+        try:
+            if query.formato == "ndjson":
+                return _resposta_condicional(session, lambda: _stream_transacoes_ndjson(query))
+
+            def montar():
+                transacoes, proximo_cursor = listar_pagina_linhas(session, query,
+                                                                  query.limite or LIMITE_PADRAO_PAGINA)
+                if not transacoes:
+                    return {"message": "Nenhuma transação encontrada"}, 404
+                return {"transacoes": transacoes, "proximo_cursor": proximo_cursor}, 200
+
+            return _resposta_condicional(session, montar)
+
+        except Exception as e:
+            logger.error("Erro ao buscar transações: %s", e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    def _stream_transacoes_ndjson(filtros: TransacaoFiltroSchema) -> Response:
+        """Transmite as transações filtradas em NDJSON, mantendo memória constante."""
+        def gerar():
+            session = Session()
+            try:
+                for transacao in iterar_linhas(session, filtros):
+                    yield current_app.json.dumps(transacao) + "\n"
+            except Exception as e:
+                logger.error("Erro ao transmitir transações: %s", e)
+                raise
+            finally:
+                session.close()
+
+        return Response(stream_with_context(gerar()), mimetype="application/x-ndjson")
+
+    @app.get('/transacoes/export', tags=[transacao_tag],
+             responses={"200": {"description": "Arquivo CSV, NDJSON ou Parquet transmitido em streaming"},
+                        "501": ErrorSchema.Config.json_schema_extra["examples"]["501"]["value"]})
+    def exportar_transacoes(query: ExportacaoFiltroSchema):
+        """Exporta as transações filtradas (mesmos filtros da listagem) em CSV, Parquet ou NDJSON
+
+        As linhas são lidas do cursor do banco e enviadas em lotes de EXPORTACAO_TAMANHO_LOTE, com memória
+        constante qualquer que seja o volume. Não inclui as observações.
+        """
+        if query.formato == "parquet" and not parquet_disponivel():
+            return {"message": "Exportação em Parquet requer o pacote pyarrow"}, 501
+        session = Session()
         try:
+            return _resposta_condicional(session, lambda: _stream_exportacao(query))
+        except Exception as e:
+            logger.error("Erro ao exportar transações: %s", e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    def _stream_exportacao(filtros: ExportacaoFiltroSchema) -> Response:
+        exportar = EXPORTADORES[filtros.formato]
+        mimetype, extensao = FORMATOS_EXPORTACAO[filtros.formato]
+        tamanho_lote = tamanho_lote_exportacao(current_app)
+
+        def gerar():
             session = Session()
-            transacoes = session.query(TransacaoModel).all()
-            if not transacoes:
-                return {"message": "Nenhuma transação encontrada"}, 404
-            return apresenta_transacoes(transacoes), 200
+            try:
+                yield from exportar(iterar_lotes_linhas(session, filtros, tamanho_lote))
+            except Exception as e:
+                logger.error("Erro ao transmitir a exportação de transações: %s", e)
+                raise
+            finally:
+                session.close()
+
+        resposta = Response(stream_with_context(gerar()), mimetype=mimetype)
+        resposta.headers["Content-Disposition"] = f'attachment; filename="transacoes.{extensao}"'
+        return resposta
 
+    def _resposta_condicional(session, montar, variante: Optional[str] = None) -> Response:
+        """Valida a cópia do cliente pela versão das transações antes de montar a resposta.
+
+        A versão é lida antes dos dados: se houver escrita entre as duas leituras a ETag enviada é
+        mais antiga que o corpo e a próxima requisição apenas recebe o corpo de novo.
+        """
+        versao = obter_versao(session)
+        return resposta_condicional(versao.etag(variante), versao.data_alteracao, montar)
+
+    @app.get('/transacoes/busca', tags=[transacao_tag], responses={"200": ResultadoBuscaTransacoesSchema,
+                                                                   "404": ErrorSchema.Config.json_schema_extra[
+                                                                       "examples"]["404"]["value"]})
+    def buscar_transacoes(query: TransacaoTextoBuscaSchema):
+        """Busca transações pela descrição, com ranking de relevância e paginação
+
+        O modo texto casa o início de cada palavra informada (ex.: "cont lu" encontra "Conta de Luz"),
+        ignorando acentos e maiúsculas, e ordena pela relevância.
+        """
+        logger.debug("Buscando transações por descrição: '%s' (modo %s)", query.termo, query.modo)
+        session = Session()
+        try:
+            def montar():
+                transacoes, tem_proxima = buscar_por_texto(session, query.termo, query.modo, query.limite,
+                                                           query.pagina)
+                if not transacoes:
+                    return {"message": "Nenhuma transação encontrada"}, 404
+                resposta = apresenta_transacoes(transacoes)
+                return {"transacoes": resposta["transacoes"], "pagina": query.pagina,
+                        "proxima_pagina": query.pagina + 1 if tem_proxima else None}, 200
+
+            return _resposta_condicional(session, montar)
         except Exception as e:
-            logger.error(f"Erro ao buscar transações: {str(e)}")
+            logger.error("Erro ao buscar transações por descrição: %s", e)
             return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    @app.get('/transacoes/resumo', tags=[transacao_tag], responses={"200": ResumoTransacoesSchema,
+                                                                    "400": ErrorSchema.Config.json_schema_extra[
+                                                                        "examples"]["400"]["value"]})
+    def get_resumo_transacoes(query: ResumoFiltroSchema):
+        """Retorna o resumo financeiro (receitas, despesas, saldo, pagos, pendentes e vencidos)
+
+        Os totais são agregados no banco, agrupados por mês de vencimento e/ou participante,
+        aceitando os mesmos filtros da listagem.
+        """
+        session = Session()
+        try:
+            # Os totais de vencidos dependem do dia corrente, que entra na ETag
+            hoje = date.today()
+            return _resposta_condicional(session, lambda: (resumir_transacoes(session, query, hoje), 200),
+                                         variante=hoje.isoformat())
+        except Exception as e:
+            logger.error("Erro ao calcular resumo de transações: %s", e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
 
     @app.get('/transacao/', tags=[transacao_tag], responses={"200": TransacaoViewSchema,
                                                                      "404": ErrorSchema.Config.json_schema_extra[
@@ -80,17 +310,70 @@ def config_transacao_routes(app):
         """Busca uma transação pelo ID"""
 
         transacao_descricao = query.descricao
-        logger.debug(f"Buscando transação: '{transacao_descricao}'")
+        logger.debug("Buscando transação: '%s'", transacao_descricao)
+        session = Session()
         try:
-            session = Session()
-            transacao = session.query(TransacaoModel).filter(TransacaoModel.descricao == transacao_descricao).first()
-            if not transacao:
-                return {"message": "Transação não encontrada"}, 404
-            return apresenta_transacao(transacao), 200
+            def montar():
+                transacao = buscar_por_descricao(session, transacao_descricao)
+                if not transacao:
+                    return {"message": "Transação não encontrada"}, 404
+                return apresenta_transacao(transacao), 200
+
+            return _resposta_condicional(session, montar)
+
+        except Exception as e:
+            logger.error("Erro ao buscar transação: %s", e)
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
 
+    @app.get('/transacao/<int:transacao_id>', tags=[transacao_tag], responses={"200": TransacaoViewSchema,
+                                                                              "404": ErrorSchema.Config.json_schema_extra[
+                                                                                  "examples"]["404"]["value"]})
+    def get_transacao_por_id(path: TransacaoIdPathSchema):
+        """Retorna uma transação pelo ID."""
+        session = Session()
+        try:
+            return _consultar_transacao(session, chave_id(path.transacao_id),
+                                        lambda: buscar_por_id(session, path.transacao_id),
+                                        lambda: linha_arquivada_por_id(session, path.transacao_id))
         except Exception as e:
-            logger.error(f"Erro ao buscar transação: {str(e)}")
+            logger.error("Erro ao buscar transação id=%s: %s", path.transacao_id, e)
             return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    def _consultar_transacao(session, chave: str, buscar, buscar_arquivada) -> Response:
+        """Responde com a transação do cache de leitura ou, na falta, do banco (buscar), com validadores HTTP.
+
+        Não encontrada em transacao, a transação é procurada no arquivo (buscar_arquivada, já em dict).
+        """
+        # A entrada do cache só vale na versão que gera a ETag (as escritas de outro worker não a invalidam)
+        versao = obter_versao(session)
+
+        def montar():
+            corpo = obter_transacao_serializada(chave, versao.numero)
+            if corpo is None:
+                transacao = buscar()
+                if transacao:
+                    corpo = _serializar_e_armazenar(apresenta_transacao(transacao), versao.numero)
+                else:
+                    arquivada = buscar_arquivada()
+                    if arquivada is None:
+                        return {"message": "Transação não encontrada"}, 404
+                    corpo = _serializar_e_armazenar(arquivada, versao.numero)
+            return _resposta_json(corpo)
+
+        return resposta_condicional(versao.etag(), versao.data_alteracao, montar)
+
+    def _serializar_e_armazenar(representacao, versao: int) -> str:
+        """Serializa a transação uma única vez e guarda o JSON no cache de leitura (por id e pedido_id)."""
+        corpo = current_app.json.dumps(representacao)
+        armazenar_transacao_serializada(corpo, representacao["id"], representacao["pedido_id"], versao)
+        return corpo
+
+    def _resposta_json(corpo: str) -> Response:
+        return Response(corpo, status=200, mimetype="application/json")
 
     @app.get('/transacoes/pedido/<int:pedido_id>', tags=[transacao_tag], responses={"200": TransacaoViewSchema,
                                                                                     "404": ErrorSchema.Config.json_schema_extra[
@@ -99,51 +382,114 @@ def config_transacao_routes(app):
         """Retorna a transação associada a um pedido específico (pedido_id)."""
         session = Session()
         try:
-            transacao = session.query(TransacaoModel).filter(TransacaoModel.pedido_id == path.pedido_id).first()
-            if not transacao:
-                return {"message": "Transação não encontrada"}, 404
-            return apresenta_transacao(transacao), 200
+            return _consultar_transacao(session, chave_pedido(path.pedido_id),
+                                        lambda: buscar_por_pedido(session, path.pedido_id),
+                                        lambda: linha_arquivada_por_pedido(session, path.pedido_id))
         except Exception as e:
-            logger.error(f"Erro ao buscar transação por pedido_id={path.pedido_id}: {str(e)}")
+            logger.error("Erro ao buscar transação por pedido_id=%s: %s", path.pedido_id, e)
             return {"message": "Erro inesperado"}, 400
         finally:
             session.close()
 
     @app.put('/transacoes/pedido/<int:pedido_id>', tags=[transacao_tag], responses={"200": TransacaoViewSchema,
+                                                                                    "202": EscritaAceitaSchema,
+                                                                                    "503": ErrorSchema.Config.json_schema_extra[
+                                                                                        "examples"]["503"]["value"],
                                                                                     "404": ErrorSchema.Config.json_schema_extra[
                                                                                         "examples"]["404"]["value"],
+                                                                                    "409": ErrorSchema.Config.json_schema_extra[
+                                                                                        "examples"]["409"]["value"],
                                                                                     "400": ErrorSchema.Config.json_schema_extra[
                                                                                         "examples"]["400"]["value"]})
-    def atualizar_transacao_por_pedido(path: PedidoIdPathSchema, body: TransacaoAtualizacaoSchema):
-        """Atualiza campos da transação associada a um pedido. Apenas campos enviados serão alterados."""
+    def atualizar_transacao_por_pedido(path: PedidoIdPathSchema, query: UpsertQuerySchema,
+                                       body: TransacaoAtualizacaoSchema, header: IdempotenciaHeaderSchema):
+        """Atualiza campos da transação associada a um pedido. Apenas campos enviados serão alterados.
+
+        Com upsert=true a transação é criada caso não exista (a criação exige descricao, tipo_transacao
+        e valor), em um único INSERT ... ON CONFLICT(pedido_id). O header Idempotency-Key torna reenvios
+        do mesmo evento para o mesmo pedido um no-op que apenas devolve o estado atual.
+
+        Com ESCRITA_ASSINCRONA=1 responde 202; atualizações do mesmo pedido ainda na fila são combinadas
+        e o 404 (ou o 400 de uma criação incompleta) passa a aparecer como status erro em
+        GET /escritas/{id_rastreamento}.
+        """
+        if escrita_assincrona:
+            chaves = [header.idempotency_key] if header.idempotency_key else []
+            return _enfileirar(OperacaoEscrita(ATUALIZAR, body.model_dump(mode="json", exclude_none=True),
+                                               path.pedido_id, query.upsert, chaves))
+
+        if query.upsert:
+            return _upsert_transacao_por_pedido(path.pedido_id, body, header.idempotency_key)
+
         session = Session()
         try:
-            transacao = session.query(TransacaoModel).filter(TransacaoModel.pedido_id == path.pedido_id).first()
+            transacao = buscar_por_pedido(session, path.pedido_id)
             if not transacao:
+                if buscar_pedido_arquivado(session, path.pedido_id) is not None:
+                    return {"message": "Transação arquivada não pode ser alterada"}, 409
                 return {"message": "Transação não encontrada"}, 404
 
             # Atualiza apenas campos presentes (não None)
-            if body.descricao is not None:
-                transacao.descricao = body.descricao
-            if body.tipo_transacao is not None:
-                transacao.tipo_transacao = TipoTransacao(body.tipo_transacao)
-            if body.valor is not None:
-                transacao.valor = body.valor
-            if body.data_vencimento is not None:
-                transacao.data_vencimento = body.data_vencimento
-            if body.pago is not None:
-                transacao.pago = body.pago
-                # Se marcar como não pago, limpa data_pagamento
-                if body.pago is False:
-                    transacao.data_pagamento = None
-            if body.data_pagamento is not None:
-                transacao.data_pagamento = body.data_pagamento
+            atualizar_campos(transacao, body)
 
             session.add(transacao)
             session.commit()
+            invalidar_transacoes([transacao.id], [path.pedido_id])
             return apresenta_transacao(transacao), 200
         except Exception as e:
-            logger.error(f"Erro ao atualizar transação de pedido_id={path.pedido_id}: {str(e)}")
+            logger.error("Erro ao atualizar transação de pedido_id=%s: %s", path.pedido_id, e)
+            session.rollback()
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    def _upsert_transacao_por_pedido(pedido_id: int, body: TransacaoAtualizacaoSchema,
+                                     chave_idempotencia: Optional[str]):
+        session = Session()
+        try:
+            transacao_id, replay = upsert_por_pedido(session, pedido_id, body, chave_idempotencia)
+            session.commit()
+            if replay:
+                logger.debug("Evento repetido ignorado para pedido_id=%s (chave %s)", pedido_id, chave_idempotencia)
+            else:
+                invalidar_transacoes([transacao_id], [pedido_id])
+            transacao = buscar_por_pedido(session, pedido_id)
+            if not transacao:
+                # Replay de um evento cuja transação foi excluída depois
+                return {"message": "Transação não encontrada"}, 404
+            return apresenta_transacao(transacao), 200, {"Idempotent-Replayed": str(replay).lower()}
+        except UpsertInvalidoError as e:
+            session.rollback()
+            return {"message": str(e)}, 400
+        except IntegrityError:
+            # Único conflito que o ON CONFLICT não resolve: pedido_id de uma transação arquivada
+            session.rollback()
+            return {"message": "Transação arquivada não pode ser alterada"}, 409
+        except Exception as e:
+            logger.error("Erro no upsert da transação de pedido_id=%s: %s", pedido_id, e)
+            session.rollback()
+            return {"message": "Erro inesperado"}, 400
+        finally:
+            session.close()
+
+    @app.put('/transacoes/pedidos', tags=[transacao_tag], responses={"200": ResultadoEventosPedidoSchema,
+                                                                     "400": ErrorSchema.Config.json_schema_extra[
+                                                                         "examples"]["400"]["value"]})
+    def upsert_transacoes_por_pedidos(body: EventosPedidoSchema):
+        """Aplica em lote eventos de Pedidos, criando ou atualizando a transação de cada pedido_id
+
+        Eventos com chave_idempotencia já processada são ignorados (status repetido). Todo o lote
+        é gravado em uma única transação de banco.
+        """
+        session = Session()
+        try:
+            resultado = upsert_eventos(session, body.eventos)
+            session.commit()
+            invalidar_transacoes([r["id"] for r in resultado["resultados"]],
+                                 [r["pedido_id"] for r in resultado["resultados"]])
+            return resultado, 200
+        except Exception as e:
+            logger.error("Erro no upsert em lote de eventos de pedidos: %s", e)
             session.rollback()
             return {"message": "Erro inesperado"}, 400
         finally:
@@ -159,24 +505,78 @@ def config_transacao_routes(app):
 
         Retorna uma mensagem de confirmação da remoção.
         """
-        transacao_descricao = unquote(unquote(query.descricao))
-        logger.debug(f"Tentando deletar transação: '{transacao_descricao}'")
+        # A query string já chega decodificada (uma vez) pelo Werkzeug, como nas demais rotas
+        transacao_descricao = query.descricao
+        logger.debug("Tentando deletar transação: '%s'", transacao_descricao)
 
+        session = Session()
         try:
-            session = Session()
-            count = session.query(TransacaoModel).filter(TransacaoModel.descricao == transacao_descricao).delete()
+            alvo = select_exclusao().where(TransacaoModel.descricao == transacao_descricao)
+            removidas = excluir_transacoes(session, alvo, exclusao_logica)
             session.commit()
+            invalidar_transacoes([transacao_id for transacao_id, _ in removidas],
+                                 [pedido_id for _, pedido_id in removidas])
 
-            if count:
-                logger.debug(f"Transação deletada com sucesso: '{transacao_descricao}'")
+            if removidas:
+                logger.debug("Transação deletada com sucesso: '%s'", transacao_descricao)
                 return {"message": "Transação removida", "descricao": transacao_descricao}, 200
             else:
-                logger.warning(f"Transação não encontrada para exclusão: '{transacao_descricao}'")
+                logger.warning("Transação não encontrada para exclusão: '%s'", transacao_descricao)
                 return {"message": "Transação não encontrada"}, 404
 
         except Exception as e:
-            logger.error(f"Erro ao deletar transação '{transacao_descricao}': {str(e)}")
+            session.rollback()
+            logger.error("Erro ao deletar transação '%s': %s", transacao_descricao, e)
             return {"message": "Erro inesperado ao deletar transação"}, 400
+        finally:
+            session.close()
+
+    @app.delete('/transacao/<int:transacao_id>', tags=[transacao_tag],
+                responses={"200": TransacaoExcluidaSchema,
+                           "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"],
+                           "400": ErrorSchema.Config.json_schema_extra["examples"]["400"]["value"]})
+    def del_transacao_por_id(path: TransacaoIdPathSchema):
+        """Remove uma transação pelo ID, junto com suas observações
+
+        Com a exclusão lógica ativa a transação deixa de aparecer nas consultas e é expurgada depois.
+        """
+        session = Session()
+        try:
+            removidas = excluir_transacoes(session, select_exclusao(ids=[path.transacao_id]), exclusao_logica)
+            session.commit()
+            if not removidas:
+                return {"message": "Transação não encontrada"}, 404
+            invalidar_transacoes([path.transacao_id], [pedido_id for _, pedido_id in removidas])
+            return {"message": "Transação removida", "id": path.transacao_id}, 200
+        except Exception as e:
+            logger.error("Erro ao remover transação id=%s: %s", path.transacao_id, e)
+            session.rollback()
+            return {"message": "Erro inesperado ao deletar transação"}, 400
+        finally:
+            session.close()
+
+    @app.delete('/transacoes', tags=[transacao_tag], responses={"200": ResultadoExclusaoSchema,
+                                                                "400": ErrorSchema.Config.json_schema_extra[
+                                                                    "examples"]["400"]["value"]})
+    def del_transacoes(body: ExclusaoLoteSchema):
+        """Remove em lote as transações indicadas por ids e/ou filtros, com suas observações
+
+        Toda a exclusão acontece em uma única transação de banco: ou todas são removidas ou nenhuma.
+        """
+        session = Session()
+        try:
+            removidas = excluir_transacoes(session, select_exclusao(body.ids, body.filtros), exclusao_logica)
+            session.commit()
+            ids = [transacao_id for transacao_id, _ in removidas]
+            invalidar_transacoes(ids, [pedido_id for _, pedido_id in removidas])
+            logger.debug("Exclusão em lote: %s transação(ões) removida(s)", len(ids))
+            return {"removidas": len(ids), "ids": ids, "logica": exclusao_logica}, 200
+        except Exception as e:
+            logger.error("Erro na exclusão em lote de transações: %s", e)
+            session.rollback()
+            return {"message": "Erro inesperado ao deletar transações"}, 400
+        finally:
+            session.close()
 
     @app.put('/transacao/<int:transacao_id>', tags=[transacao_tag], responses={"200": TransacaoViewSchema,
                                                                               "404": ErrorSchema.Config.json_schema_extra["examples"]["404"]["value"],
@@ -187,12 +587,13 @@ def config_transacao_routes(app):
         Campos não enviados serão ignorados (atualização parcial simples).
         """
         transacao_id = path.transacao_id
-        logger.debug(f"Atualizando transação id={transacao_id}")
+        logger.debug("Atualizando transação id=%s", transacao_id)
         session = Session()
         try:
-            transacao = session.query(TransacaoModel).filter(TransacaoModel.id == transacao_id).first()
+            transacao = buscar_por_id(session, transacao_id)
             if not transacao:
                 return {"message": "Transação não encontrada"}, 404
+            pedido_id_anterior = transacao.pedido_id
 
             if body.descricao is not None:
                 transacao.descricao = body.descricao
@@ -212,10 +613,11 @@ def config_transacao_routes(app):
                 transacao.participant_id = body.participant_id
 
             session.commit()
+            invalidar_transacoes([transacao_id], [pedido_id_anterior, body.pedido_id])
             session.refresh(transacao)
             return apresenta_transacao(transacao), 200
         except Exception as e:
-            logger.error(f"Erro ao atualizar transação id={transacao_id}: {str(e)}")
+            logger.error("Erro ao atualizar transação id=%s: %s", transacao_id, e)
             session.rollback()
             return {"message": "Erro inesperado ao atualizar transação"}, 400
         finally:
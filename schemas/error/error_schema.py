@@ -33,6 +33,30 @@ class ErrorSchema(BaseModel):
                         "code": 404,
                         "status": "Not Found"
                     }
+                },
+                "410": {
+                    "summary": "Recurso expirado",
+                    "value": {
+                        "message": "Cursor anterior às mudanças retidas; ressincronize a partir de GET /transacoes",
+                        "code": 410,
+                        "status": "Gone"
+                    }
+                },
+                "501": {
+                    "summary": "Recurso indisponível neste backend",
+                    "value": {
+                        "message": "Recurso indisponível nesta instalação",
+                        "code": 501,
+                        "status": "Not Implemented"
+                    }
+                },
+                "503": {
+                    "summary": "Serviço sobrecarregado",
+                    "value": {
+                        "message": "Fila de escritas cheia, tente novamente",
+                        "code": 503,
+                        "status": "Service Unavailable"
+                    }
                 }
             }
         }
\ No newline at end of file
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class EstatisticasPoolSchema(BaseModel):
+    """Estado do pool de conexões e métricas acumuladas de checkout (tempos em segundos)."""
+    checkouts: int = 0
+    timeouts: int = 0
+    tempo_espera_total: float = 0.0
+    tempo_espera_maximo: float = 0.0
+    tempo_espera_medio: float = 0.0
+    tamanho: int = 5
+    conexoes_em_uso: int = 0
+    conexoes_ociosas: int = 0
+    overflow: int = -5
+
+
+class EstatisticasCacheSchema(BaseModel):
+    """Contadores do cache de leitura de transações (itens e tamanho_maximo apenas no backend em memória)."""
+    backend: str = "memoria"
+    acertos: int = 0
+    falhas: int = 0
+    remocoes_por_tamanho: int = 0
+    expiracoes: int = 0
+    invalidacoes: int = 0
+    itens: Optional[int] = 0
+    tamanho_maximo: Optional[int] = 10000
+    ttl: Optional[float] = 300.0
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class EscritaAceitaSchema(BaseModel):
+    """Resposta 202 da escrita assíncrona: a escrita foi enfileirada e será gravada no próximo grupo."""
+    id_rastreamento: str = "3f2b8c0e9a7d4c1b8e6f5a4d3c2b1a09"
+    status: str = "pendente"
+
+
+class EscritaIdPathSchema(BaseModel):
+    id_rastreamento: str
+
+
+class StatusEscritaSchema(BaseModel):
+    """Situação de uma escrita assíncrona, consultada pelo id de rastreamento."""
+    id_rastreamento: str = "3f2b8c0e9a7d4c1b8e6f5a4d3c2b1a09"
+    status: str = Field(default="aplicada", description="pendente, aplicada ou erro")
+    transacao_id: Optional[int] = Field(default=1, description="Id da transação gravada (status aplicada)")
+    mensagem: Optional[str] = Field(default=None, description="Motivo da falha (status erro)")
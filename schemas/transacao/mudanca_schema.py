@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from schemas.transacao.transacao_schema import TransacaoViewSchema
+
+
+class MudancaFiltroSchema(BaseModel):
+    """Leitura do feed a partir de um cursor; desde=0 lê desde o início do feed retido."""
+    desde: int = Field(default=0, ge=0, description="proximo_cursor da leitura anterior (ou id do último evento SSE)")
+    limite: int = Field(default=100, ge=1, le=1000)
+
+
+class UltimoEventoHeaderSchema(BaseModel):
+    """Header enviado pelo EventSource ao reconectar; tem precedência sobre desde."""
+    last_event_id: Optional[int] = Field(default=None, alias="Last-Event-ID", ge=0)
+
+
+class MudancaSchema(BaseModel):
+    cursor: int = 1
+    transacao_id: int = 1
+    pedido_id: Optional[int] = None
+    operacao: str = Field(default="criacao", description="criacao, atualizacao ou exclusao")
+    data_mudanca: datetime = Field(description="Instante (UTC) da mudança")
+    transacao: Optional[TransacaoViewSchema] = Field(
+        default=None, description="Estado atual da transação; ausente em exclusões ou se ela já não existir")
+
+
+class ListagemMudancasSchema(BaseModel):
+    mudancas: List[MudancaSchema]
+    proximo_cursor: int = Field(default=1, description="Cursor da próxima leitura (igual a desde se não houve mudanças)")
+    mais: bool = Field(default=False, description="true: há mais mudanças além desta página")
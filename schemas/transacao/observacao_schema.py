@@ -1,5 +1,40 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional
+
+# Tamanho máximo do texto de uma observação (coluna observacao.texto)
+TAMANHO_MAXIMO_OBSERVACAO = 5000
+
 
 class ObservacaoSchema(BaseModel):
     transacao_id: int = 1
-    texto: str = "Observação sobre a transação"
\ No newline at end of file
+    texto: str = Field(default="Observação sobre a transação", min_length=1, max_length=TAMANHO_MAXIMO_OBSERVACAO)
+
+
+class ObservacaoViewSchema(BaseModel):
+    id: int = 1
+    transacao_id: int = 1
+    texto: str = "Observação sobre a transação"
+    data_inclusao: datetime
+
+
+class ObservacaoFiltroSchema(BaseModel):
+    """Paginação por cursor (keyset sobre o id) das observações de uma transação, em ordem de inclusão."""
+    cursor: Optional[int] = Field(default=None, description="Id da última observação da página anterior")
+    limite: int = Field(default=50, ge=1, le=500)
+
+
+class ListagemObservacoesSchema(BaseModel):
+    observacoes: List[ObservacaoViewSchema]
+    proximo_cursor: Optional[int] = None
+
+
+class ObservacoesLoteSchema(BaseModel):
+    """Textos das observações incluídas de uma vez, na ordem informada."""
+    textos: List[Annotated[str, Field(min_length=1, max_length=TAMANHO_MAXIMO_OBSERVACAO)]] = Field(
+        default=["Primeira observação", "Segunda observação"], min_length=1, max_length=1000)
+
+
+class ResultadoObservacoesLoteSchema(BaseModel):
+    observacoes: List[ObservacaoViewSchema]
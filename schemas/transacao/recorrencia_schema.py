@@ -0,0 +1,93 @@
+from datetime import date
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.recorrencia_model import RecorrenciaModel
+from schemas.transacao.transacao_schema import TransacaoViewSchema
+
+# Máximo de ocorrências materializadas de uma vez (um único INSERT) e de ocorrências por leitura
+QUANTIDADE_MAXIMA_OCORRENCIAS = 360
+LIMITE_MAXIMO_OCORRENCIAS = 1000
+
+
+class RecorrenciaSchema(BaseModel):
+    """Regra de uma transação recorrente ou de um parcelamento (parcelado=true).
+
+    Com quantidade, todas as ocorrências são criadas de uma vez; sem quantidade (apenas recorrências),
+    a regra não tem fim e as ocorrências são calculadas na leitura.
+    """
+    descricao: str = Field(default="Aluguel", min_length=1, max_length=255)
+    tipo_transacao: TipoTransacao = TipoTransacao.DESPESA
+    valor: float = Field(default=1500.0, gt=0,
+                         description="Valor de cada ocorrência; com parcelado=true, valor total a dividir")
+    parcelado: bool = False
+    regra: Literal["diaria", "semanal", "mensal", "anual"] = "mensal"
+    intervalo: int = Field(default=1, ge=1, le=365, description="A cada N unidades da regra (ex.: 2 semanas)")
+    data_vencimento: date = Field(description="Vencimento da primeira ocorrência")
+    quantidade: Optional[int] = Field(default=None, ge=1, le=QUANTIDADE_MAXIMA_OCORRENCIAS)
+    # Mesmo alias de TransacaoSchema
+    participant_id: Optional[int] = Field(default=None, alias="participante_id")
+
+    @model_validator(mode="after")
+    def exige_quantidade_no_parcelamento(self):
+        if self.parcelado and self.quantidade is None:
+            raise ValueError("Informe a quantidade de parcelas")
+        return self
+
+
+class RecorrenciaViewSchema(BaseModel):
+    id: int = 1
+    descricao: str = "Aluguel"
+    tipo_transacao: TipoTransacao = TipoTransacao.DESPESA
+    valor: float = 1500.0
+    parcelado: bool = False
+    regra: str = "mensal"
+    intervalo: int = 1
+    data_inicio: date
+    quantidade: Optional[int] = None
+    participant_id: Optional[int] = None
+
+
+class RecorrenciaCriadaSchema(BaseModel):
+    recorrencia: RecorrenciaViewSchema
+    transacoes: List[TransacaoViewSchema] = Field(description="Ocorrências criadas (vazio em recorrências sem fim)")
+
+
+class OcorrenciasFiltroSchema(BaseModel):
+    data_inicio: Optional[date] = Field(default=None, description="Padrão: vencimento da primeira ocorrência")
+    data_fim: Optional[date] = Field(default=None, description="Padrão: um ano após data_inicio")
+    limite: int = Field(default=100, ge=1, le=LIMITE_MAXIMO_OCORRENCIAS)
+
+
+class OcorrenciaSchema(BaseModel):
+    numero: int = 1
+    data_vencimento: date
+    descricao: str = "Aluguel"
+    valor: float = 1500.0
+    pago: bool = False
+    materializada: bool = Field(default=False, description="true: existe como transação (transacao_id)")
+    transacao_id: Optional[int] = None
+
+
+class ListagemOcorrenciasSchema(BaseModel):
+    recorrencia: RecorrenciaViewSchema
+    ocorrencias: List[OcorrenciaSchema]
+    proxima_data_inicio: Optional[date] = Field(
+        default=None, description="Há mais ocorrências no período: use como data_inicio da próxima leitura")
+
+
+def apresenta_recorrencia(recorrencia: RecorrenciaModel):
+    return {
+        "id": recorrencia.id,
+        "descricao": recorrencia.descricao,
+        "tipo_transacao": recorrencia.tipo_transacao.value,
+        "valor": recorrencia.valor,
+        "parcelado": recorrencia.parcelado,
+        "regra": recorrencia.regra,
+        "intervalo": recorrencia.intervalo,
+        "data_inicio": recorrencia.data_inicio,
+        "quantidade": recorrencia.quantidade,
+        "participant_id": recorrencia.participant_id,
+    }
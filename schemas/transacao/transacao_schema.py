@@ -1,7 +1,7 @@
 from datetime import date
 
-from pydantic import BaseModel, field_validator, Field
-from typing import List, Optional
+from pydantic import BaseModel, field_validator, model_validator, Field
+from typing import List, Literal, Optional
 
 from model.transacao.transacao_model import TransacaoModel
 from model.transacao.enums.tipo_transacao_model import TipoTransacao
@@ -53,15 +53,99 @@ class TransacaoAtualizacaoSchema(BaseModel):
                 return v
         return v
 
+class UpsertQuerySchema(BaseModel):
+    """Parâmetros do PUT por pedido. Com upsert=true a transação é criada caso ainda não exista."""
+    upsert: bool = False
+
+
+class IdempotenciaHeaderSchema(BaseModel):
+    """Header opcional com a chave de idempotência do evento de Pedidos."""
+    idempotency_key: Optional[str] = Field(default=None, alias="Idempotency-Key", max_length=255)
+
+
+class EventoPedidoSchema(TransacaoAtualizacaoSchema):
+    """Evento de Pedidos aplicado via upsert em lote; cria ou atualiza a transação do pedido_id.
+
+    Campos opcionais omitidos preservam o valor atual quando a transação já existe.
+    """
+    pedido_id: int
+    chave_idempotencia: Optional[str] = Field(default=None, max_length=255)
+    descricao: str
+    tipo_transacao: TipoTransacao
+    valor: float
+
+
+class EventosPedidoSchema(BaseModel):
+    eventos: List[EventoPedidoSchema]
+
+
+class ResultadoEventoPedidoSchema(BaseModel):
+    pedido_id: int = 1
+    id: Optional[int] = None
+    status: Literal["aplicado", "repetido"] = "aplicado"
+
+
+class ResultadoEventosPedidoSchema(BaseModel):
+    total: int = 1
+    aplicados: int = 1
+    repetidos: int = 0
+    resultados: List[ResultadoEventoPedidoSchema]
+
+
 class TransacaoBuscaSchema(BaseModel):
     descricao: str = "Salario"
 
 
+class FiltrosTransacaoSchema(BaseModel):
+    """Filtros server-side comuns às consultas de transações."""
+    tipo_transacao: Optional[TipoTransacao] = None
+    pago: Optional[bool] = None
+    participant_id: Optional[int] = None
+    data_vencimento_inicio: Optional[date] = None
+    data_vencimento_fim: Optional[date] = None
+    data_pagamento_inicio: Optional[date] = None
+    data_pagamento_fim: Optional[date] = None
+
+
+class TransacaoFiltroSchema(FiltrosTransacaoSchema):
+    """Parâmetros de paginação (keyset sobre o id) e filtros da listagem de transações.
+
+    O cursor é o id da última transação recebida; a página seguinte inicia após ele.
+    """
+    cursor: Optional[int] = Field(default=None, description="Id da última transação da página anterior")
+    limite: Optional[int] = Field(default=None, ge=1, le=1000,
+                                  description="Quantidade máxima de transações (padrão 100 no formato json)")
+    formato: Literal["json", "ndjson"] = Field(default="json",
+                                               description="ndjson transmite as linhas em streaming, sem paginação")
+
+
+class ExportacaoFiltroSchema(FiltrosTransacaoSchema):
+    """Formato e filtros da exportação; cursor e limite recortam a exportação como na listagem."""
+    formato: Literal["csv", "parquet", "ndjson"] = "csv"
+    cursor: Optional[int] = Field(default=None, description="Exporta apenas as transações com id maior que o cursor")
+    limite: Optional[int] = Field(default=None, ge=1, description="Quantidade máxima de transações (padrão: todas)")
+
+
+class ResumoFiltroSchema(FiltrosTransacaoSchema):
+    """Filtros e agrupamento do resumo financeiro (mês de vencimento e/ou participante)."""
+    agrupar_por: Literal["mes", "participante", "mes_participante", "nenhum"] = "mes"
+
+
+class TransacaoTextoBuscaSchema(BaseModel):
+    """Parâmetros da busca por descrição, paginada por número de página."""
+    termo: str = Field(default="conta luz", min_length=1, max_length=255)
+    modo: Literal["texto", "prefixo", "exato"] = Field(
+        default="texto", description="texto: palavras com ranking; prefixo: início da descrição; exato: igualdade")
+    limite: int = Field(default=20, ge=1, le=100)
+    pagina: int = Field(default=1, ge=1)
+
+
 class ListagemTransacoesSchema(BaseModel):
     transacoes: List[TransacaoSchema]
+    proximo_cursor: Optional[int] = None
 
 
-def apresenta_transacoes(transacoes: List[TransacaoModel]):
+def apresenta_transacoes(transacoes: List[TransacaoModel], proximo_cursor: Optional[int] = None):
     result = []
     for transacao in transacoes:
         result.append({
@@ -76,7 +160,39 @@ def apresenta_transacoes(transacoes: List[TransacaoModel]):
             "pedido_id": transacao.pedido_id,
             "participant_id": getattr(transacao, 'participant_id', None)
         })
-    return {"transacoes": result}
+    return {"transacoes": result, "proximo_cursor": proximo_cursor}
+
+
+class ResultadoBuscaTransacoesSchema(BaseModel):
+    transacoes: List[TransacaoSchema]
+    pagina: int = 1
+    proxima_pagina: Optional[int] = None
+
+
+class TotaisResumoSchema(BaseModel):
+    """Totais agregados de um grupo do resumo. Vencidas são as pendentes com vencimento anterior a hoje."""
+    quantidade: int = 0
+    receitas: float = 0.0
+    despesas: float = 0.0
+    saldo: float = 0.0
+    receitas_pagas: float = 0.0
+    despesas_pagas: float = 0.0
+    receitas_pendentes: float = 0.0
+    despesas_pendentes: float = 0.0
+    receitas_vencidas: float = 0.0
+    despesas_vencidas: float = 0.0
+
+
+class GrupoResumoSchema(TotaisResumoSchema):
+    mes: Optional[str] = Field(default=None, description="Mês de vencimento (AAAA-MM); nulo sem vencimento")
+    participant_id: Optional[int] = None
+
+
+class ResumoTransacoesSchema(BaseModel):
+    grupos: List[GrupoResumoSchema]
+    total: TotaisResumoSchema
+    fonte: Literal["consolidado", "transacoes"] = Field(
+        default="consolidado", description="consolidado: tabela pré-agregada; transacoes: agregação direta")
 
 
 class TransacaoViewSchema(BaseModel):
@@ -94,11 +210,55 @@ class TransacaoViewSchema(BaseModel):
     participant_id: Optional[int] = None
 
 
+class ResultadoItemLoteSchema(BaseModel):
+    """Resultado individual de um item enviado na ingestão em lote."""
+    indice: int = 0
+    status: Literal["criada", "conflito", "invalida"] = "criada"
+    id: Optional[int] = None
+    pedido_id: Optional[int] = None
+    mensagem: Optional[str] = None
+
+
+class ResultadoLoteSchema(BaseModel):
+    """Resumo da ingestão em lote, com o resultado de cada item na ordem de envio."""
+    total: int = 1
+    criadas: int = 1
+    conflitos: int = 0
+    invalidas: int = 0
+    resultados: List[ResultadoItemLoteSchema]
+
+
 class TransacaoDelSchema(BaseModel):
     message: str
     descricao: str
 
 
+class TransacaoExcluidaSchema(BaseModel):
+    message: str = "Transação removida"
+    id: int = 1
+
+
+class ExclusaoLoteSchema(BaseModel):
+    """Critério da exclusão em lote: ids explícitos e/ou os mesmos filtros da listagem (combinados com E).
+
+    Ao menos um critério é obrigatório, para que um corpo vazio não remova todas as transações.
+    """
+    ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=1000)
+    filtros: Optional[FiltrosTransacaoSchema] = None
+
+    @model_validator(mode="after")
+    def exige_criterio(self):
+        if self.ids is None and (self.filtros is None or not self.filtros.model_dump(exclude_none=True)):
+            raise ValueError("Informe ids e/ou ao menos um filtro")
+        return self
+
+
+class ResultadoExclusaoSchema(BaseModel):
+    removidas: int = 1
+    ids: List[int] = [1]
+    logica: bool = Field(default=False, description="true: exclusão lógica, expurgada depois em segundo plano")
+
+
 def apresenta_transacao(transacao: TransacaoModel):
     return {
         "id": transacao.id,
@@ -0,0 +1,45 @@
+import os
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.engine import Engine
+
+from repositories.transacao.arquivo_repository import mover_para_arquivo, selecionar_lote_arquivamento
+from utils.logger import logger
+
+# Padrões do arquivamento das transações liquidadas (ver README, seção "Arquivo de transações liquidadas")
+IDADE_PADRAO_DIAS = 730
+TAMANHO_LOTE_ARQUIVAMENTO = 1000
+
+
+def idade_arquivamento(app) -> timedelta:
+    dias = float(app.config.get("ARQUIVO_IDADE_DIAS", os.getenv("ARQUIVO_IDADE_DIAS", IDADE_PADRAO_DIAS)))
+    return timedelta(days=dias)
+
+
+def tamanho_lote_arquivamento(app) -> int:
+    return int(app.config.get("ARQUIVO_TAMANHO_LOTE", os.getenv("ARQUIVO_TAMANHO_LOTE", TAMANHO_LOTE_ARQUIVAMENTO)))
+
+
+def arquivar_liquidadas(engine: Engine, idade: timedelta = timedelta(days=IDADE_PADRAO_DIAS),
+                        tamanho_lote: int = TAMANHO_LOTE_ARQUIVAMENTO,
+                        hoje: Optional[date] = None) -> Dict[int, int]:
+    """Move para o arquivo, em lotes, as transações pagas com vencimento mais antigo que a idade.
+
+    Cada lote é uma transação de banco curta (seleção, cópia para as tabelas do ano e remoção de
+    transacao), como no expurgo. Retorna a quantidade arquivada por ano de vencimento.
+    """
+    corte = (hoje or date.today()) - idade
+    por_ano: Dict[int, int] = {}
+    while True:
+        with engine.begin() as conn:
+            linhas = selecionar_lote_arquivamento(conn, corte, tamanho_lote)
+            movidas = mover_para_arquivo(conn, linhas) if linhas else {}
+        for ano, quantidade in movidas.items():
+            por_ano[ano] = por_ano.get(ano, 0) + quantidade
+        if len(linhas) < tamanho_lote:
+            break
+    if por_ano:
+        logger.info("Arquivamento: %s transação(ões) movida(s) para o arquivo (vencimento antes de %s)",
+                    sum(por_ano.values()), corte.isoformat())
+    return por_ano
@@ -0,0 +1,51 @@
+from typing import Any, Dict, Iterable, Optional
+
+from utils.cache import CacheDesligado, criar_cache
+
+# Cache das representações JSON já serializadas das transações, por id e por pedido_id; criado em config_cache
+cache_transacoes = CacheDesligado()
+
+
+def config_cache(app) -> None:
+    """Cria o cache de leitura conforme a configuração do app (CACHE_BACKEND, CACHE_TTL...)."""
+    global cache_transacoes
+    cache_transacoes = criar_cache(app)
+
+
+def estatisticas_cache() -> Dict[str, Any]:
+    return cache_transacoes.estatisticas()
+
+
+def chave_id(transacao_id: int) -> str:
+    return f"id:{transacao_id}"
+
+
+def chave_pedido(pedido_id: int) -> str:
+    return f"pedido:{pedido_id}"
+
+
+def obter_transacao_serializada(chave: str, versao: int) -> Optional[str]:
+    """Representação em cache, se armazenada na versão informada das transações.
+
+    A invalidação após a escrita só alcança o processo que a fez; com a versão junto da entrada, os
+    demais workers tratam a cópia anterior à escrita como ausente em vez de servi-la com a ETag nova.
+    """
+    valor = cache_transacoes.obter(chave)
+    if valor is None:
+        return None
+    versao_armazenada, _, corpo = valor.partition(":")
+    return corpo if versao_armazenada == str(versao) else None
+
+
+def armazenar_transacao_serializada(corpo: str, transacao_id: int, pedido_id: Optional[int], versao: int) -> None:
+    """Armazena a representação, com a versão em que foi lida, sob as duas chaves de consulta (id e pedido_id)."""
+    valor = f"{versao}:{corpo}"
+    cache_transacoes.definir(chave_id(transacao_id), valor)
+    if pedido_id is not None:
+        cache_transacoes.definir(chave_pedido(pedido_id), valor)
+
+
+def invalidar_transacoes(ids: Iterable[Optional[int]] = (), pedido_ids: Iterable[Optional[int]] = ()) -> None:
+    """Remove do cache as transações alteradas; deve ser chamado após o commit da escrita."""
+    chaves = [chave_id(i) for i in ids if i is not None] + [chave_pedido(p) for p in pedido_ids if p is not None]
+    cache_transacoes.invalidar(*chaves)
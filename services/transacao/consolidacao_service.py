@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.engine import Connection
+
+from model.transacao.resumo_model import ResumoTransacaoModel
+from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.arquivo_repository import tabelas_arquivadas
+from repositories.transacao.resumo_repository import expressao_mes
+
+# Diferença de valor tolerada na verificação (soma de floats em ordens diferentes)
+TOLERANCIA_VALOR = 0.005
+
+
+# Colunas de transacao (e das tabelas de arquivo) que formam o consolidado
+_COLUNAS_CONSOLIDADO = ("id", "data_vencimento", "participant_id", "tipo_transacao", "pago", "valor")
+
+
+def _select_consolidado_real(conn: Connection):
+    """Agregação de transacao (sem as excluídas logicamente) e do arquivo nas chaves do consolidado, do zero."""
+    partes = [select(*[getattr(TransacaoModel, nome).label(nome) for nome in _COLUNAS_CONSOLIDADO])
+              .where(TransacaoModel.data_exclusao.is_(None))]
+    partes += [select(*[getattr(tabelas.colunas, nome).label(nome) for nome in _COLUNAS_CONSOLIDADO])
+               for tabelas in tabelas_arquivadas(conn)]
+    origem = (partes[0] if len(partes) == 1 else union_all(*partes)).subquery().c
+    mes = expressao_mes(conn.dialect.name, origem.data_vencimento).label("mes")
+    return (select(mes, origem.participant_id, origem.tipo_transacao, origem.pago,
+                   func.count(origem.id).label("quantidade"),
+                   func.coalesce(func.sum(origem.valor), 0).label("total"))
+            .group_by(mes, origem.participant_id, origem.tipo_transacao, origem.pago))
+
+
+def reconstruir_consolidado(conn: Connection) -> int:
+    """Recalcula resumo_transacao a partir de transacao (DELETE + INSERT ... SELECT GROUP BY).
+
+    Retorna a quantidade de linhas do consolidado. O commit fica a cargo do chamador.
+    """
+    conn.execute(delete(ResumoTransacaoModel))
+    colunas = ["mes", "participant_id", "tipo_transacao", "pago", "quantidade", "total"]
+    conn.execute(insert(ResumoTransacaoModel).from_select(colunas, _select_consolidado_real(conn)))
+    return conn.scalar(select(func.count()).select_from(ResumoTransacaoModel))
+
+
+def _por_chave(linhas) -> Dict[Tuple, Tuple[int, float]]:
+    return {(l.mes, l.participant_id, l.tipo_transacao, l.pago): (l.quantidade, l.total) for l in linhas}
+
+
+def verificar_consolidado(conn: Connection) -> List[Dict[str, Any]]:
+    """Compara o consolidado com a agregação real e retorna as chaves divergentes (drift)."""
+    real = _por_chave(conn.execute(_select_consolidado_real(conn)))
+    consolidado = _por_chave(conn.execute(select(
+        ResumoTransacaoModel.mes, ResumoTransacaoModel.participant_id, ResumoTransacaoModel.tipo_transacao,
+        ResumoTransacaoModel.pago, ResumoTransacaoModel.quantidade, ResumoTransacaoModel.total)))
+
+    divergencias = []
+    for chave in sorted(real.keys() | consolidado.keys(), key=str):
+        quantidade_real, total_real = real.get(chave, (0, 0.0))
+        quantidade_cons, total_cons = consolidado.get(chave, (0, 0.0))
+        if quantidade_real != quantidade_cons or abs(total_real - total_cons) > TOLERANCIA_VALOR:
+            mes, participant_id, tipo_transacao, pago = chave
+            divergencias.append({
+                "mes": mes, "participant_id": participant_id, "tipo_transacao": tipo_transacao.value,
+                "pago": pago, "quantidade_real": quantidade_real, "quantidade_consolidada": quantidade_cons,
+                "total_real": total_real, "total_consolidado": total_cons,
+            })
+    return divergencias
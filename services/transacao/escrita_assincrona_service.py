@@ -0,0 +1,534 @@
+"""Escrita assíncrona (write-behind) de transações com group commit (ESCRITA_ASSINCRONA=1).
+
+As rotas validam a escrita, registram-na no diário (quando durável) e a enfileiram, respondendo 202
+com um id de rastreamento. Uma thread escritora por processo agrupa o que chegou em até
+ESCRITA_INTERVALO_MS (ou ESCRITA_LOTE_MAXIMO itens) e grava tudo com um único commit: em vez de um
+lock de escrita do SQLite por requisição, um por grupo. Atualizações pendentes do mesmo pedido_id são
+combinadas (last-write-wins por campo) e aplicadas uma única vez.
+
+Durabilidade: em "memoria" o que está na fila se perde se o processo morrer; em "diario" cada escrita
+aceita é anexada a um arquivo NDJSON do processo antes do 202, e os grupos confirmados são marcados no
+mesmo arquivo. Na inicialização, diários de processos encerrados são reaplicados (entrega ao menos uma
+vez: uma queda entre o commit e a marcação reaplica aquele grupo; atualizações e upserts são
+idempotentes, e criações com pedido_id esbarram no índice único).
+"""
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from database.connection import Session
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.transacao_repository import buscar_por_pedido
+from schemas.transacao.transacao_schema import TransacaoAtualizacaoSchema, TransacaoSchema
+from services.transacao.cache_service import invalidar_transacoes
+from services.transacao.upsert_service import UpsertInvalidoError, atualizar_campos, \
+    registrar_chave_idempotencia, upsert_por_pedido
+from utils.logger import logger
+
+CRIAR = "criar"
+ATUALIZAR = "atualizar"
+
+PENDENTE = "pendente"
+APLICADA = "aplicada"
+ERRO = "erro"
+
+
+class FilaEscritaCheiaError(RuntimeError):
+    """A fila de escritas atingiu a capacidade (ESCRITA_FILA_MAXIMA); o cliente deve tentar mais tarde."""
+
+
+class EscritaNaoAplicadaError(ValueError):
+    """A escrita não pode ser aplicada (ex.: transação do pedido inexistente)."""
+
+
+@dataclass
+class OperacaoEscrita:
+    tipo: str
+    dados: Dict[str, Any]
+    pedido_id: Optional[int] = None
+    upsert: bool = False
+    chaves_idempotencia: List[str] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # Ids de rastreamento combinados nesta operação (ela mesma incluída)
+    ids: List[str] = field(default_factory=list)
+    segmento: Optional["_SegmentoDiario"] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if not self.ids:
+            self.ids = [self.id]
+
+    def para_json(self) -> str:
+        return json.dumps({"id": self.id, "tipo": self.tipo, "dados": self.dados, "pedido_id": self.pedido_id,
+                           "upsert": self.upsert, "chaves_idempotencia": self.chaves_idempotencia},
+                          ensure_ascii=False)
+
+    @classmethod
+    def de_json(cls, linha: Dict[str, Any]) -> "OperacaoEscrita":
+        return cls(linha["tipo"], linha["dados"], linha.get("pedido_id"), linha.get("upsert", False),
+                   linha.get("chaves_idempotencia") or [], linha["id"])
+
+
+@dataclass(frozen=True)
+class ConfiguracaoEscrita:
+    intervalo: float = 0.05
+    lote_maximo: int = 500
+    capacidade: int = 10000
+    durabilidade: str = "memoria"
+    diretorio_diario: str = "database/diario_escritas"
+    fsync: bool = False
+    tamanho_maximo_diario: int = 64 * 1024 * 1024
+    resultados_mantidos: int = 100000
+
+    @classmethod
+    def from_app(cls, app) -> "ConfiguracaoEscrita":
+        def ler(nome, padrao):
+            return app.config.get(nome, os.getenv(nome, padrao))
+
+        return cls(
+            intervalo=float(ler("ESCRITA_INTERVALO_MS", 50)) / 1000,
+            lote_maximo=int(ler("ESCRITA_LOTE_MAXIMO", 500)),
+            capacidade=int(ler("ESCRITA_FILA_MAXIMA", 10000)),
+            durabilidade=str(ler("ESCRITA_DURABILIDADE", "memoria")),
+            diretorio_diario=str(ler("ESCRITA_DIARIO_DIR", "database/diario_escritas")),
+            fsync=str(ler("ESCRITA_DIARIO_FSYNC", "0")) == "1",
+            tamanho_maximo_diario=int(ler("ESCRITA_DIARIO_TAMANHO_MAXIMO_MB", 64)) * 1024 * 1024,
+            resultados_mantidos=int(ler("ESCRITA_RESULTADOS_MANTIDOS", 100000)),
+        )
+
+
+def escrita_assincrona_habilitada(app) -> bool:
+    return str(app.config.get("ESCRITA_ASSINCRONA", os.getenv("ESCRITA_ASSINCRONA", "0"))) == "1"
+
+
+class _SegmentoDiario:
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.arquivo = open(caminho, "a", encoding="utf-8")
+        self.pendentes = 0
+        self.fechado = False
+
+    def escrever(self, linha: str, fsync: bool) -> None:
+        self.arquivo.write(linha + "\n")
+        self.arquivo.flush()
+        if fsync:
+            os.fsync(self.arquivo.fileno())
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+        self.fechado = True
+
+
+class DiarioEscritas:
+    """Diário em disco das escritas aceitas e ainda não confirmadas, em segmentos NDJSON por processo.
+
+    Um segmento sem escritas pendentes é truncado (ou, se já substituído por um novo ao atingir o
+    tamanho máximo, removido), de modo que o diário só guarda o que ainda está na fila.
+    """
+    PREFIXO = "escritas-"
+
+    def __init__(self, diretorio: str, fsync: bool, tamanho_maximo: int):
+        self.diretorio, self.fsync, self.tamanho_maximo = diretorio, fsync, tamanho_maximo
+        self._lock = threading.Lock()
+        self._sequencia = 0
+        self._atual: Optional[_SegmentoDiario] = None
+        # Segmentos já substituídos que ainda têm escritas pendentes
+        self._fechados: List[_SegmentoDiario] = []
+        self._recuperados: List[str] = []
+
+    def abrir(self) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._atual = self._novo_segmento()
+
+    def _novo_segmento(self) -> _SegmentoDiario:
+        self._sequencia += 1
+        nome = f"{self.PREFIXO}{os.getpid()}-{int(time.time())}-{self._sequencia:06d}.ndjson"
+        return _SegmentoDiario(os.path.join(self.diretorio, nome))
+
+    def registrar(self, operacao: OperacaoEscrita) -> None:
+        with self._lock:
+            self._atual.escrever(operacao.para_json(), self.fsync)
+            self._atual.pendentes += 1
+            operacao.segmento = self._atual
+            if self._atual.arquivo.tell() >= self.tamanho_maximo:
+                self._atual.fechar()
+                self._fechados.append(self._atual)
+                self._atual = self._novo_segmento()
+
+    def confirmar(self, operacoes: List[OperacaoEscrita]) -> None:
+        por_segmento: Dict[_SegmentoDiario, List[str]] = {}
+        for operacao in operacoes:
+            if operacao.segmento is not None:
+                por_segmento.setdefault(operacao.segmento, []).append(operacao.id)
+        with self._lock:
+            for segmento, ids in por_segmento.items():
+                segmento.pendentes -= len(ids)
+                if segmento.fechado and segmento.pendentes == 0:
+                    os.remove(segmento.caminho)
+                    self._fechados.remove(segmento)
+            if self._atual.pendentes == 0 and not self._fechados:
+                # Nada pendente: o diário volta a ficar vazio
+                self._atual.arquivo.truncate(0)
+                self._atual.arquivo.seek(0)
+            else:
+                # A marcação vai sempre para o segmento atual (os substituídos estão fechados)
+                self._atual.escrever(json.dumps({"confirmadas": [operacao.id for operacao in operacoes]}),
+                                     self.fsync)
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._atual is not None and not self._atual.fechado:
+                self._atual.fechar()
+                if self._atual.pendentes == 0 and not self._fechados:
+                    os.remove(self._atual.caminho)
+
+    def recuperar_orfaos(self) -> List[OperacaoEscrita]:
+        """Lê os diários de processos encerrados e retorna as escritas não confirmadas, na ordem original.
+
+        Cada arquivo é reivindicado com um rename atômico, para que só um processo o reaplique; os
+        arquivos reivindicados são removidos por remover_recuperados depois de reenfileirar as escritas.
+        """
+        pendentes: Dict[str, OperacaoEscrita] = {}
+        for caminho in sorted(glob.glob(os.path.join(self.diretorio, f"{self.PREFIXO}*"))):
+            if _processo_ativo(_dono(caminho)):
+                continue
+            reivindicado = f"{caminho.split(_SUFIXO_RECUPERACAO)[0]}{_SUFIXO_RECUPERACAO}{os.getpid()}"
+            try:
+                os.rename(caminho, reivindicado)
+            except OSError:
+                continue
+            self._recuperados.append(reivindicado)
+            with open(reivindicado, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError:
+                        # Última linha incompleta (queda durante a escrita): a escrita não chegou a ser aceita
+                        continue
+                    if "confirmadas" in registro:
+                        for confirmada in registro["confirmadas"]:
+                            pendentes.pop(confirmada, None)
+                    else:
+                        pendentes[registro["id"]] = OperacaoEscrita.de_json(registro)
+        return list(pendentes.values())
+
+    def remover_recuperados(self) -> None:
+        for caminho in self._recuperados:
+            os.remove(caminho)
+        self._recuperados = []
+
+
+# Arquivo reivindicado por um processo que o está reaplicando: <segmento>.recuperando-<pid>
+_SUFIXO_RECUPERACAO = ".recuperando-"
+
+
+def _dono(caminho: str) -> int:
+    """Pid do processo responsável pelo arquivo do diário (quem o escreveu ou quem o está reaplicando)."""
+    nome = os.path.basename(caminho)
+    if _SUFIXO_RECUPERACAO in nome:
+        return int(nome.rsplit(_SUFIXO_RECUPERACAO, 1)[1])
+    return int(nome[len(DiarioEscritas.PREFIXO):].split("-", 1)[0])
+
+
+def _processo_ativo(pid: int) -> bool:
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def combinar(operacoes: List[OperacaoEscrita]) -> List[OperacaoEscrita]:
+    """Combina as atualizações do mesmo pedido_id (campos posteriores prevalecem) na posição da última.
+
+    Criações não são combinadas. O upsert prevalece se qualquer atualização combinada o pediu.
+    """
+    combinadas: List[Optional[OperacaoEscrita]] = []
+    posicao_por_pedido: Dict[int, int] = {}
+    for operacao in operacoes:
+        if operacao.tipo != ATUALIZAR:
+            combinadas.append(operacao)
+            continue
+        anterior_idx = posicao_por_pedido.get(operacao.pedido_id)
+        if anterior_idx is not None:
+            anterior = combinadas[anterior_idx]
+            combinadas[anterior_idx] = None
+            dados = anterior.dados | operacao.dados
+            if operacao.dados.get("pago") is False and "data_pagamento" not in operacao.dados:
+                # Como na aplicação em sequência, pago=false descarta a data_pagamento anterior
+                dados.pop("data_pagamento", None)
+            operacao = OperacaoEscrita(ATUALIZAR, dados, operacao.pedido_id,
+                                       anterior.upsert or operacao.upsert,
+                                       anterior.chaves_idempotencia + operacao.chaves_idempotencia,
+                                       operacao.id, anterior.ids + operacao.ids)
+        posicao_por_pedido[operacao.pedido_id] = len(combinadas)
+        combinadas.append(operacao)
+    return [operacao for operacao in combinadas if operacao is not None]
+
+
+def _aplicar(session, operacao: OperacaoEscrita) -> Optional[int]:
+    """Aplica a operação na sessão (sem commit) e retorna o id da transação afetada."""
+    if operacao.tipo == CRIAR:
+        dados = TransacaoSchema.model_validate(operacao.dados)
+        transacao = TransacaoModel(data_vencimento=dados.data_vencimento, descricao=dados.descricao,
+                                   tipo_transacao=TipoTransacao(dados.tipo_transacao), valor=dados.valor,
+                                   pago=dados.pago, data_pagamento=dados.data_pagamento,
+                                   pedido_id=dados.pedido_id, participant_id=dados.participant_id)
+        session.add(transacao)
+        session.flush()
+        return transacao.id
+
+    dados = TransacaoAtualizacaoSchema.model_validate(operacao.dados)
+    if operacao.upsert:
+        chaves = operacao.chaves_idempotencia
+        novas = [registrar_chave_idempotencia(session, chave, operacao.pedido_id) for chave in chaves]
+        if chaves and not any(novas):
+            # Todas as chaves já processadas: reenvio do mesmo evento, nada a aplicar
+            transacao = buscar_por_pedido(session, operacao.pedido_id)
+            return transacao.id if transacao else None
+        transacao_id, _ = upsert_por_pedido(session, operacao.pedido_id, dados)
+        return transacao_id
+
+    transacao = buscar_por_pedido(session, operacao.pedido_id)
+    if transacao is None:
+        raise EscritaNaoAplicadaError("Transação não encontrada")
+    atualizar_campos(transacao, dados)
+    session.flush()
+    return transacao.id
+
+
+# Erros da própria escrita: ela é registrada com status erro e o grupo segue sem ela. Qualquer outro
+# (OperationalError como database is locked, DBAPIError) desfaz o grupo inteiro, que é repetido
+ERROS_DE_DADOS = (IntegrityError, EscritaNaoAplicadaError, UpsertInvalidoError, ValidationError)
+
+
+def _mensagem_erro(erro: Exception) -> str:
+    if isinstance(erro, IntegrityError):
+        return "Erro de integridade (pedido_id já vinculado a outra transação)"
+    if isinstance(erro, (EscritaNaoAplicadaError, UpsertInvalidoError)):
+        return str(erro)
+    return "Erro inesperado"
+
+
+class EscritorAssincrono:
+    """Fila limitada de escritas e a thread que as grava em grupos (group commit)."""
+
+    def __init__(self, configuracao: ConfiguracaoEscrita):
+        self.configuracao = configuracao
+        self._fila: "queue.Queue[OperacaoEscrita]" = queue.Queue(maxsize=configuracao.capacidade)
+        self._lock = threading.Lock()
+        self._resultados: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock_resultados = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.diario: Optional[DiarioEscritas] = None
+        if configuracao.durabilidade == "diario":
+            self.diario = DiarioEscritas(configuracao.diretorio_diario, configuracao.fsync,
+                                         configuracao.tamanho_maximo_diario)
+        self.grupos_gravados = 0
+        self.escritas_gravadas = 0
+
+    def iniciar(self) -> None:
+        """Inicia a thread escritora e reenfileira as escritas pendentes dos diários de processos encerrados.
+
+        A thread começa antes do reenfileiramento: com mais escritas recuperadas que a capacidade da fila,
+        put espera que ela grave os primeiros grupos em vez de bloquear a inicialização para sempre.
+        """
+        recuperadas = []
+        if self.diario is not None:
+            recuperadas = self.diario.recuperar_orfaos()
+            self.diario.abrir()
+        self._thread = threading.Thread(target=self._executar, name="escritor-transacoes", daemon=True)
+        self._thread.start()
+        if recuperadas:
+            logger.info("Reaplicando %s escrita(s) pendente(s) de diários anteriores", len(recuperadas))
+            for operacao in recuperadas:
+                self.diario.registrar(operacao)
+                self._registrar_resultado(operacao.ids, PENDENTE)
+                self._fila.put(operacao)
+        if self.diario is not None:
+            self.diario.remover_recuperados()
+
+    def enfileirar(self, operacao: OperacaoEscrita) -> str:
+        """Registra a escrita no diário (se houver) e a enfileira; levanta FilaEscritaCheiaError se lotada."""
+        with self._lock:
+            if self._fila.full():
+                raise FilaEscritaCheiaError("Fila de escritas cheia")
+            if self.diario is not None:
+                self.diario.registrar(operacao)
+            self._registrar_resultado(operacao.ids, PENDENTE)
+            self._fila.put_nowait(operacao)
+        return operacao.id
+
+    def resultado(self, id_rastreamento: str) -> Optional[Dict[str, Any]]:
+        with self._lock_resultados:
+            return self._resultados.get(id_rastreamento)
+
+    def tamanho_fila(self) -> int:
+        return self._fila.qsize()
+
+    def parar(self) -> None:
+        """Grava o que ainda está na fila e encerra a thread."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.diario is not None:
+            self.diario.fechar()
+
+    def _registrar_resultado(self, ids: List[str], status: str, transacao_id: Optional[int] = None,
+                             mensagem: Optional[str] = None) -> None:
+        with self._lock_resultados:
+            for id_rastreamento in ids:
+                self._resultados[id_rastreamento] = {"id_rastreamento": id_rastreamento, "status": status,
+                                                     "transacao_id": transacao_id, "mensagem": mensagem}
+                self._resultados.move_to_end(id_rastreamento)
+            while len(self._resultados) > self.configuracao.resultados_mantidos:
+                self._resultados.popitem(last=False)
+
+    def _coletar(self) -> List[OperacaoEscrita]:
+        """Espera a primeira escrita e junta as que chegarem até o intervalo ou o tamanho máximo do grupo."""
+        try:
+            operacoes = [self._fila.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        limite = time.monotonic() + self.configuracao.intervalo
+        while len(operacoes) < self.configuracao.lote_maximo:
+            restante = limite - time.monotonic()
+            try:
+                operacoes.append(self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return operacoes
+
+    def _executar(self) -> None:
+        while True:
+            operacoes = self._coletar()
+            if operacoes:
+                self._gravar_com_nova_tentativa(operacoes)
+            elif self._parar.is_set():
+                return
+
+    def _gravar_com_nova_tentativa(self, operacoes: List[OperacaoEscrita]) -> None:
+        """Falhas do banco (ex.: database is locked) repetem o grupo com espera crescente, sem confirmá-lo no diário.
+
+        Enquanto isso a fila enche e as rotas passam a responder 503 (contrapressão). Ao encerrar o
+        processo o grupo é abandonado, mas continua no diário para a próxima inicialização.
+        """
+        espera = 0.1
+        while True:
+            try:
+                self.gravar(operacoes)
+                return
+            except Exception as e:
+                logger.error("Erro ao gravar grupo de %s escrita(s), nova tentativa em %.1fs: %s",
+                             len(operacoes), espera, e)
+                if self._parar.wait(espera):
+                    return
+                espera = min(espera * 2, 5.0)
+
+    def gravar(self, operacoes: List[OperacaoEscrita]) -> None:
+        """Grava o grupo com um único commit; se uma escrita falhar, refaz o grupo isolando-a em savepoints.
+
+        Só os ERROS_DE_DADOS são isolados; os demais são propagados sem registrar resultado nem confirmar
+        o grupo no diário, para que _gravar_com_nova_tentativa o repita.
+        """
+        combinadas = combinar(operacoes)
+        session = Session()
+        try:
+            try:
+                resultados = [(operacao, _aplicar(session, operacao), None) for operacao in combinadas]
+                session.commit()
+            except ERROS_DE_DADOS:
+                session.rollback()
+                resultados = []
+                for operacao in combinadas:
+                    try:
+                        with session.begin_nested():
+                            resultados.append((operacao, _aplicar(session, operacao), None))
+                    except ERROS_DE_DADOS as e:
+                        resultados.append((operacao, None, e))
+                session.commit()
+            afetadas = [operacao for operacao, _, erro in resultados if erro is None]
+            invalidar_transacoes([transacao_id for _, transacao_id, erro in resultados if erro is None],
+                                 [operacao.pedido_id for operacao in afetadas])
+        finally:
+            Session.remove()
+
+        for operacao, transacao_id, erro in resultados:
+            if erro is None:
+                self._registrar_resultado(operacao.ids, APLICADA, transacao_id)
+            else:
+                logger.warning("Escrita %s não aplicada: %s", operacao.id, erro)
+                self._registrar_resultado(operacao.ids, ERRO, mensagem=_mensagem_erro(erro))
+        if self.diario is not None:
+            self.diario.confirmar(operacoes)
+        self.grupos_gravados += 1
+        self.escritas_gravadas += len(operacoes)
+        logger.debug("Grupo gravado: %s escrita(s), %s após combinar", len(operacoes), len(combinadas))
+
+
+# Um escritor por processo: com o preload do gunicorn a thread do master não existe nos workers
+_configuracao: Optional[ConfiguracaoEscrita] = None
+_escritor: Optional[EscritorAssincrono] = None
+_pid_escritor: Optional[int] = None
+_lock_escritor = threading.Lock()
+# Ligado por adiar_escritor: config_escrita_assincrona apenas guarda a configuração
+_inicio_adiado = False
+
+
+def obter_escritor() -> Optional[EscritorAssincrono]:
+    """Escritor do processo corrente, criado (e com diários órfãos reaplicados) no primeiro uso."""
+    global _escritor, _pid_escritor
+    if _configuracao is None:
+        return None
+    with _lock_escritor:
+        if _escritor is None or _pid_escritor != os.getpid():
+            _escritor = EscritorAssincrono(_configuracao)
+            _pid_escritor = os.getpid()
+            _escritor.iniciar()
+        return _escritor
+
+
+def parar_escritor() -> None:
+    """Escoa a fila do processo corrente (fim do worker ou do processo)."""
+    if _escritor is not None and _pid_escritor == os.getpid():
+        _escritor.parar()
+
+
+atexit.register(parar_escritor)
+
+
+def adiar_escritor() -> None:
+    """Não inicia o escritor em create_app; cada processo o inicia com obter_escritor.
+
+    Usado pelo gunicorn com preload_app: o master carrega a aplicação mas não atende requisições, e um
+    escritor nele reaplicaria os diários órfãos e manteria um diário próprio, fora dos workers.
+    """
+    global _inicio_adiado
+    _inicio_adiado = True
+
+
+def config_escrita_assincrona(app) -> Optional[EscritorAssincrono]:
+    """Liga a escrita assíncrona quando ESCRITA_ASSINCRONA=1 e inicia o escritor deste processo."""
+    global _configuracao
+    if not escrita_assincrona_habilitada(app):
+        return None
+    _configuracao = ConfiguracaoEscrita.from_app(app)
+    if _inicio_adiado:
+        return None
+    return obter_escritor()
@@ -0,0 +1,121 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+
+from database.connection import fabrica_sessao
+from database.exclusao_logica import existem_excluidas, registrar_exclusao_logica
+from model.transacao.observacao_model import ObservacaoModel
+from model.transacao.transacao_model import TransacaoModel
+from repositories.transacao.transacao_repository import registrar_ocorrencias_excluidas
+from services.transacao.upsert_service import expurgar_chaves_idempotencia, retencao_idempotencia
+from utils.logger import logger
+
+# Padrões do expurgo das transações excluídas logicamente (ver README, seção "Exclusão de transações")
+RETENCAO_PADRAO_DIAS = 7
+TAMANHO_LOTE_EXPURGO = 1000
+INTERVALO_EXPURGO_SEGUNDOS = 3600
+
+
+def exclusao_logica_habilitada(app) -> bool:
+    return str(app.config.get("EXCLUSAO_LOGICA", os.getenv("EXCLUSAO_LOGICA", "0"))) == "1"
+
+
+def config_exclusao_logica(app, engine: Engine) -> bool:
+    """Registra nas sessões o filtro das transações excluídas logicamente, se elas puderem existir.
+
+    Com EXCLUSAO_LOGICA=1, ou com excluídas ainda não expurgadas de quando ela estava ativa. Caso
+    contrário nenhuma linha teria data_exclusao preenchida, e o critério só encareceria as consultas.
+    """
+    if not exclusao_logica_habilitada(app) and not existem_excluidas(engine):
+        return False
+    registrar_exclusao_logica(fabrica_sessao)
+    return True
+
+
+def expurgar_excluidas(engine: Engine, retencao: timedelta = timedelta(days=RETENCAO_PADRAO_DIAS),
+                       tamanho_lote: int = TAMANHO_LOTE_EXPURGO) -> int:
+    """Remove fisicamente as transações excluídas logicamente há mais que a retenção, com suas observações.
+
+    Cada lote é uma transação de banco curta (ids pelo índice parcial ix_transacao_data_exclusao,
+    observações, transações), sem bloquear as escritas da API por muito tempo. Retorna o total expurgado.
+    """
+    limite = datetime.now() - retencao
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            ids = list(conn.scalars(select(TransacaoModel.id)
+                                    .where(TransacaoModel.data_exclusao.is_not(None),
+                                           TransacaoModel.data_exclusao <= limite)
+                                    .limit(tamanho_lote)))
+            if ids:
+                conn.execute(delete(ObservacaoModel).where(ObservacaoModel.fk_id_produto.in_(ids)))
+                registrar_ocorrencias_excluidas(conn, ids, datetime.now())
+                conn.execute(delete(TransacaoModel).where(TransacaoModel.id.in_(ids)))
+        total += len(ids)
+        if len(ids) < tamanho_lote:
+            break
+    if total:
+        logger.info("Expurgo: %s transação(ões) excluída(s) removida(s)", total)
+    return total
+
+
+def retencao_expurgo(app) -> timedelta:
+    dias = float(app.config.get("EXPURGO_RETENCAO_DIAS", os.getenv("EXPURGO_RETENCAO_DIAS", RETENCAO_PADRAO_DIAS)))
+    return timedelta(days=dias)
+
+
+def tamanho_lote_expurgo(app) -> int:
+    return int(app.config.get("EXPURGO_TAMANHO_LOTE", os.getenv("EXPURGO_TAMANHO_LOTE", TAMANHO_LOTE_EXPURGO)))
+
+
+class ExpurgoPeriodico:
+    """Thread daemon que executa as tarefas de expurgo a cada intervalo até parar() ser chamado."""
+
+    def __init__(self, intervalo: float, tarefas: List[Callable[[], int]]):
+        self.intervalo, self.tarefas = intervalo, tarefas
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._executar, name="expurgo-transacoes", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            for tarefa in self.tarefas:
+                try:
+                    tarefa()
+                except Exception as e:
+                    # Falha de um ciclo (ex.: banco bloqueado) não encerra a thread; o próximo ciclo tenta de novo
+                    logger.error("Erro no expurgo periódico: %s", e)
+
+
+def config_expurgo(app, engine: Engine) -> Optional[ExpurgoPeriodico]:
+    """Inicia o expurgo periódico (EXPURGO_INTERVALO_SEGUNDOS > 0) das chaves de idempotência vencidas e,
+    com a exclusão lógica ativa, das transações excluídas.
+
+    Com o preload do gunicorn a thread existe só no master (não sobrevive ao fork), ou seja, um
+    expurgo por servidor; sem preload cada worker tem a sua, e os lotes concorrentes apenas se repetem.
+    """
+    intervalo = float(app.config.get("EXPURGO_INTERVALO_SEGUNDOS",
+                                     os.getenv("EXPURGO_INTERVALO_SEGUNDOS", INTERVALO_EXPURGO_SEGUNDOS)))
+    if intervalo <= 0:
+        return None
+    retencao_chaves = retencao_idempotencia(app)
+    tarefas = [partial(expurgar_chaves_idempotencia, engine, retencao_chaves)]
+    if exclusao_logica_habilitada(app):
+        tarefas.append(partial(expurgar_excluidas, engine, retencao_expurgo(app), tamanho_lote_expurgo(app)))
+    expurgo = ExpurgoPeriodico(intervalo, tarefas)
+    expurgo.iniciar()
+    app.extensions["expurgo_transacoes"] = expurgo
+    return expurgo
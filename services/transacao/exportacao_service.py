@@ -0,0 +1,135 @@
+"""Exportação das transações filtradas em CSV, NDJSON ou Parquet, em streaming.
+
+As linhas saem do cursor do banco em lotes de tamanho fixo (EXPORTACAO_TAMANHO_LOTE) e cada lote é
+convertido e entregue antes da leitura do próximo: a memória fica limitada ao lote, qualquer que
+seja o total exportado. No Parquet cada lote vira um RecordBatch do Arrow e um row group do arquivo;
+o rodapé (metadados) é enviado no fim. Datas saem em ISO 8601 nos três formatos.
+"""
+import csv
+import io
+import json
+import os
+from typing import Iterable, Iterator, List
+
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+TAMANHO_LOTE_EXPORTACAO = 10000
+
+# Colunas exportadas, na ordem de COLUNAS_LEITURA
+COLUNAS_EXPORTACAO = ["id", "data_vencimento", "descricao", "tipo_transacao", "valor", "pago", "data_pagamento",
+                      "pedido_id", "participant_id"]
+
+# formato: (mimetype, extensão do arquivo)
+FORMATOS_EXPORTACAO = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def tamanho_lote_exportacao(app) -> int:
+    return int(app.config.get("EXPORTACAO_TAMANHO_LOTE", os.getenv("EXPORTACAO_TAMANHO_LOTE",
+                                                                    TAMANHO_LOTE_EXPORTACAO)))
+
+
+def parquet_disponivel() -> bool:
+    return pyarrow is not None
+
+
+def _valores(linha: Row) -> list:
+    valores = list(linha)
+    valores[3] = valores[3].value
+    return valores
+
+
+def exportar_csv(lotes: Iterable[List[Row]]) -> Iterator[bytes]:
+    """Cabeçalho e um bloco de texto CSV por lote."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    escritor.writerow(COLUNAS_EXPORTACAO)
+    for lote in lotes:
+        for linha in lote:
+            valores = _valores(linha)
+            # Booleanos como no JSON (true/false), e não na grafia do Python
+            valores[5] = "true" if valores[5] else "false"
+            escritor.writerow(valores)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Nenhum lote: apenas o cabeçalho
+        yield buffer.getvalue().encode()
+
+
+def _linha_json(linha: Row) -> bytes:
+    registro = dict(zip(COLUNAS_EXPORTACAO, _valores(linha)))
+    if orjson is not None:
+        return orjson.dumps(registro)
+    return json.dumps(registro, default=lambda d: d.isoformat(), ensure_ascii=False).encode()
+
+
+def exportar_ndjson(lotes: Iterable[List[Row]]) -> Iterator[bytes]:
+    """Um objeto JSON por linha; um bloco por lote."""
+    for lote in lotes:
+        yield b"\n".join(_linha_json(linha) for linha in lote) + b"\n"
+
+
+class _SaidaIncremental(io.RawIOBase):
+    """Destino do ParquetWriter que acumula os bytes escritos até serem retirados para a resposta."""
+
+    def __init__(self):
+        super().__init__()
+        self._partes: List[bytes] = []
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def retirar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes = []
+        return dados
+
+
+def _esquema_parquet():
+    return pyarrow.schema([
+        ("id", pyarrow.int64()), ("data_vencimento", pyarrow.date32()), ("descricao", pyarrow.string()),
+        ("tipo_transacao", pyarrow.string()), ("valor", pyarrow.float64()), ("pago", pyarrow.bool_()),
+        ("data_pagamento", pyarrow.date32()), ("pedido_id", pyarrow.int64()), ("participant_id", pyarrow.int64()),
+    ])
+
+
+def exportar_parquet(lotes: Iterable[List[Row]]) -> Iterator[bytes]:
+    """Um row group por lote (RecordBatch montado coluna a coluna); o rodapé sai ao final."""
+    esquema = _esquema_parquet()
+    saida = _SaidaIncremental()
+    escritor = pyarrow.parquet.ParquetWriter(saida, esquema, compression="zstd")
+    for lote in lotes:
+        colunas = list(zip(*(_valores(linha) for linha in lote)))
+        escritor.write_batch(pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(coluna, type=campo.type) for coluna, campo in zip(colunas, esquema)], schema=esquema))
+        yield saida.retirar()
+    escritor.close()
+    yield saida.retirar()
+
+
+EXPORTADORES = {"csv": exportar_csv, "ndjson": exportar_ndjson, "parquet": exportar_parquet}
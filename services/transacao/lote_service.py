@@ -0,0 +1,138 @@
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Set
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.exclusao_logica import OPCAO_INCLUIR_EXCLUIDAS
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.transacao_model import TransacaoModel
+from schemas.transacao.transacao_schema import TransacaoSchema
+from utils.logger import logger
+
+# Quantidade de itens gravados por transação de banco (commit) durante a ingestão em lote
+TAMANHO_CHUNK_LOTE = 1000
+
+
+def _resultado(indice: int, status: str, pedido_id=None, transacao_id=None, mensagem=None) -> Dict[str, Any]:
+    return {"indice": indice, "status": status, "id": transacao_id, "pedido_id": pedido_id, "mensagem": mensagem}
+
+
+def _mensagem_validacao(erro: ValidationError) -> str:
+    mensagens = []
+    for e in erro.errors():
+        campo = ".".join(str(p) for p in e["loc"])
+        mensagens.append(f"{campo}: {e['msg']}" if campo else e["msg"])
+    return "; ".join(mensagens)
+
+
+def _para_linha(transacao: TransacaoSchema) -> Dict[str, Any]:
+    """Converte o schema validado nos valores de coluna usados no INSERT em lote."""
+    return {
+        "descricao": transacao.descricao,
+        "tipo_transacao": TipoTransacao(transacao.tipo_transacao),
+        "valor": transacao.valor,
+        "pago": transacao.pago,
+        "data_inclusao": datetime.now(),
+        "data_pagamento": transacao.data_pagamento,
+        "data_vencimento": transacao.data_vencimento,
+        "pedido_id": transacao.pedido_id,
+        "participant_id": transacao.participant_id,
+    }
+
+
+def _chunks(itens: Iterable[Any], tamanho: int) -> Iterator[List[Any]]:
+    iterador = iter(itens)
+    while chunk := list(islice(iterador, tamanho)):
+        yield chunk
+
+
+def _pedidos_existentes(session: Session, pedido_ids: List[int]) -> Set[int]:
+    if not pedido_ids:
+        return set()
+    # Pedidos de transações excluídas logicamente continuam reservados até o expurgo
+    stmt = select(TransacaoModel.pedido_id).where(TransacaoModel.pedido_id.in_(pedido_ids))
+    return set(session.scalars(stmt, execution_options={OPCAO_INCLUIR_EXCLUIDAS: True}))
+
+
+def _inserir_chunk(session: Session, pendentes: List[tuple]) -> List[Dict[str, Any]]:
+    """Insere o chunk com um único INSERT em lote (executemany) e confirma a transação.
+
+    Se outro processo gravar o mesmo pedido_id no intervalo entre a verificação e o INSERT,
+    o chunk é refeito item a item com savepoints para isolar apenas os conflitos.
+    """
+    linhas = [linha for _, linha in pendentes]
+    try:
+        stmt = insert(TransacaoModel).returning(TransacaoModel.id, sort_by_parameter_order=True)
+        ids = list(session.scalars(stmt, linhas))
+        session.commit()
+        return [_resultado(indice, "criada", linha["pedido_id"], transacao_id)
+                for (indice, linha), transacao_id in zip(pendentes, ids)]
+    except IntegrityError:
+        session.rollback()
+        logger.warning("Conflito de integridade no INSERT em lote; refazendo chunk item a item")
+
+    resultados = []
+    for indice, linha in pendentes:
+        try:
+            with session.begin_nested():
+                transacao_id = session.scalar(insert(TransacaoModel).returning(TransacaoModel.id), linha)
+            resultados.append(_resultado(indice, "criada", linha["pedido_id"], transacao_id))
+        except IntegrityError:
+            resultados.append(_resultado(indice, "conflito", linha["pedido_id"],
+                                         mensagem="pedido_id já vinculado a outra transação"))
+    session.commit()
+    return resultados
+
+
+def ingerir_lote(session: Session, itens: Iterable[Any],
+                 tamanho_chunk: int = TAMANHO_CHUNK_LOTE) -> Dict[str, Any]:
+    """Valida e grava transações em lote, em chunks com um commit cada.
+
+    Itens inválidos ou com pedido_id já existente (no banco ou repetido no próprio lote) são
+    reportados individualmente sem interromper a gravação dos demais.
+    """
+    resultados: List[Dict[str, Any]] = []
+    pedidos_no_lote: Set[int] = set()
+
+    for chunk in _chunks(enumerate(itens), tamanho_chunk):
+        validos = []
+        for indice, item in chunk:
+            try:
+                transacao = TransacaoSchema.model_validate(item)
+            except ValidationError as e:
+                resultados.append(_resultado(indice, "invalida", mensagem=_mensagem_validacao(e)))
+                continue
+            if transacao.pedido_id is not None:
+                if transacao.pedido_id in pedidos_no_lote:
+                    resultados.append(_resultado(indice, "conflito", transacao.pedido_id,
+                                                 mensagem="pedido_id repetido no lote"))
+                    continue
+                pedidos_no_lote.add(transacao.pedido_id)
+            validos.append((indice, _para_linha(transacao)))
+
+        existentes = _pedidos_existentes(session, [linha["pedido_id"] for _, linha in validos
+                                                   if linha["pedido_id"] is not None])
+        pendentes = []
+        for indice, linha in validos:
+            if linha["pedido_id"] in existentes:
+                resultados.append(_resultado(indice, "conflito", linha["pedido_id"],
+                                             mensagem="pedido_id já vinculado a outra transação"))
+            else:
+                pendentes.append((indice, linha))
+
+        if pendentes:
+            resultados.extend(_inserir_chunk(session, pendentes))
+        logger.debug("Lote de transações: %s itens processados", len(resultados))
+
+    resultados.sort(key=lambda r: r["indice"])
+    return {
+        "total": len(resultados),
+        "criadas": sum(1 for r in resultados if r["status"] == "criada"),
+        "conflitos": sum(1 for r in resultados if r["status"] == "conflito"),
+        "invalidas": sum(1 for r in resultados if r["status"] == "invalida"),
+        "resultados": resultados,
+    }
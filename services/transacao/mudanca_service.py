@@ -0,0 +1,40 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.engine import Engine
+
+from repositories.transacao.mudanca_repository import expurgar_mudancas
+from utils.logger import logger
+
+# Padrões do feed de mudanças (ver README, seção "Feed de mudanças")
+RETENCAO_PADRAO_DIAS = 30
+INTERVALO_SSE_MS = 1000
+DURACAO_MAXIMA_SSE_SEGUNDOS = 300
+# Comentário enviado no stream SSE sem mudanças, para proxies não encerrarem a conexão ociosa
+INTERVALO_HEARTBEAT_SEGUNDOS = 15
+
+
+def retencao_mudancas(app) -> timedelta:
+    dias = float(app.config.get("MUDANCAS_RETENCAO_DIAS", os.getenv("MUDANCAS_RETENCAO_DIAS", RETENCAO_PADRAO_DIAS)))
+    return timedelta(days=dias)
+
+
+def intervalo_sse(app) -> float:
+    return float(app.config.get("MUDANCAS_SSE_INTERVALO_MS", os.getenv("MUDANCAS_SSE_INTERVALO_MS",
+                                                                        INTERVALO_SSE_MS))) / 1000
+
+
+def duracao_maxima_sse(app) -> float:
+    return float(app.config.get("MUDANCAS_SSE_DURACAO_MAXIMA_SEGUNDOS",
+                                os.getenv("MUDANCAS_SSE_DURACAO_MAXIMA_SEGUNDOS", DURACAO_MAXIMA_SSE_SEGUNDOS)))
+
+
+def expurgar_mudancas_antigas(engine: Engine, retencao: timedelta) -> int:
+    """Remove do feed as mudanças mais antigas que a retenção; consumidores com cursor anterior recebem 410."""
+    # data_mudanca é gravada em UTC pelos triggers
+    limite = datetime.now(timezone.utc).replace(tzinfo=None) - retencao
+    with engine.begin() as conn:
+        total = expurgar_mudancas(conn, limite)
+    if total:
+        logger.info("Feed de mudanças: %s registro(s) expurgado(s)", total)
+    return total
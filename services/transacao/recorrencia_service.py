@@ -0,0 +1,177 @@
+"""Recorrências e parcelamentos de transações.
+
+Uma recorrência com quantidade (inclusive todo parcelamento) é materializada na criação: as N
+ocorrências entram em um único INSERT em lote, na mesma transação de banco da regra. Sem quantidade
+a regra não tem fim e nada é gravado além dela: as ocorrências de um período são calculadas na
+leitura e combinadas com as já materializadas (por POST .../ocorrencias/<numero>, para pagar ou
+editar uma ocorrência futura).
+
+Datas: a n-ésima ocorrência é calculada a partir do primeiro vencimento, e não da anterior, de modo
+que um vencimento no dia 31 cai no último dia dos meses mais curtos e volta ao dia 31 depois.
+Valores: o parcelamento é dividido em centavos inteiros; os centavos restantes vão para as primeiras
+parcelas, e a soma das parcelas é exatamente o total.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from model.transacao.recorrencia_model import RecorrenciaModel
+from repositories.transacao.recorrencia_repository import inserir_ocorrencias, ocorrencias_materializadas
+from schemas.transacao.recorrencia_schema import RecorrenciaSchema
+
+# Período padrão da leitura de ocorrências
+PERIODO_PADRAO = timedelta(days=365)
+
+
+class OcorrenciaInexistenteError(ValueError):
+    """O número pedido está fora da recorrência (menor que 1 ou além da quantidade)."""
+
+
+def dividir_valor(total: float, quantidade: int) -> List[float]:
+    """Divide o total em parcelas de centavos inteiros que somam exatamente o total."""
+    centavos = int((Decimal(str(total)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+    base, resto = divmod(centavos, quantidade)
+    return [float(Decimal(base + (1 if indice < resto else 0)) / 100) for indice in range(quantidade)]
+
+
+def _somar_meses(inicio: date, meses: int) -> date:
+    total = inicio.month - 1 + meses
+    ano, mes = inicio.year + total // 12, total % 12 + 1
+    return date(ano, mes, min(inicio.day, calendar.monthrange(ano, mes)[1]))
+
+
+def data_ocorrencia(recorrencia: RecorrenciaModel, numero: int) -> date:
+    """Vencimento da ocorrência número (a partir de 1)."""
+    passos = (numero - 1) * recorrencia.intervalo
+    if recorrencia.regra == "diaria":
+        return recorrencia.data_inicio + timedelta(days=passos)
+    if recorrencia.regra == "semanal":
+        return recorrencia.data_inicio + timedelta(weeks=passos)
+    if recorrencia.regra == "mensal":
+        return _somar_meses(recorrencia.data_inicio, passos)
+    return _somar_meses(recorrencia.data_inicio, 12 * passos)
+
+
+def _primeiro_numero(recorrencia: RecorrenciaModel, inicio: date) -> int:
+    """Número de uma ocorrência com vencimento não posterior a inicio (ou 1), sem percorrer as anteriores."""
+    if inicio <= recorrencia.data_inicio:
+        return 1
+    if recorrencia.regra in ("diaria", "semanal"):
+        dias_por_passo = recorrencia.intervalo * (1 if recorrencia.regra == "diaria" else 7)
+        return (inicio - recorrencia.data_inicio).days // dias_por_passo + 1
+    meses = (inicio.year - recorrencia.data_inicio.year) * 12 + inicio.month - recorrencia.data_inicio.month
+    meses_por_passo = recorrencia.intervalo * (1 if recorrencia.regra == "mensal" else 12)
+    # Um passo a menos: o dia do mês da ocorrência pode ser posterior ao de inicio
+    return max(1, meses // meses_por_passo)
+
+
+def _valores_ocorrencias(recorrencia: RecorrenciaModel) -> Optional[List[float]]:
+    if recorrencia.parcelado:
+        return dividir_valor(recorrencia.valor, recorrencia.quantidade)
+    return None
+
+
+def valor_ocorrencia(recorrencia: RecorrenciaModel, numero: int) -> float:
+    valores = _valores_ocorrencias(recorrencia)
+    return valores[numero - 1] if valores else recorrencia.valor
+
+
+def descricao_ocorrencia(recorrencia: RecorrenciaModel, numero: int) -> str:
+    if recorrencia.parcelado:
+        return f"{recorrencia.descricao} ({numero}/{recorrencia.quantidade})"
+    return recorrencia.descricao
+
+
+def _linha_ocorrencia(recorrencia: RecorrenciaModel, numero: int, valor: float, agora: datetime) -> Dict[str, Any]:
+    return {
+        "descricao": descricao_ocorrencia(recorrencia, numero),
+        "tipo_transacao": recorrencia.tipo_transacao,
+        "valor": valor,
+        "pago": False,
+        "data_inclusao": agora,
+        "data_vencimento": data_ocorrencia(recorrencia, numero),
+        "participant_id": recorrencia.participant_id,
+        "recorrencia_id": recorrencia.id,
+        "parcela": numero,
+    }
+
+
+def criar_recorrencia(session: Session, dados: RecorrenciaSchema) -> Tuple[RecorrenciaModel, List[Dict[str, Any]]]:
+    """Grava a regra e, se houver quantidade, todas as ocorrências em um único INSERT. O commit fica a cargo do chamador."""
+    recorrencia = RecorrenciaModel(descricao=dados.descricao, tipo_transacao=dados.tipo_transacao,
+                                   valor=dados.valor, regra=dados.regra, data_inicio=dados.data_vencimento,
+                                   intervalo=dados.intervalo, quantidade=dados.quantidade,
+                                   parcelado=dados.parcelado, participant_id=dados.participant_id)
+    session.add(recorrencia)
+    session.flush()
+    if recorrencia.quantidade is None:
+        return recorrencia, []
+    agora = datetime.now()
+    valores = _valores_ocorrencias(recorrencia) or [recorrencia.valor] * recorrencia.quantidade
+    linhas = [_linha_ocorrencia(recorrencia, numero, valor, agora) for numero, valor in enumerate(valores, start=1)]
+    return recorrencia, inserir_ocorrencias(session, linhas)
+
+
+def _numeros_no_periodo(recorrencia: RecorrenciaModel, inicio: date, fim: date) -> Iterator[Tuple[int, date]]:
+    numero = _primeiro_numero(recorrencia, inicio)
+    while recorrencia.quantidade is None or numero <= recorrencia.quantidade:
+        vencimento = data_ocorrencia(recorrencia, numero)
+        if vencimento > fim:
+            return
+        if vencimento >= inicio:
+            yield numero, vencimento
+        numero += 1
+
+
+def listar_ocorrencias(session: Session, recorrencia: RecorrenciaModel, inicio: Optional[date], fim: Optional[date],
+                       limite: int) -> Tuple[List[Dict[str, Any]], Optional[date]]:
+    """Ocorrências com vencimento (pela regra) no período, materializadas ou não, e o início da próxima página.
+
+    As materializadas trazem o estado atual da transação (valor, vencimento e pagamento podem ter sido
+    editados); as excluídas não aparecem.
+    """
+    inicio = inicio or recorrencia.data_inicio
+    fim = fim or inicio + PERIODO_PADRAO
+    previstas = []
+    proxima_data_inicio = None
+    for numero, vencimento in _numeros_no_periodo(recorrencia, inicio, fim):
+        if len(previstas) == limite:
+            proxima_data_inicio = vencimento
+            break
+        previstas.append((numero, vencimento))
+    materializadas = ocorrencias_materializadas(session, recorrencia.id, [numero for numero, _ in previstas])
+
+    ocorrencias = []
+    for numero, vencimento in previstas:
+        if numero in materializadas:
+            transacao = materializadas[numero]
+            if transacao is None:
+                # Ocorrência materializada e depois excluída
+                continue
+            ocorrencias.append({"numero": numero, "data_vencimento": transacao.data_vencimento,
+                                "descricao": transacao.descricao, "valor": transacao.valor, "pago": transacao.pago,
+                                "materializada": True, "transacao_id": transacao.id})
+        else:
+            ocorrencias.append({"numero": numero, "data_vencimento": vencimento,
+                                "descricao": descricao_ocorrencia(recorrencia, numero),
+                                "valor": valor_ocorrencia(recorrencia, numero), "pago": False,
+                                "materializada": False, "transacao_id": None})
+    return ocorrencias, proxima_data_inicio
+
+
+def materializar_ocorrencia(session: Session, recorrencia: RecorrenciaModel, numero: int) -> Tuple[Optional[int], bool]:
+    """Cria a transação da ocorrência, se ainda não existir. Retorna (id da transação, criada).
+
+    O id é None se a ocorrência já foi materializada e excluída. O commit fica a cargo do chamador.
+    """
+    if numero < 1 or (recorrencia.quantidade is not None and numero > recorrencia.quantidade):
+        raise OcorrenciaInexistenteError("Ocorrência fora da recorrência")
+    existentes = ocorrencias_materializadas(session, recorrencia.id, [numero])
+    if numero in existentes:
+        transacao = existentes[numero]
+        return (transacao.id if transacao is not None else None), False
+    linha = _linha_ocorrencia(recorrencia, numero, valor_ocorrencia(recorrencia, numero), datetime.now())
+    return inserir_ocorrencias(session, [linha])[0]["id"], True
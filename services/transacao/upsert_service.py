@@ -0,0 +1,216 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Boolean, bindparam, case, delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database.exclusao_logica import OPCAO_INCLUIR_EXCLUIDAS
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.idempotencia_model import ChaveIdempotenciaModel
+from model.transacao.transacao_model import TransacaoModel
+from schemas.transacao.transacao_schema import TransacaoAtualizacaoSchema, EventoPedidoSchema
+from utils.logger import logger
+
+# Chaves de idempotência mais antigas que a retenção são expurgadas (ver README, seção "Exclusão de transações")
+RETENCAO_IDEMPOTENCIA_DIAS = 30
+
+# Campos exigidos apenas para criar a transação do pedido
+_CAMPOS_CRIACAO = ("descricao", "tipo_transacao", "valor")
+
+# Dialetos com suporte a INSERT ... ON CONFLICT
+_INSERTS_ON_CONFLICT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class UpsertInvalidoError(ValueError):
+    """Dados insuficientes para criar a transação no upsert."""
+
+
+def _insert_on_conflict(session: Session, tabela):
+    dialeto = session.get_bind().dialect.name
+    if dialeto not in _INSERTS_ON_CONFLICT:
+        raise NotImplementedError(f"Upsert não suportado para o dialeto {dialeto}")
+    return _INSERTS_ON_CONFLICT[dialeto](tabela)
+
+
+def _stmt_upsert(session: Session):
+    """INSERT ... ON CONFLICT(pedido_id) DO UPDATE sobre o índice único ix_transacao_pedido_id.
+
+    Na atualização, descrição, tipo e valor são sobrescritos; campos opcionais não informados
+    (None) preservam o valor atual. pago só é alterado quando informado e pago=false limpa
+    data_pagamento, mantendo a mesma regra do PUT por pedido. Uma transação do pedido excluída
+    logicamente (ainda não expurgada) é restaurada.
+    """
+    stmt = _insert_on_conflict(session, TransacaoModel.__table__)
+    tabela = TransacaoModel.__table__.c
+    pago_informado = bindparam("pago_informado", type_=Boolean)
+    return stmt.on_conflict_do_update(
+        index_elements=[tabela.pedido_id],
+        set_={
+            "descricao": stmt.excluded.descricao,
+            "tipo_transacao": stmt.excluded.tipo_transacao,
+            "valor": stmt.excluded.valor,
+            "data_vencimento": func.coalesce(stmt.excluded.data_vencimento, tabela.data_vencimento),
+            "pago": case((pago_informado, stmt.excluded.pago), else_=tabela.pago),
+            "data_pagamento": case(
+                (pago_informado & (stmt.excluded.pago == False), None),  # noqa: E712
+                else_=func.coalesce(stmt.excluded.data_pagamento, tabela.data_pagamento)),
+            "data_exclusao": None,
+        },
+    )
+
+
+def validar_upsert(dados: TransacaoAtualizacaoSchema) -> None:
+    """Garante os campos necessários para criar a transação caso o pedido ainda não tenha uma."""
+    if any(getattr(dados, campo) is None for campo in _CAMPOS_CRIACAO):
+        raise UpsertInvalidoError("descricao, tipo_transacao e valor são obrigatórios para criar a transação")
+
+
+def _completar_com_atual(session: Session, pedido_id: int,
+                         dados: TransacaoAtualizacaoSchema) -> TransacaoAtualizacaoSchema:
+    """Preenche descricao, tipo_transacao e valor não informados com os da transação atual do pedido.
+
+    Esses campos só são obrigatórios na criação: para um pedido que já tem transação (inclusive
+    excluída logicamente) o upsert altera apenas o que foi enviado.
+    """
+    faltantes = [campo for campo in _CAMPOS_CRIACAO if getattr(dados, campo) is None]
+    if not faltantes:
+        return dados
+    atual = session.execute(select(TransacaoModel.descricao, TransacaoModel.tipo_transacao, TransacaoModel.valor)
+                            .where(TransacaoModel.pedido_id == pedido_id),
+                            execution_options={OPCAO_INCLUIR_EXCLUIDAS: True}).first()
+    if atual is None:
+        # Pedido sem transação: a criação exige os campos
+        validar_upsert(dados)
+    return dados.model_copy(update={campo: getattr(atual, campo) for campo in faltantes})
+
+
+def _parametros_upsert(pedido_id: int, dados: TransacaoAtualizacaoSchema) -> Dict[str, Any]:
+    validar_upsert(dados)
+    return {
+        "descricao": dados.descricao,
+        "tipo_transacao": TipoTransacao(dados.tipo_transacao),
+        "valor": dados.valor,
+        "data_inclusao": datetime.now(),
+        "pago": bool(dados.pago),
+        "pago_informado": dados.pago is not None,
+        "data_pagamento": None if dados.pago is False else dados.data_pagamento,
+        "data_vencimento": dados.data_vencimento,
+        "pedido_id": pedido_id,
+        "participant_id": None,
+    }
+
+
+def registrar_chave_idempotencia(session: Session, chave: str, pedido_id: int) -> bool:
+    """Grava a chave de idempotência do pedido; retorna False se ela já havia sido processada (replay)."""
+    stmt = _insert_on_conflict(session, ChaveIdempotenciaModel.__table__).on_conflict_do_nothing()
+    resultado = session.execute(stmt.returning(ChaveIdempotenciaModel.chave),
+                                {"chave": chave, "pedido_id": pedido_id, "data_inclusao": datetime.now()})
+    return resultado.first() is not None
+
+
+def atualizar_campos(transacao: TransacaoModel, dados: TransacaoAtualizacaoSchema) -> None:
+    """Aplica à transação apenas os campos informados (não None); pago=false limpa data_pagamento."""
+    if dados.descricao is not None:
+        transacao.descricao = dados.descricao
+    if dados.tipo_transacao is not None:
+        transacao.tipo_transacao = TipoTransacao(dados.tipo_transacao)
+    if dados.valor is not None:
+        transacao.valor = dados.valor
+    if dados.data_vencimento is not None:
+        transacao.data_vencimento = dados.data_vencimento
+    if dados.pago is not None:
+        transacao.pago = dados.pago
+        # Se marcar como não pago, limpa data_pagamento
+        if dados.pago is False:
+            transacao.data_pagamento = None
+    if dados.data_pagamento is not None:
+        transacao.data_pagamento = dados.data_pagamento
+
+
+def upsert_por_pedido(session: Session, pedido_id: int, dados: TransacaoAtualizacaoSchema,
+                      chave_idempotencia: Optional[str] = None) -> Tuple[Optional[int], bool]:
+    """Cria ou atualiza a transação do pedido com um único INSERT ... ON CONFLICT.
+
+    descricao, tipo_transacao e valor só são exigidos quando o pedido ainda não tem transação.
+    Retorna o id da transação (None em replay) e se a chamada foi um replay de chave já processada.
+    O commit fica a cargo do chamador.
+    """
+    if chave_idempotencia and not registrar_chave_idempotencia(session, chave_idempotencia, pedido_id):
+        return None, True
+    parametros = _parametros_upsert(pedido_id, _completar_com_atual(session, pedido_id, dados))
+    transacao_id = session.scalar(_stmt_upsert(session).returning(TransacaoModel.__table__.c.pk_transacao),
+                                  parametros)
+    return transacao_id, False
+
+
+def upsert_eventos(session: Session, eventos: List[EventoPedidoSchema]) -> Dict[str, Any]:
+    """Aplica um lote de eventos de Pedidos com um executemany do upsert.
+
+    Eventos cuja chave de idempotência já foi processada são ignorados; havendo mais de um evento
+    para o mesmo pedido_id no lote, prevalece o último (last-write-wins). O commit fica a cargo do chamador.
+    """
+    chaves = {(e.pedido_id, e.chave_idempotencia) for e in eventos if e.chave_idempotencia}
+    processadas = set()
+    if chaves:
+        processadas = set(session.execute(
+            select(ChaveIdempotenciaModel.pedido_id, ChaveIdempotenciaModel.chave)
+            .where(tuple_(ChaveIdempotenciaModel.pedido_id, ChaveIdempotenciaModel.chave).in_(chaves))).tuples())
+
+    status_por_indice = {}
+    ultimo_por_pedido: Dict[int, int] = {}
+    novas_chaves = set()
+    for indice, evento in enumerate(eventos):
+        chave = (evento.pedido_id, evento.chave_idempotencia)
+        if evento.chave_idempotencia and (chave in processadas or chave in novas_chaves):
+            status_por_indice[indice] = "repetido"
+            continue
+        status_por_indice[indice] = "aplicado"
+        ultimo_por_pedido[evento.pedido_id] = indice
+        if evento.chave_idempotencia:
+            novas_chaves.add(chave)
+
+    if novas_chaves:
+        stmt = _insert_on_conflict(session, ChaveIdempotenciaModel.__table__).on_conflict_do_nothing()
+        agora = datetime.now()
+        session.execute(stmt, [{"chave": chave, "pedido_id": pedido_id, "data_inclusao": agora}
+                               for pedido_id, chave in novas_chaves])
+    if ultimo_por_pedido:
+        session.execute(_stmt_upsert(session),
+                        [_parametros_upsert(eventos[i].pedido_id, eventos[i]) for i in ultimo_por_pedido.values()])
+
+    ids_por_pedido = dict(session.execute(
+        select(TransacaoModel.pedido_id, TransacaoModel.id)
+        .where(TransacaoModel.pedido_id.in_({e.pedido_id for e in eventos}))).all())
+    resultados = [{"pedido_id": evento.pedido_id, "id": ids_por_pedido.get(evento.pedido_id),
+                   "status": status_por_indice[indice]} for indice, evento in enumerate(eventos)]
+    return {
+        "total": len(resultados),
+        "aplicados": sum(1 for r in resultados if r["status"] == "aplicado"),
+        "repetidos": sum(1 for r in resultados if r["status"] == "repetido"),
+        "resultados": resultados,
+    }
+
+
+def retencao_idempotencia(app) -> timedelta:
+    dias = float(app.config.get("IDEMPOTENCIA_RETENCAO_DIAS",
+                                os.getenv("IDEMPOTENCIA_RETENCAO_DIAS", RETENCAO_IDEMPOTENCIA_DIAS)))
+    return timedelta(days=dias)
+
+
+def expurgar_chaves_idempotencia(engine: Engine,
+                                 retencao: timedelta = timedelta(days=RETENCAO_IDEMPOTENCIA_DIAS)) -> int:
+    """Remove as chaves de idempotência gravadas há mais que a retenção e retorna quantas foram removidas.
+
+    Um reenvio do mesmo evento depois da retenção volta a ser aplicado (o upsert é idempotente quanto
+    ao estado final, apenas deixa de responder como replay).
+    """
+    limite = datetime.now() - retencao
+    with engine.begin() as conn:
+        total = conn.execute(delete(ChaveIdempotenciaModel)
+                             .where(ChaveIdempotenciaModel.data_inclusao <= limite)).rowcount
+    if total:
+        logger.info("Expurgo: %s chave(s) de idempotência removida(s)", total)
+    return total
@@ -0,0 +1,31 @@
+"""Fixtures compartilhadas pelos testes.
+
+init_banco cria um único engine por processo: todos os testes usam a mesma aplicação, sobre um banco
+SQLite temporário, e cada teste cria os próprios dados.
+"""
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp("banco") / "testes.sqlite3"
+    return create_app({"DATABASE_URL": f"sqlite:///{caminho}", "CONFIGURAR_LOGGING": False,
+                       "LOG_REQUISICOES": "0", "EXPOR_CONTAGEM_SQL": "1"})
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def criar_transacoes(client):
+    """Cria transações via POST /transacoes/lote e retorna os ids, na ordem informada."""
+    def criar(itens):
+        resposta = client.post("/transacoes/lote", json=itens)
+        assert resposta.status_code == 200, resposta.json
+        return [resultado["id"] for resultado in resposta.json["resultados"]]
+
+    return criar
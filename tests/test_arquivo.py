@@ -0,0 +1,36 @@
+"""Arquivo frio: ids de transações arquivadas não são reutilizados por novas inclusões."""
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, delete, insert
+
+from database.connection import preparar_esquema
+from model.transacao.enums.tipo_transacao_model import TipoTransacao
+from model.transacao.transacao_model import TransacaoModel
+from services.transacao.arquivo_service import arquivar_liquidadas
+
+
+def _inserir(conn, pago: bool, vencimento: date) -> int:
+    return conn.scalar(insert(TransacaoModel).returning(TransacaoModel.id),
+                       {"descricao": "Arquivo", "tipo_transacao": TipoTransacao.DESPESA, "valor": 1, "pago": pago,
+                        "data_pagamento": vencimento if pago else None, "data_vencimento": vencimento})
+
+
+def test_id_arquivado_nao_e_reutilizado(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'arquivo.sqlite3'}")
+    preparar_esquema(engine)
+    with engine.begin() as conn:
+        ids = [_inserir(conn, True, date(2019, 3, 10)), _inserir(conn, True, date(2019, 4, 10)),
+               _inserir(conn, False, date(2019, 5, 10))]
+
+    assert arquivar_liquidadas(engine, timedelta(days=365), hoje=date(2026, 1, 1)) == {2019: 2}
+    with engine.begin() as conn:
+        # transacao fica vazia: sem AUTOINCREMENT a próxima inclusão receberia o id 1, já arquivado
+        conn.execute(delete(TransacaoModel).where(TransacaoModel.id == ids[2]))
+        assert _inserir(conn, False, date(2026, 1, 10)) == ids[2] + 1
+
+        # A transação de maior id também pode ser arquivada
+        ultima = _inserir(conn, True, date(2019, 6, 10))
+    assert arquivar_liquidadas(engine, timedelta(days=365), hoje=date(2026, 1, 1)) == {2019: 1}
+    with engine.begin() as conn:
+        assert _inserir(conn, False, date(2026, 2, 10)) == ultima + 1
+    engine.dispose()
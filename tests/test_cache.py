@@ -0,0 +1,25 @@
+"""Cache de leitura por id/pedido_id: escritas de outro worker (sem invalidação local) não servem cópia antiga."""
+from sqlalchemy import update
+
+from database.connection import Session
+from model.transacao.transacao_model import TransacaoModel
+
+
+def test_escrita_sem_invalidacao_local_nao_serve_copia_antiga(client, criar_transacoes):
+    transacao_id, = criar_transacoes([{"descricao": "Cache", "tipo_transacao": "Despesa", "valor": 10,
+                                       "pedido_id": 90001}])
+    anterior = client.get(f"/transacao/{transacao_id}")
+    assert anterior.json["valor"] == 10
+    assert client.get("/transacoes/pedido/90001").json["valor"] == 10
+
+    # Como em outro worker: a versão das transações muda, mas o cache deste processo não é invalidado
+    with Session() as session:
+        session.execute(update(TransacaoModel).where(TransacaoModel.id == transacao_id).values(valor=20))
+        session.commit()
+    Session.remove()
+
+    atual = client.get(f"/transacao/{transacao_id}", headers={"If-None-Match": anterior.headers["ETag"]})
+    assert atual.status_code == 200
+    assert atual.json["valor"] == 20
+    assert atual.headers["ETag"] != anterior.headers["ETag"]
+    assert client.get("/transacoes/pedido/90001").json["valor"] == 20
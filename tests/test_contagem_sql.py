@@ -0,0 +1,27 @@
+"""Regressão de N+1: a listagem executa a mesma quantidade de SQL qualquer que seja o tamanho da página."""
+
+
+def _contagem_sql(client, url: str) -> int:
+    resposta = client.get(url)
+    assert resposta.status_code == 200
+    return int(resposta.headers["X-SQL-Count"])
+
+
+def test_listagem_com_contagem_sql_constante_entre_tamanhos_de_pagina(client, criar_transacoes):
+    ids = criar_transacoes([{"descricao": f"Conta {i}", "tipo_transacao": "Despesa", "valor": 10 + i}
+                            for i in range(600)])
+    for transacao_id in ids[::10]:
+        assert client.post(f"/transacao/{transacao_id}/observacoes",
+                           json={"textos": ["primeira", "segunda"]}).status_code == 200
+
+    pequena = _contagem_sql(client, "/transacoes?limite=10")
+    grande = _contagem_sql(client, "/transacoes?limite=500")
+
+    assert pequena == grande
+
+
+def test_contagem_sql_exposta_nos_headers(client):
+    resposta = client.get("/transacoes?limite=1")
+
+    assert int(resposta.headers["X-SQL-Count"]) > 0
+    assert float(resposta.headers["X-SQL-Time-ms"]) >= 0
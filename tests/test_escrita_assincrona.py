@@ -0,0 +1,73 @@
+"""Escritor assíncrono: reaplicação dos diários na inicialização e nova tentativa com o banco bloqueado."""
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from database.config import ConfiguracaoBanco
+from database.connection import Session, criar_engine, obter_engine, preparar_esquema
+from model.transacao.transacao_model import TransacaoModel
+from services.transacao.escrita_assincrona_service import APLICADA, CRIAR, PENDENTE, ConfiguracaoEscrita, \
+    DiarioEscritas, EscritorAssincrono, OperacaoEscrita
+
+# Acima do pid_max do Linux: o diário é de um processo encerrado
+PID_ENCERRADO = 99999999
+
+
+def test_diario_com_mais_escritas_que_a_capacidade_da_fila(app, tmp_path):
+    operacoes = [OperacaoEscrita(CRIAR, {"descricao": f"Diário {i}", "tipo_transacao": "Receita", "valor": i + 1,
+                                         "pedido_id": 80000 + i}) for i in range(5)]
+    orfao = tmp_path / f"{DiarioEscritas.PREFIXO}{PID_ENCERRADO}-0-000001.ndjson"
+    orfao.write_text("".join(operacao.para_json() + "\n" for operacao in operacoes), encoding="utf-8")
+
+    escritor = EscritorAssincrono(ConfiguracaoEscrita(intervalo=0.01, lote_maximo=2, capacidade=3,
+                                                      durabilidade="diario", diretorio_diario=str(tmp_path)))
+    inicio = threading.Thread(target=escritor.iniciar, daemon=True)
+    inicio.start()
+    inicio.join(timeout=30)
+    assert not inicio.is_alive(), "iniciar bloqueou com mais escritas recuperadas que a capacidade da fila"
+    escritor.parar()
+
+    assert not orfao.exists()
+    assert all(escritor.resultado(operacao.id)["status"] == APLICADA for operacao in operacoes)
+    with Session() as session:
+        assert session.scalar(select(func.count()).where(TransacaoModel.pedido_id.between(80000, 80004))) == 5
+
+
+def test_banco_bloqueado_repete_o_grupo_sem_confirmar_o_diario(app, tmp_path):
+    caminho = tmp_path / "bloqueado.sqlite3"
+    engine = criar_engine(ConfiguracaoBanco.from_env({"DATABASE_URL": f"sqlite:///{caminho}",
+                                                      "SQLITE_BUSY_TIMEOUT": "50"}))
+    preparar_esquema(engine)
+    Session.remove()
+    Session.configure(bind=engine)
+    bloqueio = sqlite3.connect(caminho, isolation_level=None)
+    escritor = EscritorAssincrono(ConfiguracaoEscrita(intervalo=0.01, durabilidade="diario",
+                                                      diretorio_diario=str(tmp_path / "diario")))
+    try:
+        escritor.iniciar()
+        # Lock de escrita mantido além do busy_timeout: o flush da escrita falha com database is locked
+        bloqueio.execute("BEGIN IMMEDIATE")
+        operacao = OperacaoEscrita(CRIAR, {"descricao": "Bloqueada", "tipo_transacao": "Receita", "valor": 1,
+                                           "pedido_id": 81000})
+        escritor.enfileirar(operacao)
+        time.sleep(0.5)
+        assert escritor.resultado(operacao.id)["status"] == PENDENTE
+        # A escrita continua pendente no diário (nenhuma marcação de confirmação)
+        with open(operacao.segmento.caminho, encoding="utf-8") as diario:
+            assert "confirmadas" not in diario.read() and operacao.segmento.pendentes == 1
+
+        bloqueio.execute("ROLLBACK")
+        fim = time.monotonic() + 10
+        while escritor.resultado(operacao.id)["status"] == PENDENTE and time.monotonic() < fim:
+            time.sleep(0.05)
+        assert escritor.resultado(operacao.id)["status"] == APLICADA
+        with Session() as session:
+            assert session.scalar(select(func.count()).where(TransacaoModel.pedido_id == 81000)) == 1
+    finally:
+        escritor.parar()
+        bloqueio.close()
+        Session.remove()
+        Session.configure(bind=obter_engine())
+        engine.dispose()
@@ -0,0 +1,13 @@
+"""Importar a aplicação não faz I/O (escrita em arquivo, diretórios, SQLite, sockets).
+
+O audit hook não pode ser removido depois de instalado: a verificação roda no subprocesso limpo de
+benchmarks.inicializacao_benchmark, e não no processo do pytest (que já importou a aplicação).
+"""
+from benchmarks.inicializacao_benchmark import medir
+
+
+def test_importacao_sem_io():
+    resultado = medir()
+    assert resultado["eventos_io_na_importacao"] == []
+    # create_app, executado depois da importação, continua funcionando no mesmo subprocesso
+    assert resultado["create_app_ms"] > 0
@@ -0,0 +1,32 @@
+"""Vazamento de conexões: depois de muitas requisições (inclusive com erro) nenhuma fica emprestada do pool."""
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import obter_engine
+from database.pool import estatisticas_pool
+
+
+def test_requisicoes_concorrentes_devolvem_todas_as_conexoes(app, criar_transacoes):
+    ids = criar_transacoes([{"descricao": f"Pool {i}", "tipo_transacao": "Receita", "valor": i + 1}
+                            for i in range(20)])
+    rotas = ["/transacoes?limite=5", f"/transacao/{ids[0]}", "/transacao/999999999", "/transacoes/resumo",
+             "/transacoes/pedido/999999999", "/transacoes/busca?termo=Pool", "/transacoes?limite=abc",
+             "/transacao/?descricao=Pool 1"]
+
+    def requisitar(indice: int) -> int:
+        client = app.test_client()
+        if indice % 10 == 0:
+            return client.put(f"/transacao/{ids[indice % len(ids)]}", json={"valor": indice}).status_code
+        if indice % 10 == 5:
+            # Criação e exclusão pela descrição
+            descricao = f"Pool temporária {indice}"
+            client.post("/transacao", json={"descricao": descricao, "tipo_transacao": "Receita", "valor": 1})
+            return client.delete("/transacao", query_string={"descricao": descricao}).status_code
+        return client.get(rotas[indice % len(rotas)]).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        status = list(executor.map(requisitar, range(400)))
+        # Com as threads ainda vivas: uma sessão esquecida em uma delas continuaria segurando a conexão
+        em_uso = estatisticas_pool(obter_engine().pool)["conexoes_em_uso"]
+
+    assert all(codigo < 500 for codigo in status)
+    assert em_uso == 0
@@ -0,0 +1,41 @@
+"""Ocorrências de recorrência excluídas não voltam como previstas nem são criadas de novo."""
+from datetime import timedelta
+
+from database.connection import Session, obter_engine
+from repositories.transacao.transacao_repository import excluir_transacoes, select_exclusao
+from services.transacao.exclusao_service import expurgar_excluidas
+
+
+def _criar_parcelamento(client, data_vencimento: str) -> dict:
+    resposta = client.post("/transacoes/recorrencias", json={
+        "descricao": "Notebook", "tipo_transacao": "Despesa", "valor": 300, "parcelado": True,
+        "regra": "mensal", "data_vencimento": data_vencimento, "quantidade": 3})
+    assert resposta.status_code == 201, resposta.json
+    return resposta.json
+
+
+def _numeros(client, recorrencia_id: int) -> list:
+    resposta = client.get(f"/transacoes/recorrencias/{recorrencia_id}/ocorrencias")
+    return [(o["numero"], o["materializada"]) for o in resposta.json["ocorrencias"]]
+
+
+def test_ocorrencia_removida_nao_volta_como_prevista(client):
+    criado = _criar_parcelamento(client, "2030-01-10")
+    recorrencia_id = criado["recorrencia"]["id"]
+    assert client.delete(f"/transacao/{criado['transacoes'][1]['id']}").status_code == 200
+
+    assert _numeros(client, recorrencia_id) == [(1, True), (3, True)]
+    assert client.post(f"/transacoes/recorrencias/{recorrencia_id}/ocorrencias/2").status_code == 409
+
+
+def test_ocorrencia_expurgada_nao_volta_como_prevista(client):
+    criado = _criar_parcelamento(client, "2031-01-10")
+    recorrencia_id = criado["recorrencia"]["id"]
+    with Session() as session:
+        excluir_transacoes(session, select_exclusao(ids=[criado["transacoes"][2]["id"]]), logica=True)
+        session.commit()
+    Session.remove()
+    assert expurgar_excluidas(obter_engine(), retencao=timedelta(0)) >= 1
+
+    assert _numeros(client, recorrencia_id) == [(1, True), (2, True)]
+    assert client.post(f"/transacoes/recorrencias/{recorrencia_id}/ocorrencias/3").status_code == 409
@@ -0,0 +1,40 @@
+"""Resumo pelo consolidado resumo_transacao: disponibilidade e pendentes vencidas do mês corrente."""
+from datetime import date
+
+from sqlalchemy import create_engine, text
+
+from database.connection import Session, obter_engine
+from database.consolidacao import criar_gatilhos_consolidacao
+from model.base.base_model import Base
+from repositories.transacao.resumo_repository import _consolidado_disponivel, resumir_transacoes
+from schemas.transacao.transacao_schema import ResumoFiltroSchema
+from services.transacao.consolidacao_service import reconstruir_consolidado
+
+
+def test_consolidado_instalado_depois_passa_a_ser_usado(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sem_consolidado.sqlite3'}")
+    Base.metadata.create_all(engine)
+    assert not _consolidado_disponivel(engine)
+
+    # Como "flask migracoes aplicar" com a aplicação já no ar
+    with engine.begin() as conn:
+        criar_gatilhos_consolidacao(conn, reconstruir_consolidado)
+
+    assert _consolidado_disponivel(engine)
+    engine.dispose()
+
+
+def test_vencida_do_mes_atual_sem_grupo_no_consolidado(app, criar_transacoes):
+    participante = 90901
+    criar_transacoes([{"descricao": "Conta vencida", "tipo_transacao": "Despesa", "valor": 80.0,
+                       "data_vencimento": "2026-05-10", "participante_id": participante}])
+    # Divergência do consolidado: o grupo da transação sumiu de resumo_transacao
+    with obter_engine().begin() as conn:
+        conn.execute(text("DELETE FROM resumo_transacao WHERE participant_id = :p"), {"p": participante})
+
+    with app.app_context():
+        resumo = resumir_transacoes(Session(), ResumoFiltroSchema(participant_id=participante),
+                                    hoje=date(2026, 5, 20))
+
+    assert resumo["fonte"] == "consolidado"
+    assert resumo["total"]["despesas_vencidas"] == 80.0
@@ -0,0 +1,124 @@
+"""Smoke tests do servidor de produção: gunicorn com gunicorn.conf.py (preload_app, post_fork, worker_exit).
+
+O servidor sobe em um subprocesso, com diretório de trabalho e banco temporários, e recebe requisições
+concorrentes de leitura e escrita; ao final é encerrado com SIGTERM e deve sair sem erro.
+"""
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.carga_servidor import RAIZ, _aguardar, _porta_livre
+from services.transacao.escrita_assincrona_service import CRIAR, DiarioEscritas, OperacaoEscrita, _dono
+
+
+@pytest.fixture
+def servidor_gunicorn(tmp_path):
+    """Inicia o gunicorn com as variáveis de ambiente informadas e retorna (porta, processo, caminho do log)."""
+    processos = []
+
+    def iniciar(**variaveis):
+        porta = _porta_livre()
+        ambiente = os.environ | {
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(RAIZ), os.environ.get("PYTHONPATH")])),
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'gunicorn.sqlite3'}",
+            "LOG_REQUISICOES": "0",
+        } | variaveis
+        log = tmp_path / "servidor.log"
+        with open(log, "w") as saida:
+            processo = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", str(RAIZ / "gunicorn.conf.py"),
+                 "--bind", f"127.0.0.1:{porta}", "--workers", "2", "--threads", "2"],
+                cwd=tmp_path, env=ambiente, stdout=saida, stderr=subprocess.STDOUT)
+        processos.append(processo)
+        _aguardar(porta, processo)
+        return porta, processo, log
+
+    yield iniciar
+    for processo in processos:
+        if processo.poll() is None:
+            processo.kill()
+            processo.wait()
+
+
+def _requisitar(porta: int, metodo: str, caminho: str, corpo=None):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    try:
+        conexao.request(metodo, caminho, body=json.dumps(corpo) if corpo is not None else None,
+                        headers={"Content-Type": "application/json"})
+        resposta = conexao.getresponse()
+        return resposta.status, json.loads(resposta.read() or b"null")
+    finally:
+        conexao.close()
+
+
+def encerrar(processo: subprocess.Popen) -> int:
+    """Encerra o gunicorn com SIGTERM (desligamento gracioso: worker_exit em cada worker) e retorna o código."""
+    processo.terminate()
+    return processo.wait(timeout=60)
+
+
+def test_requisicoes_sob_gunicorn(servidor_gunicorn):
+    porta, processo, log = servidor_gunicorn()
+    itens = [{"descricao": f"Gunicorn {i}", "tipo_transacao": "Despesa", "valor": i + 1, "pedido_id": 70000 + i}
+             for i in range(50)]
+    status, corpo = _requisitar(porta, "POST", "/transacoes/lote", itens)
+    assert status == 200, corpo
+    ids = [resultado["id"] for resultado in corpo["resultados"]]
+
+    def executar(indice: int) -> int:
+        if indice % 5 == 0:
+            return _requisitar(porta, "PUT", f"/transacao/{ids[indice % len(ids)]}", {"valor": indice + 0.5})[0]
+        rotas = ["/transacoes?limite=10", f"/transacao/{ids[indice % len(ids)]}", "/transacoes/resumo",
+                 f"/transacoes/pedido/{70000 + indice % len(ids)}"]
+        return _requisitar(porta, "GET", rotas[indice % len(rotas)])[0]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(executar, range(200))) == {200}
+    # Deixa a transação no cache dos dois workers; o PUT invalida apenas o do worker que o atender
+    for _ in range(10):
+        assert _requisitar(porta, "GET", f"/transacao/{ids[1]}")[0] == 200
+    assert _requisitar(porta, "PUT", f"/transacao/{ids[1]}", {"valor": 1.5})[0] == 200
+    for _ in range(10):
+        assert _requisitar(porta, "GET", f"/transacao/{ids[1]}")[1]["valor"] == 1.5
+
+    assert encerrar(processo) == 0
+    saida = log.read_text()
+    # post_fork descartou em cada worker o pool herdado do master (preload_app)
+    assert saida.count("pool de conexões reiniciado") == 2
+    assert "Traceback" not in saida
+
+
+def test_escrita_assincrona_sob_gunicorn_com_preload(servidor_gunicorn, tmp_path):
+    diario = tmp_path / "diario"
+    diario.mkdir()
+    # Diário de um processo encerrado com mais escritas que a capacidade da fila de cada worker
+    orfas = [OperacaoEscrita(CRIAR, {"descricao": f"Órfã {i}", "tipo_transacao": "Receita", "valor": 1,
+                                     "pedido_id": 71000 + i}) for i in range(5)]
+    (diario / f"{DiarioEscritas.PREFIXO}99999999-0-000001.ndjson").write_text(
+        "".join(operacao.para_json() + "\n" for operacao in orfas), encoding="utf-8")
+    porta, processo, log = servidor_gunicorn(ESCRITA_ASSINCRONA="1", ESCRITA_DURABILIDADE="diario",
+                                             ESCRITA_DIARIO_DIR=str(diario), ESCRITA_FILA_MAXIMA="3")
+
+    # Com preload_app o escritor só existe nos workers: nenhum diário pertence ao master
+    assert processo.pid not in {_dono(str(caminho)) for caminho in diario.iterdir()}
+    status, corpo = _requisitar(porta, "POST", "/transacao", {"descricao": "Assíncrona", "tipo_transacao": "Despesa",
+                                                              "valor": 9, "pedido_id": 71010})
+    assert status == 202, corpo
+
+    pedidos = [71000 + i for i in range(5)] + [71010]
+    fim = time.monotonic() + 30
+    while time.monotonic() < fim:
+        if all(_requisitar(porta, "GET", f"/transacoes/pedido/{pedido}")[0] == 200 for pedido in pedidos):
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail("Escritas recuperadas ou aceitas não foram gravadas")
+
+    assert encerrar(processo) == 0
+    assert "Traceback" not in log.read_text()
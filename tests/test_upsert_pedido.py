@@ -0,0 +1,65 @@
+"""Upsert por pedido (PUT /transacoes/pedido/{pedido_id}?upsert=true) e suas chaves de idempotência."""
+from datetime import timedelta
+
+from database.connection import obter_engine
+from services.transacao.upsert_service import expurgar_chaves_idempotencia
+
+EVENTO = {"descricao": "Pedido faturado", "tipo_transacao": "Despesa", "valor": 600.0}
+
+
+def _upsert(client, pedido_id: int, corpo: dict, chave: str = None):
+    headers = {"Idempotency-Key": chave} if chave else {}
+    return client.put(f"/transacoes/pedido/{pedido_id}?upsert=true", json=corpo, headers=headers)
+
+
+def test_upsert_parcial_atualiza_transacao_existente(client):
+    assert _upsert(client, 40001, EVENTO).status_code == 200
+
+    resposta = _upsert(client, 40001, {"valor": 750.0})
+
+    assert resposta.status_code == 200
+    assert resposta.json["valor"] == 750.0
+    assert resposta.json["descricao"] == EVENTO["descricao"]
+
+
+def test_upsert_parcial_sem_transacao_exige_campos_de_criacao(client):
+    resposta = _upsert(client, 40002, {"valor": 750.0})
+
+    assert resposta.status_code == 400
+
+
+def test_replay_de_transacao_excluida_responde_404(client):
+    criada = _upsert(client, 40003, EVENTO, chave="evento-40003")
+    assert client.delete(f"/transacao/{criada.json['id']}").status_code == 200
+
+    resposta = _upsert(client, 40003, EVENTO, chave="evento-40003")
+
+    assert resposta.status_code == 404
+
+
+def test_chave_de_idempotencia_vale_por_pedido(client):
+    assert _upsert(client, 40004, EVENTO, chave="faturado").headers["Idempotent-Replayed"] == "false"
+
+    repetido = _upsert(client, 40004, EVENTO, chave="faturado")
+    outro_pedido = _upsert(client, 40005, EVENTO, chave="faturado")
+
+    assert repetido.headers["Idempotent-Replayed"] == "true"
+    assert outro_pedido.headers["Idempotent-Replayed"] == "false"
+    assert outro_pedido.json["pedido_id"] == 40005
+
+
+def test_upsert_em_lote_respeita_chave_por_pedido(client):
+    eventos = [dict(EVENTO, pedido_id=40006, chave_idempotencia="lote"),
+               dict(EVENTO, pedido_id=40007, chave_idempotencia="lote")]
+    assert client.put("/transacoes/pedidos", json={"eventos": eventos}).json["aplicados"] == 2
+
+    resposta = client.put("/transacoes/pedidos", json={"eventos": eventos})
+
+    assert resposta.json["repetidos"] == 2
+
+
+def test_expurgo_remove_chaves_vencidas(client):
+    _upsert(client, 40008, EVENTO, chave="expira")
+
+    assert expurgar_chaves_idempotencia(obter_engine(), timedelta(0)) >= 1
+    assert _upsert(client, 40008, EVENTO, chave="expira").headers["Idempotent-Replayed"] == "false"
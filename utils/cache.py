@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+from utils.logger import logger
+
+
+@dataclass
+class EstatisticasCache:
+    acertos: int = 0
+    falhas: int = 0
+    remocoes_por_tamanho: int = 0
+    expiracoes: int = 0
+    invalidacoes: int = 0
+
+
+class CacheLRU:
+    """Cache em processo com política LRU, limite de itens e TTL por item.
+
+    Thread-safe; os valores expirados são descartados na leitura (expiração preguiçosa).
+    """
+
+    def __init__(self, tamanho_maximo: int = 10000, ttl: float = 300.0):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._estatisticas = EstatisticasCache()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self._estatisticas.falhas += 1
+                return None
+            valor, expira_em = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                self._estatisticas.expiracoes += 1
+                self._estatisticas.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self._estatisticas.acertos += 1
+            return valor
+
+    def definir(self, chave: str, valor: Any) -> None:
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+                self._estatisticas.remocoes_por_tamanho += 1
+
+    def invalidar(self, *chaves: str) -> None:
+        with self._lock:
+            for chave in chaves:
+                if self._itens.pop(chave, None) is not None:
+                    self._estatisticas.invalidacoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return asdict(self._estatisticas) | {"backend": "memoria", "itens": len(self._itens),
+                                                 "tamanho_maximo": self.tamanho_maximo, "ttl": self.ttl}
+
+
+class CacheRedis:
+    """Cache sobre um cliente compatível com Redis (get/set com ex/delete), compartilhado entre workers.
+
+    Qualquer objeto com essa interface serve como substituto local (ex.: fakeredis em desenvolvimento).
+    Tamanho e remoção ficam a cargo do servidor (maxmemory-policy); os contadores são do processo.
+    """
+
+    def __init__(self, cliente, ttl: float = 300.0, prefixo: str = "econome:transacoes:"):
+        self.cliente = cliente
+        self.ttl = ttl
+        self.prefixo = prefixo
+        self._lock = threading.Lock()
+        self._estatisticas = EstatisticasCache()
+
+    def _contar(self, campo: str, quantidade: int = 1) -> None:
+        with self._lock:
+            setattr(self._estatisticas, campo, getattr(self._estatisticas, campo) + quantidade)
+
+    def obter(self, chave: str) -> Optional[Any]:
+        try:
+            valor = self.cliente.get(self.prefixo + chave)
+        except Exception as e:
+            logger.warning("Falha ao ler do cache Redis: %s", e)
+            valor = None
+        self._contar("acertos" if valor is not None else "falhas")
+        if isinstance(valor, bytes):
+            return valor.decode()
+        return valor
+
+    def definir(self, chave: str, valor: Any) -> None:
+        try:
+            self.cliente.set(self.prefixo + chave, valor, ex=int(self.ttl))
+        except Exception as e:
+            logger.warning("Falha ao gravar no cache Redis: %s", e)
+
+    def invalidar(self, *chaves: str) -> None:
+        if not chaves:
+            return
+        try:
+            self._contar("invalidacoes", self.cliente.delete(*(self.prefixo + chave for chave in chaves)) or 0)
+        except Exception as e:
+            logger.warning("Falha ao invalidar o cache Redis: %s", e)
+
+    def limpar(self) -> None:
+        for chave in self.cliente.scan_iter(match=self.prefixo + "*"):
+            self.cliente.delete(chave)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return asdict(self._estatisticas) | {"backend": "redis", "ttl": self.ttl}
+
+
+class CacheDesligado:
+    """Backend nulo: nunca armazena, mantendo apenas a contagem de falhas."""
+
+    def __init__(self):
+        self._estatisticas = EstatisticasCache()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        self._estatisticas.falhas += 1
+        return None
+
+    def definir(self, chave: str, valor: Any) -> None:
+        pass
+
+    def invalidar(self, *chaves: str) -> None:
+        pass
+
+    def limpar(self) -> None:
+        pass
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return asdict(self._estatisticas) | {"backend": "desligado"}
+
+
+def criar_cache(app):
+    """Cria o backend de cache conforme CACHE_BACKEND (memoria, redis ou desligado) da configuração do app.
+
+    Cada variável vem de app.config e, na falta, do ambiente. O backend redis exige o pacote opcional
+    redis e CACHE_REDIS_URL; sem eles, usa memória.
+    """
+    def ler(nome, padrao):
+        return app.config.get(nome, os.getenv(nome, padrao))
+
+    backend = str(ler("CACHE_BACKEND", "memoria"))
+    ttl = float(ler("CACHE_TTL", 300))
+    if backend == "desligado":
+        return CacheDesligado()
+    if backend == "redis":
+        try:
+            import redis
+            return CacheRedis(redis.Redis.from_url(str(ler("CACHE_REDIS_URL", "redis://localhost:6379/0"))), ttl)
+        except ImportError:
+            logger.warning("Pacote redis não instalado; usando cache em memória")
+    return CacheLRU(int(ler("CACHE_TAMANHO_MAXIMO", 10000)), ttl)
@@ -0,0 +1,102 @@
+"""Compressão gzip/brotli das respostas, negociada pelo header Accept-Encoding.
+
+Respostas comuns são comprimidas de uma vez quando passam do tamanho mínimo; respostas em streaming
+(NDJSON) são comprimidas incrementalmente, sem acumular o corpo em memória. Brotli depende do pacote
+opcional brotli; sem ele apenas gzip é oferecido.
+"""
+import os
+import zlib
+from typing import Iterable, Iterator
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TIPOS_COMPRIMIVEIS = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"}
+
+
+class _CompressorGzip:
+    def __init__(self, nivel: int):
+        # wbits 31: formato gzip (cabeçalho e CRC) em vez de zlib puro
+        self._compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        return self._compressor.compress(dados)
+
+    def finalizar(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _CompressorBrotli:
+    def __init__(self, nivel: int):
+        self._compressor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        return self._compressor.process(dados)
+
+    def finalizar(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _comprimir_stream(partes: Iterable, compressor) -> Iterator[bytes]:
+    try:
+        for parte in partes:
+            if isinstance(parte, str):
+                parte = parte.encode()
+            comprimido = compressor.comprimir(parte)
+            if comprimido:
+                yield comprimido
+        yield compressor.finalizar()
+    finally:
+        # Repassa o fechamento ao iterável original (encerra a sessão/contexto do gerador)
+        if hasattr(partes, "close"):
+            partes.close()
+
+
+def config_compressao(app) -> None:
+    """Comprime as respostas textuais quando o cliente aceita gzip ou br.
+
+    COMPRESSAO_TAMANHO_MINIMO (bytes, padrão 1024) evita comprimir respostas pequenas, em que o
+    ganho não compensa a CPU; COMPRESSAO_NIVEL_GZIP (padrão 6) e COMPRESSAO_NIVEL_BROTLI (padrão 5)
+    ajustam a troca entre taxa e custo. COMPRESSAO=0 desliga.
+    """
+    def configuracao(nome: str, padrao: str) -> str:
+        return str(app.config.get(nome, os.getenv(nome, padrao)))
+
+    if configuracao("COMPRESSAO", "1") == "0":
+        return
+    tamanho_minimo = int(configuracao("COMPRESSAO_TAMANHO_MINIMO", "1024"))
+    nivel_gzip = int(configuracao("COMPRESSAO_NIVEL_GZIP", "6"))
+    nivel_brotli = int(configuracao("COMPRESSAO_NIVEL_BROTLI", "5"))
+    codificacoes = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    def criar_compressor(codificacao: str):
+        if codificacao == "br":
+            return _CompressorBrotli(nivel_brotli)
+        return _CompressorGzip(nivel_gzip)
+
+    @app.after_request
+    def _comprimir_resposta(response):
+        if response.mimetype not in TIPOS_COMPRIMIVEIS:
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.status_code != 200 or "Content-Encoding" in response.headers:
+            return response
+        codificacao = request.accept_encodings.best_match(codificacoes)
+        if codificacao is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _comprimir_stream(response.response, criar_compressor(codificacao))
+            response.headers.pop("Content-Length", None)
+        else:
+            dados = response.get_data()
+            if len(dados) < tamanho_minimo:
+                return response
+            compressor = criar_compressor(codificacao)
+            response.set_data(compressor.comprimir(dados) + compressor.finalizar())
+        response.headers["Content-Encoding"] = codificacao
+        return response
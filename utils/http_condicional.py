@@ -0,0 +1,43 @@
+"""Requisições condicionais (If-None-Match / If-Modified-Since) a partir de um validador já calculado."""
+from datetime import datetime, timezone
+from typing import Callable
+
+from flask import Response, make_response, request
+
+
+def _como_utc(instante: datetime) -> datetime:
+    return instante.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def nao_modificado(etag: str, ultima_modificacao: datetime) -> bool:
+    """Indica se a representação em cache do cliente ainda é válida.
+
+    If-None-Match tem precedência; If-Modified-Since (resolução de segundos) só é considerado na sua ausência.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None:
+        return _como_utc(ultima_modificacao) <= request.if_modified_since
+    return False
+
+
+def aplicar_validadores(resposta: Response, etag: str, ultima_modificacao: datetime) -> Response:
+    """Acrescenta ETag (fraca), Last-Modified e Cache-Control: no-cache (sempre revalidar) à resposta."""
+    resposta.set_etag(etag, weak=True)
+    resposta.last_modified = _como_utc(ultima_modificacao)
+    resposta.headers["Cache-Control"] = "no-cache"
+    return resposta
+
+
+def resposta_nao_modificada(etag: str, ultima_modificacao: datetime) -> Response:
+    return aplicar_validadores(Response(status=304), etag, ultima_modificacao)
+
+
+def resposta_condicional(etag: str, ultima_modificacao: datetime, montar: Callable) -> Response:
+    """Responde 304 se a cópia do cliente ainda vale; senão monta a resposta e, se 200, anexa os validadores."""
+    if nao_modificado(etag, ultima_modificacao):
+        return resposta_nao_modificada(etag, ultima_modificacao)
+    resposta = make_response(montar())
+    if resposta.status_code == 200:
+        aplicar_validadores(resposta, etag, ultima_modificacao)
+    return resposta
@@ -0,0 +1,73 @@
+"""Provider JSON do Flask com serialização via orjson, mantendo o formato de saída do provider padrão.
+
+Datas continuam no formato HTTP-date ("Thu, 02 Jan 2025 00:00:00 GMT") e as chaves ordenadas, como
+no DefaultJSONProvider, para que clientes existentes não percebam a troca. Sem o pacote orjson, ou
+com argumentos que ele não suporta, recai sobre o encoder da biblioteca padrão.
+"""
+import decimal
+import uuid
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=4096)
+def _data_http(d: date) -> str:
+    # Datas de vencimento/pagamento se repetem muito entre linhas; a formatação HTTP-date é cara
+    return http_date(d)
+
+
+def _padrao(o: Any) -> Any:
+    if isinstance(o, datetime):
+        return http_date(o)
+    if isinstance(o, date):
+        return _data_http(o)
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class JSONProviderRapido(DefaultJSONProvider):
+    """DefaultJSONProvider que usa orjson em dumps e nas respostas; o restante do comportamento é herdado.
+
+    Diferença observável: caracteres não ASCII saem em UTF-8 em vez de escapes \\uXXXX (JSON equivalente).
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or not self._suportado(kwargs):
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        """Serializa direto para bytes (UTF-8), evitando a decodificação quando o destino é a resposta HTTP."""
+        if orjson is None or not self._suportado(kwargs):
+            return super().dumps(obj, **kwargs).encode()
+        opcoes = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            opcoes |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_padrao, option=opcoes)
+
+    @staticmethod
+    def _suportado(kwargs: dict) -> bool:
+        # orjson só produz saída compacta ou indentada com 2 espaços
+        return set(kwargs) <= {"indent", "separators"} and kwargs.get("indent") in (None, 2)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
@@ -1,44 +1,60 @@
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import atexit
+import json
 import logging
 import os
+import queue
+import zlib
+
+from flask import g, has_request_context
 
 log_path = "log/"
-# Verifica se o diretorio para armexanar os logs não existe
-if not os.path.exists(log_path):
-    # então cria o diretorio
-    os.makedirs(log_path)
 
-dictConfig({
+# Formato das linhas: json (estruturado, padrão) ou texto (legível no console em desenvolvimento)
+FORMATO_LOG = os.getenv("LOG_FORMATO", "json")
+# Rotação: arquivos de 10 MB, 5 históricos por arquivo
+TAMANHO_MAXIMO_LOG = int(os.getenv("LOG_TAMANHO_MAXIMO_MB", "10")) * 1024 * 1024
+ARQUIVOS_HISTORICO_LOG = int(os.getenv("LOG_ARQUIVOS_HISTORICO", "5"))
+
+# Configuração de logging da aplicação, reaproveitada pelo gunicorn (logconfig_dict em gunicorn.conf.py)
+CONFIG_LOG = {
     "version": 1,
-    "disable_existing_loggers": True,
+    # Os loggers dos módulos são criados na importação, antes de configurar_logging; não podem ser desativados
+    "disable_existing_loggers": False,
     "formatters": {
         "default": {
             "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s",
         },
         "detailed": {
             "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s - call_trace=%(pathname)s L%(lineno)-4d",
-        }
+        },
+        "json": {
+            "()": "utils.logger.FormatadorJSON",
+        },
     },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
-            "formatter": "default",
+            "formatter": "json" if FORMATO_LOG == "json" else "default",
             "stream": "ext://sys.stdout",
         },
         "error_file": {
             "class": "logging.handlers.RotatingFileHandler",
-            "formatter": "detailed",
+            "formatter": "json" if FORMATO_LOG == "json" else "detailed",
             "filename": "log/gunicorn.error.log",
-            "maxBytes": 10000,
-            "backupCount": 10,
+            "maxBytes": TAMANHO_MAXIMO_LOG,
+            "backupCount": ARQUIVOS_HISTORICO_LOG,
             "delay": "True",
         },
         "detailed_file": {
             "class": "logging.handlers.RotatingFileHandler",
-            "formatter": "detailed",
+            "formatter": "json" if FORMATO_LOG == "json" else "detailed",
             "filename": "log/gunicorn.detailed.log",
-            "maxBytes": 10000,
-            "backupCount": 10,
+            "maxBytes": TAMANHO_MAXIMO_LOG,
+            "backupCount": ARQUIVOS_HISTORICO_LOG,
             "delay": "True",
         }
     },
@@ -47,12 +63,184 @@ dictConfig({
             "handlers": ["console", "error_file"],  # , email],
             "level": "INFO",
             "propagate": False,
+        },
+        "gunicorn.access": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
         }
     },
     "root": {
         "handlers": ["console", "detailed_file"],
-        "level": "INFO",
+        "level": os.getenv("LOG_NIVEL", "INFO"),
     }
-})
+}
+
+# Loggers cujos handlers passam a ser alimentados pela fila (ver iniciar_fila_logging)
+LOGGERS_EM_FILA = ("", "gunicorn.error", "gunicorn.access")
 
 logger = logging.getLogger(__name__)
+
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "destino"}
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro: campos fixos, request_id e os campos passados em extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        linha = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "funcao": record.funcName,
+            "linha": record.lineno,
+            "mensagem": record.getMessage(),
+        }
+        for campo, valor in vars(record).items():
+            if campo not in _ATRIBUTOS_PADRAO and not campo.startswith("_"):
+                linha[campo] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            linha["excecao"] = record.exc_text
+        return json.dumps(linha, ensure_ascii=False, default=str)
+
+
+def _taxas_amostragem(valor: str) -> Dict[int, float]:
+    """Converte "DEBUG=0.1,INFO=1" em {nível: fração de requisições cujos registros são mantidos}."""
+    taxas = {}
+    for item in filter(None, (parte.strip() for parte in valor.split(","))):
+        nivel, _, taxa = item.partition("=")
+        taxas[logging.getLevelName(nivel.strip().upper())] = float(taxa)
+    return taxas
+
+
+class FiltroRequisicao(logging.Filter):
+    """Anexa o request_id da requisição corrente e amostra os níveis configurados em LOG_AMOSTRAGEM.
+
+    A decisão de amostragem é determinística por request_id: uma requisição amostrada mantém todos
+    os seus registros daquele nível, as demais não emitem nenhum. Fora de requisições (inicialização,
+    comandos) nada é descartado.
+    """
+
+    def __init__(self, taxas: Optional[Dict[int, float]] = None):
+        super().__init__()
+        self.taxas = taxas if taxas is not None else _taxas_amostragem(os.getenv("LOG_AMOSTRAGEM", "DEBUG=0.01"))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not has_request_context() or "request_id" not in g:
+            return True
+        record.request_id = g.request_id
+        taxa = self.taxas.get(record.levelno)
+        if taxa is None or taxa >= 1:
+            return True
+        return zlib.crc32(g.request_id.encode()) / 2 ** 32 < taxa
+
+
+class _HandlerFila(QueueHandler):
+    """Enfileira o registro marcando o logger de destino; a mensagem é formatada aqui, os handlers na thread da fila."""
+
+    def __init__(self, fila: queue.Queue, destino: str):
+        super().__init__(fila)
+        self.destino = destino
+        self.addFilter(FiltroRequisicao())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.destino = self.destino
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Despacho(logging.Handler):
+    """Entrega cada registro da fila aos handlers originais do logger de destino."""
+
+    def __init__(self, handlers: Dict[str, List[logging.Handler]]):
+        super().__init__()
+        self.handlers = handlers
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in self.handlers.get(record.destino, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+class _EstadoFila:
+    def __init__(self, handlers: Dict[str, List[logging.Handler]], fila_handlers: List[_HandlerFila]):
+        self.handlers = handlers
+        self.fila_handlers = fila_handlers
+        self.pid: Optional[int] = None
+        self.listener: Optional[QueueListener] = None
+
+    def iniciar(self) -> None:
+        fila = queue.SimpleQueue()
+        for handler in self.fila_handlers:
+            handler.queue = fila
+        self.listener = QueueListener(fila, _Despacho(self.handlers))
+        self.listener.start()
+        self.pid = os.getpid()
+
+
+_estado_fila: Optional[_EstadoFila] = None
+
+
+def _ainda_instalada(estado: _EstadoFila) -> bool:
+    return all(handler in logging.getLogger(handler.destino).handlers for handler in estado.fila_handlers)
+
+
+def iniciar_fila_logging() -> None:
+    """Troca os handlers de LOGGERS_EM_FILA por QueueHandlers consumidos por uma thread (QueueListener).
+
+    As requisições só enfileiram o registro; formatação JSON e escrita em console/arquivo (incluindo
+    rotação) acontecem na thread da fila. Idempotente por processo: num worker criado por fork (preload
+    do gunicorn) a thread do master não existe, e uma nova fila e thread são criadas.
+    """
+    global _estado_fila
+    if _estado_fila is not None and not _ainda_instalada(_estado_fila):
+        # dictConfig reaplicado depois (ex.: reload do gunicorn): a fila antiga é descartada
+        parar_fila_logging()
+        _estado_fila = None
+    if _estado_fila is None:
+        handlers, fila_handlers = {}, []
+        for nome in LOGGERS_EM_FILA:
+            alvo = logging.getLogger(nome)
+            handlers[nome] = [h for h in alvo.handlers if not isinstance(h, QueueHandler)]
+            for handler in list(alvo.handlers):
+                alvo.removeHandler(handler)
+            fila_handlers.append(_HandlerFila(None, nome))
+            alvo.addHandler(fila_handlers[-1])
+        _estado_fila = _EstadoFila(handlers, fila_handlers)
+    if _estado_fila.pid != os.getpid():
+        _estado_fila.iniciar()
+
+
+def parar_fila_logging() -> None:
+    """Escoa os registros pendentes na fila e encerra a thread (fim do processo ou do worker)."""
+    if _estado_fila is not None and _estado_fila.listener is not None and _estado_fila.pid == os.getpid():
+        _estado_fila.listener.stop()
+        _estado_fila.listener = None
+        _estado_fila.pid = None
+
+
+atexit.register(parar_fila_logging)
+
+
+def criar_diretorio_log() -> None:
+    # Verifica se o diretorio para armexanar os logs não existe
+    if not os.path.exists(log_path):
+        # então cria o diretorio
+        os.makedirs(log_path)
+
+
+def configurar_logging() -> None:
+    """Cria o diretório de logs, aplica CONFIG_LOG e liga a fila assíncrona; chamado na inicialização (create_app)."""
+    # Sob o gunicorn o logging já foi configurado a partir de CONFIG_LOG (logconfig_dict em gunicorn.conf.py)
+    if not logging.getLogger("gunicorn.error").handlers:
+        criar_diretorio_log()
+        dictConfig(CONFIG_LOG)
+    iniciar_fila_logging()
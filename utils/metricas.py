@@ -0,0 +1,162 @@
+"""Métricas da aplicação no formato de exposição de texto do Prometheus (GET /metrics).
+
+Implementação mínima, sem dependências: contadores e histogramas com rótulos, mais coletores
+chamados no momento da coleta (estado do pool, cache). Os valores são do processo; com vários
+workers do gunicorn cada coleta reflete o worker que atendeu (ver README).
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from flask import g, request
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos; mesmos limites padrão dos clientes oficiais do Prometheus
+BALDES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_SQL_QUANTIDADE = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+BALDES_SQL_TEMPO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Coletor: devolve (nome, tipo, descrição, [(rótulos, valor)]) no momento da coleta
+Coletor = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _rotulos(nomes: Sequence[str], valores: Sequence[str]) -> str:
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)) + "}"
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = ()):
+        self.nome, self.descricao, self.rotulos = nome, descricao, tuple(rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_rotulos: str, quantidade: float = 1) -> None:
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + quantidade
+
+    def exportar(self) -> Iterator[str]:
+        yield f"# HELP {self.nome} {self.descricao}"
+        yield f"# TYPE {self.nome} counter"
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for chave, valor in valores:
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}"
+
+
+class Histograma:
+    """Histograma com baldes fixos; cada observação custa uma busca binária e um incremento sob lock."""
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = (), baldes: Sequence[float] = BALDES_LATENCIA):
+        self.nome, self.descricao, self.rotulos = nome, descricao, tuple(rotulos)
+        self.baldes = tuple(baldes)
+        # rótulos -> [contagem por balde (não acumulada) + estouro, soma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores_rotulos: str) -> None:
+        indice = bisect.bisect_left(self.baldes, valor)
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = [[0] * (len(self.baldes) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def exportar(self) -> Iterator[str]:
+        yield f"# HELP {self.nome} {self.descricao}"
+        yield f"# TYPE {self.nome} histogram"
+        with self._lock:
+            series = sorted((chave, list(contagens), soma) for chave, (contagens, soma) in self._series.items())
+        nomes_balde = self.rotulos + ("le",)
+        for chave, contagens, soma in series:
+            acumulado = 0
+            for limite, contagem in zip(self.baldes + (float("inf"),), contagens):
+                acumulado += contagem
+                yield f"{self.nome}_bucket{_rotulos(nomes_balde, chave + (_numero(limite),))} {acumulado}"
+            yield f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}"
+            yield f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}"
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: Dict[str, object] = {}
+        self._coletores: Dict[str, Coletor] = {}
+
+    def registrar(self, metrica):
+        """Registra a métrica (ou devolve a já registrada com o mesmo nome, em create_app repetidos)."""
+        return self._metricas.setdefault(metrica.nome, metrica)
+
+    def registrar_coletor(self, nome: str, coletor: Coletor) -> None:
+        self._coletores[nome] = coletor
+
+    def exportar(self) -> str:
+        linhas = []
+        for metrica in self._metricas.values():
+            linhas.extend(metrica.exportar())
+        for coletor in self._coletores.values():
+            for nome, tipo, descricao, amostras in coletor():
+                linhas.append(f"# HELP {nome} {descricao}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+                for rotulos, valor in amostras:
+                    linhas.append(f"{nome}{_rotulos(tuple(rotulos), tuple(rotulos.values()))} {_numero(valor)}")
+        return "\n".join(linhas) + "\n"
+
+
+registro_metricas = RegistroMetricas()
+
+duracao_requisicoes = registro_metricas.registrar(Histograma(
+    "econome_http_duracao_segundos", "Latência das requisições HTTP por rota, método e status",
+    ("rota", "metodo", "status")))
+sql_por_requisicao = registro_metricas.registrar(Histograma(
+    "econome_sql_instrucoes_por_requisicao", "Instruções SQL executadas por requisição",
+    ("rota", "metodo"), BALDES_SQL_QUANTIDADE))
+tempo_sql_por_requisicao = registro_metricas.registrar(Histograma(
+    "econome_sql_duracao_segundos_por_requisicao", "Tempo total em SQL por requisição",
+    ("rota", "metodo"), BALDES_SQL_TEMPO))
+
+
+def metricas_habilitadas(app) -> bool:
+    return str(app.config.get("METRICAS", os.getenv("METRICAS", "1"))) != "0"
+
+
+def config_metricas(app) -> None:
+    """Mede, quando METRICAS estiver ativo (padrão), latência e SQL de cada requisição.
+
+    A rota é o padrão da regra (ex.: /transacao/<int:transacao_id>), mantendo a cardinalidade
+    limitada. Desligado (METRICAS=0), nenhum hook é registrado e o custo é nulo. Em respostas em
+    streaming a latência vai até o envio dos headers.
+    """
+    if not metricas_habilitadas(app):
+        return
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.inicio_metricas = time.perf_counter()
+
+    @app.after_request
+    def _registrar_medicao(response):
+        inicio = g.get("inicio_metricas")
+        if inicio is None:
+            return response
+        rota = request.url_rule.rule if request.url_rule is not None else "<sem_rota>"
+        duracao_requisicoes.observar(time.perf_counter() - inicio, rota, request.method, str(response.status_code))
+        contador = g.get("contador_sql")
+        if contador is not None:
+            sql_por_requisicao.observar(contador.quantidade, rota, request.method)
+            tempo_sql_por_requisicao.observar(contador.tempo_total, rota, request.method)
+        return response
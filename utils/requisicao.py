@@ -0,0 +1,40 @@
+import os
+import re
+import time
+import uuid
+
+from flask import g, request
+
+from utils.logger import logger
+
+# Request id recebido do cliente/proxy só é aceito se for um token curto e seguro para logs e headers
+_REQUEST_ID_VALIDO = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+def config_requisicao(app) -> None:
+    """Atribui um request id a cada requisição e registra uma linha estruturada ao concluí-la.
+
+    O id vem do header X-Request-ID (quando válido) ou é gerado, é devolvido no mesmo header e
+    aparece em todos os registros de log da requisição (ver FiltroRequisicao). A linha de conclusão
+    (nível INFO, desligável com LOG_REQUISICOES=0) traz método, rota, status e duração; em respostas
+    em streaming a duração vai até o envio dos headers.
+    """
+    registrar = str(app.config.get("LOG_REQUISICOES", os.getenv("LOG_REQUISICOES", "1"))) != "0"
+
+    @app.before_request
+    def _iniciar_requisicao():
+        recebido = request.headers.get("X-Request-ID", "")
+        g.request_id = recebido if _REQUEST_ID_VALIDO.match(recebido) else uuid.uuid4().hex
+        g.inicio_requisicao = time.perf_counter()
+
+    @app.after_request
+    def _concluir_requisicao(response):
+        response.headers["X-Request-ID"] = g.request_id
+        if registrar:
+            extra = {"metodo": request.method, "rota": request.path, "status": response.status_code,
+                     "duracao_ms": round((time.perf_counter() - g.inicio_requisicao) * 1000, 3)}
+            contador = g.get("contador_sql")
+            if contador is not None:
+                extra |= {"sql_quantidade": contador.quantidade, "sql_ms": round(contador.tempo_total * 1000, 3)}
+            logger.info("%s %s %s", request.method, request.path, response.status_code, extra=extra)
+        return response